@@ -1,22 +1,104 @@
-from typing import IO, Optional
+import io
+from functools import lru_cache, partial
+from typing import IO, Iterator, Optional, Union, overload
+
+from nutcracker.kernel.buffer import BufferLike
+from nutcracker.utils import copyio
 
 CHIPER_KEY = 0x69
 
 
+@lru_cache(maxsize=None)
+def _table(key: int) -> bytes:
+    return bytes(b ^ key for b in range(256))
+
+
+def decrypt(data: BufferLike, key: int = CHIPER_KEY) -> bytes:
+    # same operation is used for both directions
+    if not key:
+        return bytes(data)
+    return bytes(data).translate(_table(key))
+
+
 def read(stream: IO[bytes], size: Optional[int] = None, key: int = CHIPER_KEY) -> bytes:
     # None reads until EOF
-    return bytes(b ^ key for b in stream.read(size))  # type: ignore
+    return decrypt(stream.read(size), key=key)  # type: ignore
 
 
 def write(stream: IO[bytes], data: bytes, key: int = CHIPER_KEY) -> int:
-    return stream.write(bytes(b ^ key for b in data))
+    return stream.write(decrypt(data, key=key))
+
+
+def buffered_read(
+    stream: IO[bytes],
+    key: int = CHIPER_KEY,
+    buffer_size: int = io.DEFAULT_BUFFER_SIZE,
+) -> Iterator[bytes]:
+    """Decrypt given stream in chunks of buffer size."""
+    return copyio.buffered(partial(read, stream, key=key), buffer_size=buffer_size)
+
+
+class XorView(object):
+    """Read-only view of encrypted buffer, decrypted on access.
+
+    Useful with memory-mapped files, only the sliced ranges are paged in
+    and decrypted.
+    """
+
+    def __init__(self, buffer: BufferLike, key: int = CHIPER_KEY) -> None:
+        self.buffer = buffer
+        self.key = key
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    @overload
+    def __getitem__(self, index: int) -> int:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> bytes:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[int, bytes]:
+        if isinstance(index, slice):
+            return decrypt(self.buffer[index], key=self.key)
+        return self.buffer[index] ^ self.key
+
+    def __bytes__(self) -> bytes:
+        return decrypt(self.buffer, key=self.key)
+
+
+class XorReader(object):
+    """Stream wrapper decrypting read data."""
+
+    def __init__(self, stream: IO[bytes], key: int = CHIPER_KEY) -> None:
+        self.stream = stream
+        self.key = key
+
+    def read(self, size: int = -1) -> bytes:
+        return decrypt(self.stream.read(size), key=self.key)
+
+
+class XorWriter(object):
+    """Seekable stream wrapper encrypting written data."""
+
+    def __init__(self, stream: IO[bytes], key: int = CHIPER_KEY) -> None:
+        self.stream = stream
+        self.key = key
+
+    def write(self, data: BufferLike) -> int:
+        return self.stream.write(decrypt(data, key=self.key))
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self.stream.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.stream.tell()
 
 
 if __name__ == '__main__':
     import argparse
-    from functools import partial
-
-    from nutcracker.utils import copyio
 
     parser = argparse.ArgumentParser(description='read smush file')
     parser.add_argument('filename', help='filename to read from')
@@ -25,7 +107,5 @@ if __name__ == '__main__':
     args = parser.parse_args()
 
     with open(args.filename, 'rb') as infile, open(args.output, 'wb') as outfile:
-        for buffer in copyio.buffered(
-            partial(read, infile, key=int(args.chiper_key, 16))
-        ):
+        for buffer in buffered_read(infile, key=int(args.chiper_key, 16)):
             outfile.write(buffer)
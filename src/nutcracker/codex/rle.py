@@ -2,6 +2,8 @@ import io
 import itertools
 from typing import Sequence
 
+from nutcracker.kernel.verify import policy
+
 from .base import unwrap_uint16le, wrap_uint16le
 
 
@@ -123,6 +125,9 @@ def decode_lined_rle(data, width, height, verify=True):
     with io.BytesIO(data) as stream:
         lines = [unwrap_uint16le(stream) for _ in range(height)]
     output = [decode_rle_group(line, width) for line in lines]
+    if not (verify and policy('rle')):
+        return output
+
     output2 = [list(decode_rle_group_gen(line, width)) for line in lines]
 
     for ll, o in zip(lines, output2):
@@ -138,21 +143,20 @@ def decode_lined_rle(data, width, height, verify=True):
             print('REGROUPED', g)
             print('OGROUPS', o)
             print('ENCODED', e)
-    if verify:
-        encoded = encode_lined_rle(output)
-
-        with io.BytesIO(encoded) as stream:
-            elines = [unwrap_uint16le(stream) for _ in range(height)]
-        ex = False
-        for idx, (ll, e) in enumerate(zip(lines, elines)):
-            if not ll == e:
-                print(idx)
-                print('ORIGiNA', ll)
-                print('ENCODED', e)
-                ex = True
-        if ex:
-            print('ERROR: ENCODED DATA DOES NOT MATCH ORIGINAL')
-            exit(1)
-
-        assert encoded == data, (encoded, data)
+    encoded = encode_lined_rle(output)
+
+    with io.BytesIO(encoded) as stream:
+        elines = [unwrap_uint16le(stream) for _ in range(height)]
+    ex = False
+    for idx, (ll, e) in enumerate(zip(lines, elines)):
+        if not ll == e:
+            print(idx)
+            print('ORIGiNA', ll)
+            print('ENCODED', e)
+            ex = True
+    if ex:
+        print('ERROR: ENCODED DATA DOES NOT MATCH ORIGINAL')
+        exit(1)
+
+    assert encoded == data, (encoded, data)
     return output
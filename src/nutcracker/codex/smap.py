@@ -5,6 +5,7 @@ from typing import Sequence
 
 import numpy as np
 
+from nutcracker.kernel.verify import policy
 from nutcracker.utils.funcutils import grouper
 
 TRANSPARENCY = 255
@@ -302,8 +303,8 @@ def parse_strip(height, width, data, transparency=None):
         #         print(data[1:])
         #         assert encode_basic(dec_stream, height, palen, 8) == data[1:]
 
-
-        if decode_method in {decode_run_majmin, decode_basic, decode_he}:
+        reencode = decode_method in {decode_run_majmin, decode_basic, decode_he}
+        if reencode and policy('smap'):
             if decode_method == decode_run_majmin:
                 if code - palen in {60, 80}:
                     encode_method = partial(encode_run_majmin, limit=255)
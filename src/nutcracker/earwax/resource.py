@@ -70,12 +70,14 @@ def read_index(root):
             pprint(('0C', dcos))
         if t.tag == '0O':
             print('OBJ DIR not yet supported')
+    # sounds and room sounds share lookup table of same directory
+    compare_sou = compare_pid_off(dsou, base=-2)
     return rnam, {
         'LF': droo,
-        'SO': compare_pid_off(dsou, base=-2),
+        'SO': compare_sou,
         'SC': compare_pid_off(dscr, base=-2),
         'CO': compare_pid_off(dcos, base=-2),
-        'RO': compare_pid_off(dsou, base=-2),
+        'RO': compare_sou,
     }
 
 
@@ -207,7 +209,7 @@ def open_game_resource(filename: str, chiper_key=0x00):
             c = 2
 
             room_chunk = next(earwax(schema=schema, max_depth=0).map_chunks(t.data, offset=c, parent=t, extra=path_only), None)
-            assert room_chunk.tag == 'RO', room_chunk
+            assert room_chunk and room_chunk.tag == 'RO', room_chunk
             t.children.append(room_chunk)
             c += len(bytes(room_chunk.chunk))
             # print('ROOOM')
@@ -1,9 +1,10 @@
+import mmap
 from dataclasses import dataclass
 from typing import Optional, Union
 
 import deal
 
-BufferLike = Union[bytes, bytearray, memoryview]
+BufferLike = Union[bytes, bytearray, memoryview, mmap.mmap]
 
 
 class UnexpectedBufferSize(EOFError):
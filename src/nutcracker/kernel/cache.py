@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .buffer import BufferLike, Splicer
+from .chunk import Chunk
+from .element import Element
+from .settings import _ChunkSetting
+
+CACHE_VERSION = 1
+DIGEST_BUFFER_SIZE = 1 << 20
+
+# parent index, tag, offset, header size, data size, extra attributes
+ElementRecord = Tuple[int, str, int, int, int, Dict[str, Any]]
+
+
+def dump_records(root: Iterable[Element], parent: int = -1) -> Iterator[ElementRecord]:
+    """Flatten element tree to records, parents always precede their children."""
+    records: List[ElementRecord] = []
+
+    def flatten(root: Iterable[Element], parent: int) -> None:
+        for elem in root:
+            idx = len(records)
+            attribs = dict(elem.attribs)
+            offset, size = attribs.pop('offset'), attribs.pop('size')
+            hsize = elem.chunk.slice.offset
+            records.append((parent, elem.tag, offset, hsize, size, attribs))
+            flatten(elem.children, idx)
+
+    flatten(root, parent)
+    return iter(records)
+
+
+def load_records(
+    cfg: _ChunkSetting,
+    buffer: BufferLike,
+    records: Iterable[Sequence[Any]],
+) -> List[Element]:
+    """Rebuild element tree over given buffer without reading chunk headers."""
+    data = memoryview(buffer)
+    elements: List[Element] = []
+    roots: List[Element] = []
+    for parent, tag, offset, hsize, size, attribs in records:
+        if parent < 0:
+            base = data
+        else:
+            pchunk = elements[parent].chunk
+            base = pchunk.slice(pchunk.buffer)
+        chunk = Chunk(
+            tag,
+            base[offset : offset + hsize + size],
+            Splicer(hsize, size),
+            zero_copy=cfg.zero_copy,
+        )
+        elem = Element(chunk, {'offset': offset, 'size': size, **attribs}, [])
+        elements.append(elem)
+        (roots if parent < 0 else elements[parent].children).append(elem)
+    return roots
+
+
+def dump_jsonl(root: Iterable[Element], stream: IO[str]) -> None:
+    """Write element tree as JSON lines, one record per element."""
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+    stream.writelines(f'{dumps(record)}\n' for record in dump_records(root))
+
+
+def load_jsonl(
+    cfg: _ChunkSetting,
+    buffer: BufferLike,
+    stream: IO[str],
+) -> List[Element]:
+    """Rebuild element tree over given buffer from JSON lines records."""
+    # decoding all lines as single array is much faster than line by line
+    return load_records(cfg, buffer, json.loads(f'[{",".join(stream)}]'))
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as stream:
+        for block in iter(lambda: stream.read(DIGEST_BUFFER_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_key(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+
+def read_cache(cache_path: str, path: str, params: str) -> Optional[List[Any]]:
+    """Load cached records for given file, None if missing or stale."""
+    try:
+        with open(cache_path, 'r') as stream:
+            cached = json.load(stream)
+    except (OSError, ValueError):
+        return None
+    expected = {'version': CACHE_VERSION, 'params': params, **_file_key(path)}
+    if any(cached.get(key) != value for key, value in expected.items()):
+        return None
+    if cached.get('digest') != file_digest(path):
+        return None
+    elements: List[Any] = cached['elements']
+    return elements
+
+
+def write_cache(
+    cache_path: str,
+    path: str,
+    params: str,
+    records: Iterable[ElementRecord],
+) -> None:
+    cached = {
+        'version': CACHE_VERSION,
+        'params': params,
+        **_file_key(path),
+        'digest': file_digest(path),
+        'elements': list(records),
+    }
+    with open(cache_path, 'w') as stream:
+        json.dump(cached, stream, separators=(',', ':'))
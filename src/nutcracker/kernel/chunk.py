@@ -1,5 +1,5 @@
 import builtins
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import cached_property
 from typing import IO, Iterator, NamedTuple, Protocol, Sequence, Union, overload
 
@@ -17,9 +17,20 @@ class Chunk(object):
     tag: str
     buffer: BufferLike
     slice: Splicer
+    zero_copy: bool = field(default=False, repr=False, compare=False)
 
     @cached_property
     def data(self) -> bytes:
+        """Chunk data without header.
+
+        Read-only `memoryview` into parent buffer when zero_copy, typed as bytes
+        for the common ground: slicing, len, comparison with bytes, iteration
+        of ints, and anything accepting buffers (`int.from_bytes`, `io.BytesIO`,
+        `bytes()`, writes). Bytes methods such as `decode` or `split` are not
+        available, callers needing these or a stable copy should use `bytes()`.
+        """
+        if self.zero_copy:
+            return self.slice(memoryview(self.buffer)).toreadonly()  # type: ignore
         return bytes(self.slice(self.buffer))
 
     def __len__(self) -> int:
@@ -53,7 +64,10 @@ class ChunkFactory(Protocol):
     def untag(self, buffer: BufferLike, offset: int = 0) -> Chunk:
         ...
 
-    def mktag(self, tag: str, data: bytes) -> bytes:
+    def mktag(self, tag: str, data: BufferLike) -> bytes:
+        ...
+
+    def mkheader(self, tag: str, size: int) -> bytes:
         ...
 
 
@@ -86,8 +100,11 @@ class StructuredChunk(ChunkFactory, _StructuredChunkHeader):
             splicer,
         )
 
-    def mktag(self, tag: str, data: bytes) -> bytes:
-        return self.pack(ChunkHeader(tag.encode('ascii'), len(data) + self.size)) + data
+    def mktag(self, tag: str, data: BufferLike) -> bytes:
+        return self.mkheader(tag, len(data)) + data
+
+    def mkheader(self, tag: str, size: int) -> bytes:
+        return self.pack(ChunkHeader(tag.encode('ascii'), size + self.size))
 
 NULL_TAG = b'_'
 
@@ -1,6 +1,6 @@
 from collections import Counter
 from dataclasses import dataclass, field, replace
-from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
 
 from .chunk import Chunk
 
@@ -15,14 +15,25 @@ class Element(object):
 
     attribs: helper attributes
 
-    children: Contained elements
+    children: Contained elements, parsed on first access
     """
 
     chunk: Chunk
     attribs: Dict[str, Any]
-    children: Sequence['Element']
+    _children: List['Element'] = field(repr=False)
+    _pending: Optional[Iterator['Element']] = field(
+        default=None,
+        repr=False,
+        compare=False,
+    )
 
     _data: Optional[bytes] = field(default=None, repr=False, init=False)
+    _index: Optional[Dict[str, List['Element']]] = field(
+        default=None,
+        repr=False,
+        init=False,
+        compare=False,
+    )
 
     @property
     def tag(self) -> str:
@@ -30,6 +41,7 @@ class Element(object):
 
     @property
     def data(self) -> bytes:
+        """Chunk data unless replaced, see `Chunk.data` for zero copy views."""
         if self._data is None:
             return self.chunk.data
         return self._data
@@ -38,11 +50,59 @@ class Element(object):
     def data(self, value: bytes) -> None:
         self._data = value
 
+    @property
+    def children(self) -> List['Element']:
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            self._children.extend(pending)
+        return self._children
+
+    @children.setter
+    def children(self, value: Iterable['Element']) -> None:
+        self._children = list(value)
+        self._pending = None
+        self._index = None
+
+    def lookup(self, key: str, match: Callable[[str], bool]) -> List['Element']:
+        """Children with tags matching given key, cached on first lookup.
+
+        Index is built from all children by lowercase tag on first lookup,
+        other keys (tag patterns) are added as they are looked up.
+        """
+        if self._index is None:
+            index: Dict[str, List[Element]] = {}
+            for child in self.children:
+                index.setdefault(child.tag.lower(), []).append(child)
+            self._index = index
+        if key not in self._index:
+            self._index[key] = [child for child in self.children if match(child.tag)]
+        return self._index[key]
+
+    def _fetch(self) -> bool:
+        """Parse next pending child, return False when all children are parsed."""
+        if self._pending is None:
+            return False
+        child = next(self._pending, None)
+        if child is None:
+            self._pending = None
+            return False
+        self._children.append(child)
+        return True
+
     def __iter__(self) -> Iterator['Element']:
-        return iter(self.children)
+        if self._pending is None:
+            return iter(self._children)
+        return self._iter_pending()
+
+    def _iter_pending(self) -> Iterator['Element']:
+        # children are parsed only as far as iteration goes, and kept
+        idx = 0
+        while idx < len(self._children) or self._fetch():
+            yield self._children[idx]
+            idx += 1
 
     def content(self, children: Iterable['Element']) -> 'Element':
-        return replace(self, children=list(children))
+        return replace(self, _children=[], _pending=iter(children))
 
     def __repr__(self) -> str:
         attribs = ' '.join(f'{key}={val}' for key, val in self.attribs.items())
@@ -50,6 +110,19 @@ class Element(object):
         return f'Element<{self.tag}>[{attribs}, children={{{children}}}]'
 
 
+class TransientElement(Element):
+    """Element with children released as soon as they are iterated.
+
+    Children can be iterated only once, e.g. rooms of a disk read as stream.
+    """
+
+    def __iter__(self) -> Iterator[Element]:
+        pending, self._pending = self._pending, None
+        yield from self._children
+        if pending is not None:
+            yield from pending
+
+
 def _format_children(
     root: Iterable[Element],
     max_show: Optional[int] = None,
@@ -2,11 +2,27 @@
 
 from contextlib import contextmanager
 from dataclasses import replace
-from typing import Any, Callable, Dict, FrozenSet, Iterator, Optional, Set
+from itertools import count
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
 
+from .buffer import BufferLike
+from .cache import ElementRecord
 from .chunk import Chunk
 from .element import Element
-from .resource import read_chunks
+from .resource import iter_chunks
 from .settings import _IndexSetting
 
 
@@ -33,7 +49,12 @@ def exception_ptag_context(ptag: Optional[str]) -> Iterator[None]:
         raise exc
 
 
-def check_schema(cfg: _IndexSetting, ptag: Optional[str], tag: str) -> None:
+def check_schema(
+    cfg: _IndexSetting,
+    ptag: Optional[str],
+    tag: str,
+    level: int = 0,
+) -> None:
     try:
         if ptag and tag not in cfg.schema[ptag]:
             raise MissingSchemaEntry(ptag, tag)
@@ -44,35 +65,49 @@ def check_schema(cfg: _IndexSetting, ptag: Optional[str], tag: str) -> None:
             raise exc
         else:
             cfg.logger.warning(exc)
+            if cfg.stats:
+                cfg.stats.warning(tag, level)
 
 
 def create_element(offset: int, chunk: Chunk, **attrs: Any) -> Element:
-    return Element(chunk, {'offset': offset, 'size': len(chunk.data), **attrs}, [])
+    return Element(chunk, {'offset': offset, 'size': chunk.slice.size, **attrs}, [])
 
 
 def map_chunks(
     cfg: _IndexSetting,
-    data: bytes,
+    data: BufferLike,
     parent: Optional[Element] = None,
     level: int = 0,
     extra: Optional[Callable[[Optional[Element], Chunk, int], Dict[str, Any]]] = None,
     offset: int = 0,
 ) -> Iterator[Element]:
+    """Map chunks in given buffer to elements, children are mapped on access.
+
+    Elements keep referring to given buffer, children are mapped from it
+    on first access. A memory-mapped file must not be changed or truncated
+    while its elements are used, reads would return garbage or crash (SIGBUS).
+    Write over such file out of place, or copy the data needed first.
+    """
     ptag = parent.tag if parent else None
     if cfg.max_depth and level >= cfg.max_depth:
         return
     if parent and not cfg.schema.get(parent.tag):
         return
     data = memoryview(data)
+    stats = cfg.stats
     with exception_ptag_context(ptag):
-        for offset, chunk in read_chunks(cfg, data, offset=offset):
-            check_schema(cfg, ptag, chunk.tag)
+        # only time spent here is measured, not by consumers between chunks
+        start = perf_counter() if stats else 0.0
+        for offset, chunk in iter_chunks(cfg, data, offset=offset):
+            check_schema(cfg, ptag, chunk.tag, level=level)
 
             elem = create_element(
                 offset,
                 chunk,
                 **(extra(parent, chunk, offset) if extra else {}),
             )
+            if stats:
+                stats.chunk(chunk.tag, level, len(chunk), perf_counter() - start)
             yield elem.content(
                 map_chunks(
                     cfg,
@@ -82,32 +117,187 @@ def map_chunks(
                     extra=extra,
                 ),
             )
+            start = perf_counter() if stats else 0.0
+
+
+class ParentRecord(NamedTuple):
+    """Tag and attributes of parent chunk, given to `extra` by `map_records`"""
+
+    tag: str
+    attribs: Dict[str, Any]
+
+
+def map_records(
+    cfg: _IndexSetting,
+    data: BufferLike,
+    extra: Optional[Callable[[Optional[Any], Chunk, int], Dict[str, Any]]] = None,
+) -> Iterator[ElementRecord]:
+    """Flatten chunks in given buffer to records, in tree order, as mapped.
+
+    Same tree as `map_chunks` gives, without creating elements, only the
+    chunks of current path are kept. `extra` is given a `ParentRecord`
+    instead of the parent element.
+    """
+    rows = count()
+    stats = cfg.stats
+
+    def walk(
+        data: BufferLike, parent: Optional[Tuple[int, ParentRecord]], level: int
+    ) -> Iterator[ElementRecord]:
+        prow, pref = parent if parent else (-1, None)
+        ptag = pref.tag if pref else None
+        if cfg.max_depth and level >= cfg.max_depth:
+            return
+        if pref and not cfg.schema.get(pref.tag):
+            return
+        with exception_ptag_context(ptag):
+            start = perf_counter() if stats else 0.0
+            for offset, chunk in iter_chunks(cfg, memoryview(data)):
+                check_schema(cfg, ptag, chunk.tag, level=level)
+                attribs = extra(pref, chunk, offset) if extra else {}
+                if stats:
+                    stats.chunk(chunk.tag, level, len(chunk), perf_counter() - start)
+                row = next(rows)
+                hsize, size = chunk.slice.offset, chunk.slice.size
+                yield prow, chunk.tag, offset, hsize, size, attribs
+                ref = ParentRecord(
+                    chunk.tag, {'offset': offset, 'size': size, **attribs}
+                )
+                yield from walk(chunk.slice(chunk.buffer), (row, ref), level + 1)
+                start = perf_counter() if stats else 0.0
+
+    return walk(data, None, 0)
+
+
+def expand(root: Iterable[Element]) -> None:
+    """Parse all lazy children in given tree, depth first."""
+    for elem in root:
+        expand(elem)
+
+
+class _CollapseTag(Exception):
+    def __init__(self, tag: str) -> None:
+        super().__init__(f'Unwinding to outermost {tag} container')
+        self.tag = tag
+
+
+EMPTY: FrozenSet[str] = frozenset()
+DUMMY: FrozenSet[str] = frozenset(('__DUMMY__',))
+
+
+def _infer_schema(
+    cfg: _IndexSetting,
+    data: BufferLike,
+    schema: Dict[str, FrozenSet[str]],
+    path: Tuple[str, ...] = (),
+    level: int = -1,
+) -> None:
+    if cfg.max_depth and level >= cfg.max_depth:
+        return
+    ptag = path[-1] if path else None
+    for _, chunk in iter_chunks(cfg, data):
+        if ptag and chunk.tag not in schema[ptag]:
+            schema[ptag] = (schema[ptag] - DUMMY) | {chunk.tag}
+        if chunk.tag not in schema:
+            # assume container until proven otherwise
+            schema[chunk.tag] = DUMMY
+        if not schema[chunk.tag]:
+            continue
+        try:
+            _infer_schema(
+                cfg,
+                chunk.slice(chunk.buffer),
+                schema,
+                path=(*path, chunk.tag),
+                level=level + 1,
+            )
+        except _CollapseTag as exc:
+            if exc.tag in path:
+                raise
+        except Exception:
+            # content cannot be parsed as chunks, tag is a leaf
+            schema[chunk.tag] = EMPTY
+            # enclosing containers of the same tag become leaves as well
+            if chunk.tag in path:
+                raise _CollapseTag(chunk.tag)
 
 
-def generate_schema(cfg: _IndexSetting, data: bytes) -> Dict[str, Set[str]]:
-    EMPTY: FrozenSet[str] = frozenset()
-    DUMMY: FrozenSet[str] = frozenset(('__DUMMY__',))
+def generate_schema(cfg: _IndexSetting, data: BufferLike) -> Dict[str, Set[str]]:
+    """Infer schema from given data in a single pass.
 
+    Every tag is assumed to be a container until parsing its content fails.
+    Tags that were never seen with content are omitted from result.
+    """
     schema: Dict[str, FrozenSet[str]] = {}
+    try:
+        _infer_schema(cfg, data, schema)
+    except Exception as exc:
+        raise ValueError(
+            'Cannot create schema for given file with given configuration',
+        ) from exc
+    return {ptag: set(tags) for ptag, tags in schema.items() if tags != DUMMY}
 
-    # TODO: check if partial iterations are possible
-    while True:
-        cfg = replace(cfg, schema=schema, strict=True)
+
+def _has_nested_leaf(
+    cfg: _IndexSetting,
+    root: Iterable[Element],
+    schema: Dict[str, Set[str]],
+    leaves: Set[str],
+) -> bool:
+    """Check if any leaf in given tree holds chunks, as a container would.
+
+    Leaf tags found not to hold chunks are added to given set, and not
+    checked again, inferring would keep such tag as leaf anyway.
+    """
+    for elem in root:
+        if schema.get(elem.tag):
+            if _has_nested_leaf(cfg, elem, schema, leaves):
+                return True
+            continue
+        if elem.tag in leaves:
+            continue
+        chunk = elem.chunk
         try:
-            # generate schema for 1 level deeper
-            for _ in map_chunks(cfg, data, level=-1):
-                pass
-            return {ptag: set(tags) for ptag, tags in schema.items() if tags != DUMMY}
-        except MissingSchemaKey as miss:
-            schema[miss.tag] = DUMMY  # creates new copy
-        except MissingSchemaEntry as miss:
-            schema[miss.ptag] -= DUMMY
-            schema[miss.ptag] |= {miss.tag}
-        except Exception as exc:
-            # pylint: disable=no-member
-            assert hasattr(exc, 'ptag')
-            if schema.get(exc.ptag) == EMPTY:  # type: ignore
-                raise ValueError(
-                    'Cannot create schema for given file with given configuration',
-                )
-            schema[exc.ptag] = EMPTY  # type: ignore
+            nested = list(iter_chunks(cfg, memoryview(chunk.slice(chunk.buffer))))
+        except Exception:
+            # content cannot be parsed as chunks, tag is a leaf here as well
+            leaves.add(elem.tag)
+            continue
+        if nested:
+            return True
+    return False
+
+
+def map_nested(
+    cfg: _IndexSetting,
+    chunk: Chunk,
+    schemas: MutableMapping[str, Dict[str, Set[str]]],
+) -> Element:
+    """Map given chunk in place, with schema inferred from its content.
+
+    Inferred schemas are cached by chunk tag in given mapping, and reused for
+    chunks of the same tag as long as they cover the content, including
+    leaves of cached schema that hold chunks in given one.
+    Otherwise, schema is inferred again and merged into the cached one.
+    """
+    cached = schemas.get(chunk.tag)
+    if cached is not None:
+        strict = replace(cfg, schema=cached, strict=True)
+        try:
+            root = next(map_chunks(strict, chunk.buffer))
+            expand([root])
+            if not _has_nested_leaf(cfg, [root], cached, set()):
+                return root
+        except Exception:
+            # content not covered by cached schema
+            pass
+    schema = generate_schema(cfg, chunk.buffer)
+    merged = {tag: set(tags) for tag, tags in (cached or {}).items()}
+    for tag, tags in schema.items():
+        if tags:
+            merged.setdefault(tag, set()).update(tags)
+        else:
+            # leaves of given content are not mapped as containers
+            merged[tag] = set()
+    schemas[chunk.tag] = merged
+    return next(map_chunks(replace(cfg, schema=merged), chunk.buffer))
@@ -0,0 +1,115 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .element import Element
+
+DIGEST_SIZE = 16
+HASHED_ATTRIBS = ('path', 'gid', 'size')
+
+
+@dataclass
+class HashNode(object):
+    """Content hash of element, without the element data
+
+    digest: hash of tag and data for leaves, of tag and children digests otherwise
+
+    attribs: helper attributes identifying the element (path, gid, size)
+    """
+
+    tag: str
+    digest: str
+    attribs: Dict[str, Any]
+    children: List['HashNode'] = field(default_factory=list, repr=False)
+
+
+# kind of difference, old node, new node
+DiffEntry = Tuple[str, Optional[HashNode], Optional[HashNode]]
+
+
+def hash_element(elem: Element) -> HashNode:
+    """Hash element tree bottom-up, each chunk data is read only once."""
+    children = [hash_element(child) for child in elem]
+    digest = hashlib.blake2b(elem.tag.encode('ascii'), digest_size=DIGEST_SIZE)
+    if children:
+        for child in children:
+            digest.update(bytes.fromhex(child.digest))
+    else:
+        digest.update(elem.chunk.slice(elem.chunk.buffer))
+    attribs = {key: elem.attribs[key] for key in HASHED_ATTRIBS if key in elem.attribs}
+    return HashNode(elem.tag, digest.hexdigest(), attribs, children)
+
+
+def hash_tree(root: Iterable[Element]) -> List[HashNode]:
+    return [hash_element(elem) for elem in root]
+
+
+def _keyed(nodes: Sequence[HashNode]) -> Dict[Tuple[str, int], HashNode]:
+    # siblings are matched by path when given, by tag otherwise
+    counts: Dict[str, int] = {}
+    keyed = {}
+    for node in nodes:
+        name = node.attribs.get('path', node.tag)
+        counts[name] = counts.get(name, 0) + 1
+        keyed[(name, counts[name])] = node
+    return keyed
+
+
+def diff_trees(old: Sequence[HashNode], new: Sequence[HashNode]) -> Iterator[DiffEntry]:
+    """Compare two hash trees, subtrees with identical digests are skipped.
+
+    Yields ('added' | 'removed' | 'changed', old node, new node),
+    containers are reported as changed only when no child differs.
+    """
+    olds, news = _keyed(old), _keyed(new)
+    for key in [*olds, *(key for key in news if key not in olds)]:
+        onode, nnode = olds.get(key), news.get(key)
+        if onode is None:
+            yield 'added', None, nnode
+        elif nnode is None:
+            yield 'removed', onode, None
+        elif onode.digest != nnode.digest:
+            diffs: Iterator[DiffEntry] = iter(())
+            if onode.children and nnode.children:
+                diffs = diff_trees(onode.children, nnode.children)
+            first = next(diffs, None)
+            if first is None:
+                yield 'changed', onode, nnode
+                continue
+            yield first
+            yield from diffs
+
+
+def dump_hashes(nodes: Iterable[HashNode], stream: IO[str]) -> None:
+    """Write hash tree as JSON records, parents always precede their children."""
+    records: List[Tuple[int, str, str, Dict[str, Any]]] = []
+
+    def flatten(nodes: Iterable[HashNode], parent: int) -> None:
+        for node in nodes:
+            idx = len(records)
+            records.append((parent, node.tag, node.digest, node.attribs))
+            flatten(node.children, idx)
+
+    flatten(nodes, -1)
+    json.dump(records, stream, separators=(',', ':'))
+
+
+def load_hashes(stream: IO[str]) -> List[HashNode]:
+    nodes: List[HashNode] = []
+    roots: List[HashNode] = []
+    for parent, tag, digest, attribs in json.load(stream):
+        node = HashNode(tag, digest, attribs)
+        nodes.append(node)
+        (roots if parent < 0 else nodes[parent].children).append(node)
+    return roots
@@ -1,7 +1,7 @@
 from dataclasses import dataclass, replace
 from typing import Any, TypeVar
 
-from . import iterchunk, settings, tree
+from . import iterchunk, settings, stream, tree
 
 _SettingT = TypeVar('_SettingT', bound='_DefaultOverride')
 
@@ -22,8 +22,12 @@ class _ChunkPreset(settings._ChunkSetting, _DefaultOverride):
 
     # isort: off
     from .resource import (
+        read_chunk_at,
         read_chunks,
+        read_header_at,
+        write_chunk,
         write_chunks,
+        write_container,
     )
 
     # isort: on
@@ -36,11 +40,16 @@ class _ShellPreset(settings._IndexSetting, _ChunkPreset):
     find = staticmethod(tree.find)
     findall = staticmethod(tree.findall)
     findpath = staticmethod(tree.findpath)
+    iterfind = staticmethod(tree.iterfind)
     render = staticmethod(tree.render)
 
+    # bound to settings
+    stream_elements = stream.stream_elements
+
     # isort: off
     from .index import (
         map_chunks,
+        map_nested,
         generate_schema,
     )
 
@@ -1,10 +1,33 @@
 import logging
-from typing import Iterable, Iterator, Tuple, Union
+from contextlib import contextmanager
+from functools import lru_cache
+from struct import Struct
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from .align import align_read, align_write
-from .buffer import BufferLike
-from .chunk import Chunk
+import numpy as np
+import numpy.typing as npt
+
+from .align import align_read, align_write, calc_align
+from .buffer import BufferLike, Splicer
+from .chunk import (
+    Chunk,
+    OldSputmChunk,
+    SizeFixedChunk,
+    StructuredChunk,
+)
 from .settings import _ChunkSetting
+from .structured import StructuredTuple
 
 
 def read_chunks(
@@ -23,6 +46,138 @@ def read_chunks(
     assert offset == max_size
 
 
+def read_chunk_at(cfg: _ChunkSetting, buffer: BufferLike, offset: int = 0) -> Chunk:
+    """Read single chunk at given offset, slicing only its own bytes.
+
+    Buffer only needs to support slicing, e.g. `XorView` of mapped file.
+    """
+    if not isinstance(cfg.chunk, StructuredChunk):
+        return cfg.untag(buffer[offset:], 0)
+    hsize = cfg.chunk.size
+    size = cfg.chunk.unpack_from(buffer[offset : offset + hsize]).size
+    return cfg.untag(buffer[offset : offset + size], 0)
+
+
+def read_header_at(
+    cfg: _ChunkSetting, buffer: BufferLike, offset: int = 0
+) -> Tuple[str, int]:
+    """Tag and size of chunk at given offset, reading only its header."""
+    if not isinstance(cfg.chunk, StructuredChunk):
+        chunk = cfg.untag(buffer[offset:], 0)
+        return chunk.tag, len(chunk)
+    hsize = cfg.chunk.size
+    etag, size = cfg.chunk.unpack_from(buffer[offset : offset + hsize])
+    return etag.decode('ascii'), size
+
+
+class ChunkHeaders(NamedTuple):
+    hsize: int
+    offsets: npt.NDArray[np.int64]
+    tags: List[str]
+    sizes: npt.NDArray[np.int64]
+
+
+class _HeaderLayout(NamedTuple):
+    unpack_from: Callable[..., Tuple[Any, ...]]
+    size: int
+    etag_first: bool
+    size_fix: int
+
+
+@lru_cache(maxsize=None)
+def _header_layout(
+    factory: Union[SizeFixedChunk, OldSputmChunk]
+) -> Optional[_HeaderLayout]:
+    header = factory._struct
+    if not isinstance(header, StructuredTuple):
+        return None
+    structure: Struct = header._structure
+    etag_first = tuple(header._fields) == ('etag', 'size')
+    if not etag_first and tuple(header._fields) != ('size', 'etag'):
+        return None
+    return _HeaderLayout(
+        structure.unpack_from, structure.size, etag_first, factory.size_fix
+    )
+
+
+def scan_chunks(
+    cfg: _ChunkSetting,
+    buffer: BufferLike,
+    offset: int = 0,
+) -> Optional[ChunkHeaders]:
+    """Scan sibling chunk headers in given buffer.
+
+    Only well-formed sequences are scanned, None is returned when anything
+    needs the careful reader: unknown header format, null or non-ASCII tags,
+    truncated or undersized chunks, non-zero padding or skip bytes.
+    """
+    if not isinstance(cfg.chunk, (SizeFixedChunk, OldSputmChunk)):
+        return None
+    layout = _header_layout(cfg.chunk)
+    if layout is None:
+        return None
+    unpack_from, hsize, etag_first, size_fix = layout
+    align, skip_byte = cfg.align, cfg.skip_byte
+    max_size = len(buffer)
+    offsets: List[int] = []
+    tags: List[str] = []
+    sizes: List[int] = []
+    while offset < max_size:
+        if offset + hsize > max_size or buffer[offset] == skip_byte:
+            return None
+        etag, size = unpack_from(buffer, offset)
+        if not etag_first:
+            etag, size = size, etag
+        size += size_fix
+        end = offset + size
+        if size < hsize or end > max_size or not any(etag):
+            return None
+        try:
+            tag = etag.decode('ascii')
+        except UnicodeDecodeError:
+            return None
+        offsets.append(offset)
+        tags.append(tag)
+        sizes.append(size)
+        pad = (align - end) % align
+        if pad and (end + pad > max_size or any(buffer[end : end + pad])):
+            return None
+        offset = end + pad
+    return ChunkHeaders(
+        hsize,
+        np.array(offsets, dtype=np.int64),
+        tags,
+        np.array(sizes, dtype=np.int64),
+    )
+
+
+def iter_chunks(
+    cfg: _ChunkSetting,
+    buffer: BufferLike,
+    offset: int = 0,
+) -> Iterator[Tuple[int, Chunk]]:
+    """Same as `read_chunks`, headers are scanned up front when possible."""
+    data = memoryview(buffer)
+    headers = scan_chunks(cfg, data, offset=offset)
+    if headers is None:
+        if cfg.stats:
+            cfg.stats.event('scan_fallback')
+        yield from read_chunks(cfg, data, offset=offset)
+        return
+    hsize = headers.hsize
+    for offset, tag, size in zip(
+        headers.offsets.tolist(), headers.tags, headers.sizes.tolist()
+    ):
+        chunk = Chunk(
+            tag,
+            data[offset : offset + size],
+            Splicer(hsize, size - hsize),
+            zero_copy=cfg.zero_copy,
+        )
+        cfg.check_header(chunk)
+        yield offset, chunk
+
+
 def workaround_x80(cfg: _ChunkSetting, buffer: BufferLike, offset: int = 0) -> int:
     """WORKAROUND: in Pajama Sam 2, some DIGI chunks are off by 1.
     header appears as '\\x80DIG' and index indicate they should start 1 byte afterwards.
@@ -32,6 +187,9 @@ def workaround_x80(cfg: _ChunkSetting, buffer: BufferLike, offset: int = 0) -> i
         getattr(cfg, 'logger', logging).warning(
             f'found \\x{cfg.skip_byte:02x} between chunks, skipping 1 byte...',
         )
+        stats = getattr(cfg, 'stats', None)
+        if stats:
+            stats.event('workaround_x80')
         return offset + 1
     return offset
 
@@ -43,3 +201,39 @@ def write_chunks(cfg: _ChunkSetting, chunks: Iterable[Union[bytes, Chunk]]) -> b
         assert chunk
         stream += align_write(bytes(chunk), align=cfg.align)
     return bytes(stream)
+
+
+def _write_all(stream: IO[bytes], data: BufferLike) -> int:
+    # unbuffered streams may write only part of given data
+    view = memoryview(data)
+    while view:
+        view = view[stream.write(view) :]
+    return len(data)
+
+
+def write_chunk(
+    cfg: _ChunkSetting,
+    stream: IO[bytes],
+    tag: str,
+    data: BufferLike,
+) -> int:
+    """Write single chunk to given stream, padded to data alignment."""
+    header = cfg.mkheader(tag, len(data))
+    size = len(header) + len(data)
+    pad = bytes(calc_align(size, cfg.align))
+    return sum(_write_all(stream, part) for part in (header, data, pad))
+
+
+@contextmanager
+def write_container(cfg: _ChunkSetting, stream: IO[bytes], tag: str) -> Iterator[None]:
+    """Write container chunk to given seekable stream.
+    Header is written with placeholder size and patched once content is written.
+    """
+    start = stream.tell()
+    hsize = _write_all(stream, cfg.mkheader(tag, 0))
+    yield
+    end = stream.tell()
+    stream.seek(start)
+    _write_all(stream, cfg.mkheader(tag, end - start - hsize))
+    stream.seek(end)
+    _write_all(stream, bytes(calc_align(end - start, cfg.align)))
@@ -1,5 +1,5 @@
 import logging
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from operator import attrgetter
 from struct import Struct
 from typing import Mapping, Optional, Set
@@ -7,6 +7,8 @@ from typing import Mapping, Optional, Set
 from .buffer import BufferLike
 from .chunk import Chunk, ChunkFactory, ChunkHeader, OldSputmChunk, SizeFixedChunk, StructuredChunk
 from .structured import StructuredTuple
+from .stats import ParseStats
+from .verify import VerifyPolicy, policy
 
 SCUMM_CHUNK_HEADER = StructuredTuple(('size', 'etag'), Struct('<I2s'), ChunkHeader)
 IFF_CHUNK_HEADER = StructuredTuple(('etag', 'size'), Struct('>4sI'), ChunkHeader)
@@ -25,26 +27,54 @@ class _ChunkSetting(ChunkFactory):
 
     chunk: stream <-> Chunk (default IFF_CHUNK_EX) -
         factory to read/write chunk header
+
+    zero_copy: bool (default False) -
+        if set to True, chunk data is a read-only memoryview into parent buffer
+
+    verify: VerifyPolicy (default shared policy) -
+        which re-encoded headers and chunks are compared with the original
+
+    stats: ParseStats (default None) -
+        if given, parse counters and timings are collected into it
     """
 
     align: int = 2
     chunk: ChunkFactory = IFF_CHUNK_EX
     skip_byte: Optional[int] = None
     logger: logging.Logger = logging.root
+    zero_copy: bool = False
+    verify: VerifyPolicy = field(default=policy, repr=False, compare=False)
+    stats: Optional[ParseStats] = field(default=None, repr=False, compare=False)
 
     def untag(self, buffer: BufferLike, offset: int = 0) -> Chunk:
         """Read chunk from given buffer."""
         chunk = self.chunk.untag(buffer, offset=offset)
-        if self.chunk.mktag(chunk.tag, chunk.data) != bytes(chunk):
-            self.logger.warning('Possible mismatch when re-encoding {}'.format(chunk))
+        if self.zero_copy:
+            chunk = replace(chunk, zero_copy=True)
+        self.check_header(chunk)
         return chunk
 
-    def mktag(self, tag: str, data: bytes) -> bytes:
+    def check_header(self, chunk: Chunk) -> None:
+        """Warn if chunk header would not re-encode to the same bytes."""
+        if not self.verify('untag'):
+            return
+        # compare headers only, data is identical by construction
+        # and touching it would page in the whole chunk
+        header = self.chunk.mkheader(chunk.tag, chunk.slice.size)
+        if header != chunk.buffer[: chunk.slice.offset]:
+            self.logger.warning('Possible mismatch when re-encoding {}'.format(chunk))
+
+    def mktag(self, tag: str, data: BufferLike) -> bytes:
         """Create chunk bytes from given tag and data."""
         buffer = self.chunk.mktag(tag, data)
-        assert attrgetter('tag', 'data')(self.chunk.untag(buffer)) == (tag, data)
+        if self.verify('mktag'):
+            assert attrgetter('tag', 'data')(self.chunk.untag(buffer)) == (tag, data)
         return buffer
 
+    def mkheader(self, tag: str, size: int) -> bytes:
+        """Create chunk header bytes for given tag and data size."""
+        return self.chunk.mkheader(tag, size)
+
 
 @dataclass(frozen=True)
 class _IndexSetting(_ChunkSetting):
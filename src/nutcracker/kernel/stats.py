@@ -0,0 +1,81 @@
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass
+class TagStats(object):
+    count: int = 0
+    bytes: int = 0
+    time: float = 0.0
+    warnings: int = 0
+
+
+@dataclass(eq=False)
+class ParseStats(object):
+    """Parse instrumentation, collected when set on chunk settings
+
+    tags: counters by (tag, depth) -
+        number of chunks, bytes scanned (headers included),
+        time spent reading headers and creating elements, schema warnings
+
+    events: counters of hot-path events -
+        `schema_warning`, `workaround_x80` and `scan_fallback`
+        (sibling headers were read by the careful reader)
+    """
+
+    tags: Dict[Tuple[str, int], TagStats] = field(default_factory=dict)
+    events: Counter[str] = field(default_factory=Counter)
+
+    def _entry(self, tag: str, depth: int) -> TagStats:
+        entry = self.tags.get((tag, depth))
+        if entry is None:
+            entry = self.tags[(tag, depth)] = TagStats()
+        return entry
+
+    def chunk(self, tag: str, depth: int, size: int, elapsed: float) -> None:
+        entry = self._entry(tag, depth)
+        entry.count += 1
+        entry.bytes += size
+        entry.time += elapsed
+
+    def warning(self, tag: str, depth: int) -> None:
+        self._entry(tag, depth).warnings += 1
+        self.events['schema_warning'] += 1
+
+    def event(self, name: str) -> None:
+        self.events[name] += 1
+
+    def merge(self, other: 'ParseStats') -> None:
+        """Add statistics collected separately, e.g. in worker processes."""
+        for (tag, depth), stats in other.tags.items():
+            entry = self._entry(tag, depth)
+            entry.count += stats.count
+            entry.bytes += stats.bytes
+            entry.time += stats.time
+            entry.warnings += stats.warnings
+        self.events.update(other.events)
+
+    def report(self) -> Dict[str, Any]:
+        """Collected statistics, tags are ordered by time spent."""
+        rows = sorted(self.tags.items(), key=lambda item: -item[1].time)
+        return {
+            'tags': [
+                {'tag': tag, 'depth': depth, **vars(entry)}
+                for (tag, depth), entry in rows
+            ],
+            'events': dict(self.events),
+            'total': {
+                'count': sum(entry.count for entry in self.tags.values()),
+                'time': sum(entry.time for entry in self.tags.values()),
+            },
+        }
+
+    def dump(self, path: Optional[str] = None) -> str:
+        """Serialize report as JSON, also written to given path if any."""
+        output = json.dumps(self.report(), indent=2)
+        if path:
+            with open(path, 'w') as stream:
+                stream.write(output)
+        return output
@@ -0,0 +1,115 @@
+from typing import IO, Any, Callable, Container, Dict, Iterator, Optional
+
+from .align import assert_zero, calc_align
+from .buffer import Splicer, UnexpectedBufferSize
+from .chunk import NULL_TAG, Chunk, SizeFixedChunk, StructuredChunk
+from .element import Element
+from .index import check_schema, create_element, exception_ptag_context, map_chunks
+from .settings import _IndexSetting
+
+
+def read_exact(stream: IO[bytes], size: int) -> bytes:
+    """Read given number of bytes, fewer only when stream ends."""
+    parts = []
+    while size > 0:
+        part = stream.read(size)
+        if not part:
+            break
+        parts.append(part)
+        size -= len(part)
+    return b''.join(parts)
+
+
+def stream_elements(
+    cfg: _IndexSetting,
+    stream: IO[bytes],
+    streamed: Container[str] = frozenset(),
+    parent: Optional[Element] = None,
+    level: int = 0,
+    extra: Optional[Callable[[Optional[Element], Chunk, int], Dict[str, Any]]] = None,
+    size: Optional[int] = None,
+) -> Iterator[Element]:
+    """Parse chunks from given stream as their bytes arrive, in tree order.
+
+    Containers with streamed tags are not read whole, their element holds
+    only the chunk header and is followed by the elements of its children.
+    Other chunks are read whole, with children mapped on access as usual.
+
+    Stream is read until end, or given size, and need not be seekable.
+    Only a single chunk is kept by the parser at a time.
+    """
+    factory = cfg.chunk
+    if not isinstance(factory, StructuredChunk):
+        raise ValueError(f'Cannot stream chunks with given factory: {factory}')
+    hsize = factory.size
+    ptag = parent.tag if parent else None
+    offset = 0
+    with exception_ptag_context(ptag):
+        while size is None or offset < size:
+            header = read_exact(stream, hsize)
+            if not header and size is None:
+                return
+            if cfg.skip_byte is not None and header[0] == cfg.skip_byte:
+                cfg.logger.warning(
+                    f'found \\x{cfg.skip_byte:02x} between chunks, skipping 1 byte...',
+                )
+                header = header[1:] + read_exact(stream, 1)
+                offset += 1
+            if len(header) != hsize:
+                raise UnexpectedBufferSize(hsize, len(header), header)
+            etag, csize = factory.unpack_from(header)
+            tag = etag.decode('ascii')
+            rest = None
+            if etag == NULL_TAG and isinstance(factory, SizeFixedChunk):
+                # null chunk spans rest of container, as when mapped
+                if size is None:
+                    rest = stream.read()
+                else:
+                    rest = read_exact(stream, size - offset - hsize)
+                csize = hsize + len(rest)
+
+            if tag in streamed:
+                chunk = Chunk(tag, header, Splicer(hsize, 0))
+                check_schema(cfg, ptag, chunk.tag, level=level)
+                elem = create_element(
+                    offset,
+                    chunk,
+                    **(extra(parent, chunk, offset) if extra else {}),
+                )
+                elem.attribs['size'] = csize - hsize
+                yield elem
+                yield from stream_elements(
+                    cfg,
+                    stream,
+                    streamed,
+                    parent=elem,
+                    level=level + 1,
+                    extra=extra,
+                    size=csize - hsize,
+                )
+            else:
+                if rest is None:
+                    rest = read_exact(stream, csize - hsize)
+                chunk = cfg.untag(header + rest)
+                check_schema(cfg, ptag, chunk.tag, level=level)
+                elem = create_element(
+                    offset,
+                    chunk,
+                    **(extra(parent, chunk, offset) if extra else {}),
+                )
+                yield elem.content(
+                    map_chunks(
+                        cfg,
+                        chunk.slice(chunk.buffer),
+                        parent=elem,
+                        level=level + 1,
+                        extra=extra,
+                    ),
+                )
+            offset += csize
+
+            if size is None or offset < size:
+                # padding may be missing at end of stream
+                pad = read_exact(stream, calc_align(offset, cfg.align))
+                offset += len(assert_zero(pad))
+        assert offset == size, (offset, size)
@@ -0,0 +1,231 @@
+import os
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+import numpy.typing as npt
+
+from .buffer import BufferLike, Splicer
+from .cache import ElementRecord, dump_records
+from .chunk import Chunk
+from .element import Element
+from .index import map_records
+from .settings import _IndexSetting
+from .tree import compile_tag
+
+NO_GID = np.iinfo(np.int64).min
+
+
+@dataclass(frozen=True)
+class ElementTable(object):
+    """Struct-of-arrays representation of element tree over single buffer
+
+    Rows are in tree order (depth first), parents always precede their children.
+
+    tags, names: interned tag and path basename tables
+
+    attrs: extra attributes of elements, only `path` and `gid` are kept
+
+    tag, name: codes into the interned tables
+
+    parent: row of parent element, -1 for top level elements
+
+    offset: chunk offset relative to parent data, as in element attribs
+
+    start: absolute chunk offset in buffer
+
+    end: row following last descendant
+
+    hsize, size: chunk header and data sizes
+
+    gid: gid attribute, NO_GID where missing
+    """
+
+    buffer: BufferLike
+    tags: Sequence[str]
+    names: Sequence[str]
+    attrs: Tuple[str, ...]
+    tag: npt.NDArray[np.int32]
+    name: npt.NDArray[np.int32]
+    parent: npt.NDArray[np.int32]
+    depth: npt.NDArray[np.int32]
+    offset: npt.NDArray[np.int64]
+    start: npt.NDArray[np.int64]
+    end: npt.NDArray[np.int32]
+    hsize: npt.NDArray[np.int32]
+    size: npt.NDArray[np.int64]
+    gid: npt.NDArray[np.int64]
+
+    @classmethod
+    def from_records(
+        cls,
+        buffer: BufferLike,
+        records: Iterable[ElementRecord],
+    ) -> 'ElementTable':
+        tags: Dict[str, int] = {}
+        names: Dict[str, int] = {}
+        keys = ('tag', 'name', 'parent', 'depth', 'offset', 'start', 'end')
+        columns: Dict[str, List[int]] = {
+            key: [] for key in (*keys, 'hsize', 'size', 'gid')
+        }
+        attrs: Tuple[str, ...] = ()
+        for row, (parent, tag, offset, hsize, size, attribs) in enumerate(records):
+            if not row:
+                attrs = tuple(attribs)
+            gid = attribs.get('gid')
+            start = offset
+            depth = 0
+            if parent >= 0:
+                start += columns['start'][parent] + columns['hsize'][parent]
+                depth = columns['depth'][parent] + 1
+            name = os.path.basename(attribs.get('path') or '')
+            columns['tag'].append(tags.setdefault(tag, len(tags)))
+            columns['name'].append(names.setdefault(name, len(names)))
+            columns['parent'].append(parent)
+            columns['depth'].append(depth)
+            columns['offset'].append(offset)
+            columns['start'].append(start)
+            columns['end'].append(row + 1)
+            columns['hsize'].append(hsize)
+            columns['size'].append(size)
+            columns['gid'].append(NO_GID if gid is None else gid)
+
+        # extend subtree ends from leaves up, children always follow parents
+        end, parents = columns['end'], columns['parent']
+        for row in reversed(range(len(end))):
+            if parents[row] >= 0:
+                end[parents[row]] = max(end[parents[row]], end[row])
+
+        dtypes = {
+            'tag': np.int32,
+            'name': np.int32,
+            'parent': np.int32,
+            'depth': np.int32,
+            'end': np.int32,
+            'hsize': np.int32,
+        }
+        arrays: Dict[str, Any] = {
+            key: np.array(values, dtype=dtypes.get(key, np.int64))
+            for key, values in columns.items()
+        }
+        return cls(buffer, list(tags), list(names), attrs, **arrays)
+
+    @classmethod
+    def from_buffer(
+        cls,
+        cfg: _IndexSetting,
+        buffer: BufferLike,
+        extra: Optional[Callable[..., Dict[str, Any]]] = None,
+    ) -> 'ElementTable':
+        """Scan chunk tree of given buffer straight into table columns.
+
+        Same table as from elements mapped with given settings,
+        no element is created (see `map_records`).
+        """
+        return cls.from_records(buffer, map_records(cfg, buffer, extra=extra))
+
+    @classmethod
+    def from_elements(
+        cls,
+        buffer: BufferLike,
+        root: Iterable[Element],
+    ) -> 'ElementTable':
+        return cls.from_records(buffer, dump_records(root))
+
+    def __len__(self) -> int:
+        return len(self.tag)
+
+    def match(self, tag: str) -> npt.NDArray[np.bool_]:
+        """Mask of rows with tags matching given tag pattern."""
+        match = compile_tag(tag)
+        codes = [code for code, etag in enumerate(self.tags) if match(etag)]
+        return np.isin(self.tag, codes)
+
+    def match_any(self, tags: Iterable[str]) -> npt.NDArray[np.bool_]:
+        """Mask of rows with any of given literal tags."""
+        tags = set(tags)
+        codes = [code for code, etag in enumerate(self.tags) if etag in tags]
+        return np.isin(self.tag, codes)
+
+    def children(self, row: int = -1) -> npt.NDArray[np.intp]:
+        """Rows of children of given row, top level elements by default."""
+        if row < 0:
+            return np.flatnonzero(self.parent < 0)
+        subtree = self.parent[row + 1 : self.end[row]]
+        return np.flatnonzero(subtree == row) + row + 1
+
+    def findall(self, tag: str, parent: int = -1) -> npt.NDArray[np.intp]:
+        """Rows of children of given parent row matching given tag pattern."""
+        rows = self.children(parent)
+        found: npt.NDArray[np.intp] = rows[self.match(tag)[rows]]
+        return found
+
+    def descend(self, targets: Set[str], trail: Set[str]) -> npt.NDArray[np.intp]:
+        """Rows of target tags reachable from top level through trail tags.
+
+        Same as recursively walking trail containers, without descending
+        into targets, e.g. `get_rooms` and `get_scripts`.
+        """
+        passable = self.match_any(trail - targets)
+        reachable = self.parent < 0
+        for level in range(1, int(self.depth.max(initial=0)) + 1):
+            rows = np.flatnonzero(self.depth == level)
+            prows = self.parent[rows]
+            reachable[rows] = reachable[prows] & passable[prows]
+        return np.flatnonzero(reachable & self.match_any(targets & trail))
+
+    def path(self, row: int) -> str:
+        parts: List[str] = []
+        while row >= 0:
+            parts.append(self.names[self.name[row]])
+            row = self.parent[row]
+        return os.path.join(*reversed(parts))
+
+    def element(self, row: int, zero_copy: bool = False) -> Element:
+        """Create element view of given row, children are created on access."""
+        start, hsize, size = (
+            int(self.start[row]),
+            int(self.hsize[row]),
+            int(self.size[row]),
+        )
+        chunk = Chunk(
+            self.tags[self.tag[row]],
+            memoryview(self.buffer)[start : start + hsize + size],
+            Splicer(hsize, size),
+            zero_copy=zero_copy,
+        )
+        attribs: Dict[str, Any] = {'offset': int(self.offset[row]), 'size': size}
+        if 'path' in self.attrs:
+            attribs['path'] = self.path(row)
+        if 'gid' in self.attrs:
+            gid = int(self.gid[row])
+            attribs['gid'] = None if gid == NO_GID else gid
+        children = self.children(row)
+        return Element(
+            chunk,
+            attribs,
+            [],
+            _pending=(self.element(int(child), zero_copy) for child in children),
+        )
+
+    def elements(
+        self,
+        rows: Optional[Iterable[int]] = None,
+        zero_copy: bool = False,
+    ) -> Iterator[Element]:
+        """Create element views for given rows, top level elements by default."""
+        if rows is None:
+            rows = self.children()
+        for row in rows:
+            yield self.element(int(row), zero_copy=zero_copy)
@@ -1,55 +1,199 @@
 import io
-import os
+import itertools
 import sys
-from typing import IO, Iterator, Optional
+from functools import lru_cache
+from typing import (
+    IO,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
-from parse import parse
+import parse
 
-from .element import Element, ElementTree
+from .element import Element, ElementTree, TransientElement
 
 
-def findall(tag: str, root: ElementTree) -> Iterator[Element]:
+def is_pattern(tag: str) -> bool:
+    return '{' in tag or '}' in tag
+
+
+@lru_cache(maxsize=None)
+def compile_tag(tag: str) -> Callable[[str], bool]:
+    """Create matcher for given tag pattern (e.g. `IM{:02x}`).
+    Literal tags are compared directly, matching is case insensitive as in `parse`.
+    """
+    if not is_pattern(tag):
+        literal = tag.lower()
+        return lambda etag: etag.lower() == literal
+    pattern = parse.compile(tag)
+    return lambda etag: pattern.parse(etag, evaluate_result=False) is not None
+
+
+def findall(tag: str, root: ElementTree, index: bool = False) -> Iterator[Element]:
+    """Find children of root matching given tag pattern.
+    With index, matches are kept on root element and reused by later lookups.
+    """
     if not root:
         return
+    match = compile_tag(tag)
+    if index and isinstance(root, Element):
+        yield from root.lookup(tag if is_pattern(tag) else tag.lower(), match)
+        return
     for elem in root:
-        if parse(tag, elem.tag, evaluate_result=False):
+        if match(elem.tag):
             yield elem
 
 
-def find(tag: str, root: ElementTree) -> Optional[Element]:
-    return next(findall(tag, root), None)
+def find(tag: str, root: ElementTree, index: bool = False) -> Optional[Element]:
+    return next(findall(tag, root, index=index), None)
+
+
+class PathStep(NamedTuple):
+    match: Callable[[str], bool]
+    descendant: bool = False
+    gid: Optional[int] = None
+
+    def __call__(self, elem: Element) -> bool:
+        if self.gid is not None and elem.attribs.get('gid') != self.gid:
+            return False
+        return self.match(elem.tag)
+
+
+def _any_tag(etag: str) -> bool:
+    return True
+
+
+def _compile_step(step: str, descendant: bool) -> PathStep:
+    tag, sep, pred = step.partition('[')
+    gid = None
+    if sep:
+        key, eq, value = pred.rstrip(']').partition('=')
+        if not pred.endswith(']') or key.strip() != 'gid' or not eq:
+            raise ValueError(f'Unsupported predicate in path step: {step}')
+        gid = int(value, 0)
+    match = _any_tag if tag == '*' else compile_tag(tag)
+    return PathStep(match, descendant, gid)
+
+
+@lru_cache(maxsize=None)
+def compile_path(path: str) -> Tuple[PathStep, ...]:
+    """Compile path query to sequence of steps.
+
+    Steps are separated by `/` and match tag patterns as in `findall`,
+    `*` matches any tag, `//` searches descendants at any depth,
+    `TAG[gid=N]` also requires given gid attribute.
+    `.` is ignored and `..` drops previous step, as in `os.path.normpath`.
+    """
+    steps: List[PathStep] = []
+    descendant = False
+    for part in path.split('/'):
+        if not part:
+            # leading or repeated separator
+            descendant = bool(steps) or path.startswith('//')
+            continue
+        if part == '.':
+            continue
+        if part == '..':
+            if steps:
+                steps.pop()
+            continue
+        steps.append(_compile_step(part, descendant))
+        descendant = False
+    return tuple(steps)
+
+
+def _select(steps: Sequence[PathStep], root: ElementTree) -> Iterator[Element]:
+    step, rest = steps[0], steps[1:]
+    for elem in root or ():
+        if step(elem):
+            if rest:
+                yield from _select(rest, elem)
+            else:
+                yield elem
+        if step.descendant:
+            yield from _select(steps, elem)
+
+
+def iterfind(path: str, root: ElementTree) -> Iterator[Element]:
+    """Find all elements matching given path query under root, in tree order."""
+    steps = compile_path(path)
+    if not steps:
+        if root:
+            yield root  # type: ignore
+        return
+    seen: Set[int] = set()
+    for elem in _select(steps, root):
+        if id(elem) not in seen:
+            seen.add(id(elem))
+            yield elem
 
 
 def findpath(path: str, root: Optional[Element]) -> Optional[Element]:
-    path = os.path.normpath(path)
-    if not path or path == '.':
+    if not compile_path(path):
         return root
-    dirname, basename = os.path.split(path)
-    return find(basename, findpath(dirname, root))
+    return next(iterfind(path, root), None)
+
+
+RENDER_BATCH_SIZE = 1024
+
+
+def _render_lines(
+    element: Element,
+    level: int,
+    max_depth: Optional[int],
+) -> Iterator[str]:
+    attribs = ''.join(
+        f' {key}="{value}"'
+        for key, value in element.attribs.items()
+        if value is not None
+    )
+    indent = '    ' * level
+    # children beyond depth limit are not rendered, nor parsed
+    if max_depth is not None and max_depth <= 0:
+        children: Iterable[Element] = ()
+    elif isinstance(element, TransientElement):
+        # children are released once rendered, peek to tell if there are any
+        pending = iter(element)
+        first = next(pending, None)
+        children = () if first is None else itertools.chain([first], pending)
+    else:
+        children = element.children
+    if not children:
+        yield f'{indent}<{element.tag}{attribs} />\n'
+        return
+    yield f'{indent}<{element.tag}{attribs}>\n'
+    depth = None if max_depth is None else max_depth - 1
+    for elem in children:
+        yield from _render_lines(elem, level + 1, depth)
+    yield f'{indent}</{element.tag}>\n'
 
 
 def render(
     element: Optional[Element],
     level: int = 0,
     stream: IO[str] = sys.stdout,
+    max_depth: Optional[int] = None,
 ) -> None:
+    """Write element tree as XML to given stream.
+
+    Lines are written in batches, elements nested deeper than `max_depth`
+    levels below given element are omitted.
+    """
     if not element:
         return
-    attribs = ''.join(
-        f' {key}="{value}"'
-        for key, value in element.attribs.items()
-        if value is not None
-    )
-    indent = '    ' * level
-    closing = '' if element.children else ' /'
-    print(f'{indent}<{element.tag}{attribs}{closing}>', file=stream)
-    if element.children:
-        for elem in element.children:
-            render(elem, level=level + 1, stream=stream)
-        print(f'{indent}</{element.tag}>', file=stream)
+    lines = _render_lines(element, level, max_depth)
+    for batch in iter(lambda: list(itertools.islice(lines, RENDER_BATCH_SIZE)), []):
+        stream.write(''.join(batch))
 
 
-def renders(element: Optional[Element]) -> str:
+def renders(element: Optional[Element], max_depth: Optional[int] = None) -> str:
     with io.StringIO() as stream:
-        render(element, stream=stream)
+        render(element, stream=stream, max_depth=max_depth)
         return stream.getvalue()
@@ -0,0 +1,59 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict
+
+
+class VerifyMode(str, Enum):
+    OFF = 'off'
+    SAMPLED = 'sampled'
+    FULL = 'full'
+
+
+@dataclass(eq=False)
+class VerifyPolicy(object):
+    """Round-trip self-checks of encoders and decoders
+
+    mode: VerifyMode (default FULL) -
+        OFF skips all checks, SAMPLED checks 1 in `rate` items of each kind.
+        Only the explicit re-checks consulting the policy are affected,
+        contracts (deal) are global and left to the application.
+
+    rate: int (default 100) -
+        sampling interval used in SAMPLED mode
+
+    verified, skipped: number of items checked or not, by kind
+    """
+
+    mode: VerifyMode = VerifyMode.FULL
+    rate: int = 100
+    verified: Counter[str] = field(default_factory=Counter)
+    skipped: Counter[str] = field(default_factory=Counter)
+
+    def __call__(self, kind: str) -> bool:
+        """Decide whether next item of given kind should be verified."""
+        if self.mode == VerifyMode.FULL or (
+            self.mode == VerifyMode.SAMPLED
+            and (self.verified[kind] + self.skipped[kind]) % self.rate == 0
+        ):
+            self.verified[kind] += 1
+            return True
+        self.skipped[kind] += 1
+        return False
+
+    def configure(self, mode: VerifyMode, rate: int = 100) -> None:
+        """Switch mode and sampling rate of re-checks."""
+        if rate < 1:
+            raise ValueError(f'Sampling rate should be positive, got {rate}')
+        self.mode = VerifyMode(mode)
+        self.rate = rate
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        return {
+            kind: {'verified': self.verified[kind], 'skipped': self.skipped[kind]}
+            for kind in sorted(self.verified.keys() | self.skipped.keys())
+        }
+
+
+# shared by presets and codecs unless given otherwise
+policy = VerifyPolicy()
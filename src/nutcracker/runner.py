@@ -1,5 +1,7 @@
+import deal
 import typer
 
+from nutcracker.kernel.verify import VerifyMode, policy
 from nutcracker.smush import runner as smush
 from nutcracker.sputm import runner as sputm
 
@@ -7,5 +9,31 @@ app = typer.Typer()
 app.add_typer(smush.app, name='smush')
 app.add_typer(sputm.app, name='sputm')
 
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    verify: VerifyMode = typer.Option(
+        VerifyMode.FULL,
+        '--verify',
+        help='Round-trip self-checks to perform, off also skips contract checks',
+    ),
+    sample_rate: int = typer.Option(
+        100, '--sample-rate', help='Verify 1 in N items when sampled'
+    ),
+) -> None:
+    policy.configure(verify, sample_rate)
+    # contracts are checked process-wide, only turned off along with all checks
+    if verify == VerifyMode.OFF:
+        deal.disable()
+    if verify != VerifyMode.FULL:
+        ctx.call_on_close(report_verified)
+
+
+def report_verified() -> None:
+    for kind, counts in policy.report().items():
+        print(f'{kind}: verified {counts["verified"]}, skipped {counts["skipped"]}')
+
+
 if __name__ == "__main__":
     app()
@@ -1,11 +1,12 @@
 import itertools
-from typing import Any, Dict, Iterator, NamedTuple, Optional
+from typing import IO, Any, Callable, Dict, Iterator, NamedTuple, Optional
 
+from nutcracker.kernel.buffer import BufferLike
 from nutcracker.smush import ahdr
-from nutcracker.smush.element import read_data, read_elements
+from nutcracker.smush.element import check_tag, read_data, read_elements
 from nutcracker.smush.preset import smush
 from nutcracker.smush.types import Chunk, Element
-from nutcracker.utils.fileio import read_file
+from nutcracker.utils.fileio import map_file
 
 
 class SmushAnimation(NamedTuple):
@@ -33,7 +34,10 @@ def verify_maxframe(
 
 
 def parse(root: Element) -> SmushAnimation:
-    anim = read_elements('ANIM', root)
+    return parse_elements(read_elements('ANIM', root))
+
+
+def parse_elements(anim: Iterator[Element]) -> SmushAnimation:
     header = ahdr.from_bytes(read_data('AHDR', next(anim)))
 
     frames = verify_nframes(verify_maxframe(anim, header.v2.maxframe), header.nframes)
@@ -46,7 +50,7 @@ def compose(header: ahdr.AnimationHeader, frames: Iterator[bytes]) -> bytes:
     return smush.mktag('ANIM', smush.write_chunks(itertools.chain([bheader], frames)))
 
 
-def from_bytes(resource: bytes) -> Element:
+def frame_id_factory() -> Callable[[Optional[Element], Chunk, int], Dict[str, Any]]:
     it = itertools.count()
 
     def set_frame_id(
@@ -58,8 +62,26 @@ def from_bytes(resource: bytes) -> Element:
             return {}
         return {'id': next(it)}
 
-    return next(smush.map_chunks(resource, extra=set_frame_id))
+    return set_frame_id
+
+
+def from_bytes(resource: BufferLike, **kwargs: Any) -> Element:
+    return next(smush(**kwargs).map_chunks(resource, extra=frame_id_factory()))
+
+
+def from_path(path: str, **kwargs: Any) -> Element:
+    return from_bytes(map_file(path), **kwargs)
 
 
-def from_path(path: str) -> Element:
-    return from_bytes(read_file(path))
+def from_stream(stream: IO[bytes], **kwargs: Any) -> SmushAnimation:
+    """Parse animation from stream, frames are read as they are iterated."""
+    elements = smush(**kwargs).stream_elements(
+        stream,
+        streamed={'ANIM'},
+        extra=frame_id_factory(),
+    )
+    root = next(elements, None)
+    if root is None:
+        raise ValueError('expected tag to be ANIM but stream is empty')
+    check_tag('ANIM', root)
+    return parse_elements(elements)
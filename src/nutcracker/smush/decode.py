@@ -109,7 +109,11 @@ def generate_frames(
 
 
 def decode_nut(root: Element, output_dir: str) -> None:
-    header, frames = anim.parse(root)
+    export_nut(anim.parse(root), output_dir)
+
+
+def export_nut(video: anim.SmushAnimation, output_dir: str) -> None:
+    header, frames = video
     os.makedirs(output_dir, exist_ok=True)
     chars = [ctx.screen for ctx in generate_frames(header, frames, DECODE_FRAME_IMAGE)]
     lchars = [(loc.x1, loc.y1, image.convert_to_pil_image(im)) for loc, im in chars]
@@ -129,7 +133,11 @@ def decode_nut(root: Element, output_dir: str) -> None:
 
 
 def decode_san(root: Element, output_dir: str) -> None:
-    header, frames = anim.parse(root)
+    export_san(anim.parse(root), output_dir)
+
+
+def export_san(video: anim.SmushAnimation, output_dir: str) -> None:
+    header, frames = video
     os.makedirs(output_dir, exist_ok=True)
     for idx, ctx in enumerate(generate_frames(header, frames, DECODE_FRAME_IMAGE)):
         if ctx.screen:
@@ -1,13 +1,18 @@
 import glob
 import os
-from typing import Iterable, List, Set
+import sys
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
 
 import typer
 
+from nutcracker.kernel.cache import dump_jsonl
+from nutcracker.kernel.stats import ParseStats
 from nutcracker.smush import anim
 from nutcracker.smush.compress import strip_compress_san
-from nutcracker.smush.decode import decode_nut, decode_san
+from nutcracker.smush.decode import export_nut, export_san
 from nutcracker.smush.preset import smush
+from nutcracker.smush.types import Element
 from nutcracker.utils.fileio import write_file
 from nutcracker.utils.funcutils import flatten
 
@@ -18,32 +23,61 @@ def get_files(globs: Iterable[str]) -> Set[str]:
     return set(flatten(glob.iglob(fname) for fname in globs))
 
 
+def open_videos(files: List[str]) -> Iterator[Tuple[str, anim.SmushAnimation]]:
+    if files == ['-']:
+        # frames are decoded as they arrive, without keeping the whole file
+        yield 'stdin', anim.from_stream(sys.stdin.buffer)
+        return
+    for filename in get_files(files):
+        yield os.path.basename(filename), anim.parse(anim.from_path(filename))
+
+
 @app.command('map')
 def map_elements(
     files: List[str] = typer.Argument(..., help='Files to read from'),
+    stats: Optional[Path] = typer.Option(
+        None, '--stats', help='Write per-tag parse statistics to given JSON file'
+    ),
+    max_depth: Optional[int] = typer.Option(
+        None, '--max-depth', help='Limit levels of elements to render'
+    ),
+    jsonl: Optional[Path] = typer.Option(
+        None, '--jsonl', help='Write elements as JSON lines records to given file'
+    ),
 ) -> None:
+    parse_stats = ParseStats() if stats else None
+    roots: List[Element] = []
     for filename in get_files(files):
         basename = os.path.basename(filename)
         print(f'Mapping file: {basename}')
-        root = anim.from_path(filename)
-        smush.render(root)
+        root = anim.from_path(filename, stats=parse_stats)
+        if jsonl:
+            roots.append(root)
+        else:
+            smush.render(root, max_depth=max_depth)
+    if jsonl:
+        # single dump, row indices of parents are unique across files
+        with open(jsonl, 'w') as stream:
+            dump_jsonl(roots, stream)
+    if parse_stats:
+        parse_stats.dump(str(stats))
 
 
 @app.command('decode')
 def decode(
-    files: List[str] = typer.Argument(..., help='Files to read from'),
+    files: List[str] = typer.Argument(
+        ..., help='Files to read from, - for standard input'
+    ),
     nut: bool = typer.Option(False, '--nut', help='Decode to grid image'),
     target_dir: str = typer.Option('out', '--target', '-t', help='Target directory'),
 ) -> None:
-    for filename in get_files(files):
-        basename = os.path.basename(filename)
+    for basename, video in open_videos(files):
         print(f'Decoding file: {basename}')
-        root = anim.from_path(filename)
         output_dir = os.path.join(target_dir, basename)
         if nut:
-            decode_nut(root, output_dir)
+            export_nut(video, output_dir)
         else:
-            decode_san(root, output_dir)
+            export_san(video, output_dir)
 
 
 @app.command('compress')
@@ -1,50 +1,88 @@
 #!/usr/bin/env python3
 
 import glob
-import io
 import os
-from typing import Iterable, Sequence
+from typing import (
+    Any,
+    Callable,
+    Container,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from nutcracker.sputm.tree import GameResource
-from nutcracker.utils.fileio import read_file, write_file
+from nutcracker.chiper import xor
+from nutcracker.kernel.align import calc_align
+from nutcracker.kernel.buffer import BufferLike
+from nutcracker.kernel.chunk import StructuredChunk
+from nutcracker.kernel.settings import _ChunkSetting
+from nutcracker.sputm.tree import GameResource, GameResourceConfig
+from nutcracker.utils.copyio import copy_range
+from nutcracker.utils.fileio import map_file, read_file, replace_file, write_file
 
 from .index import (
-    read_directory_leg as read_dir,
-    read_directory_leg_v8 as read_dir_v8,
-    read_dlfl
+    DIRECTORY_DLFL,
+    DIRECTORY_LEG,
+    DIRECTORY_LEG_V8,
+    DIRECTORY_LOFF,
+    GameIndex,
 )
 from .preset import sputm
 from .types import Element
 
 
-def write_dlfl(index):
-    yield len(index).to_bytes(2, byteorder='little', signed=False)
-    yield b''.join(
-        off.to_bytes(4, byteorder='little', signed=False) for off in index.values()
-    )
+def write_dlfl(index: Mapping[int, int]) -> bytes:
+    return DIRECTORY_DLFL.write(len(index), offsets=list(index.values()))
 
 
-def write_dir(index):
-    yield len(index).to_bytes(2, byteorder='little', signed=False)
+def write_dir(index: Mapping[int, Tuple[int, int]]) -> bytes:
     rooms, offsets = zip(*index.values())
-    yield b''.join(room.to_bytes(1, byteorder='little', signed=False) for room in rooms)
-    yield b''.join(off.to_bytes(4, byteorder='little', signed=False) for off in offsets)
+    return DIRECTORY_LEG.write(len(index), rooms=rooms, offsets=offsets)
 
 
-def write_dir_v8(index):
-    yield len(index).to_bytes(4, byteorder='little', signed=False)
+def write_dir_v8(index: Mapping[int, Tuple[int, int]]) -> bytes:
     rooms, offsets = zip(*index.values())
-    yield b''.join(room.to_bytes(1, byteorder='little', signed=False) for room in rooms)
-    yield b''.join(off.to_bytes(4, byteorder='little', signed=False) for off in offsets)
+    return DIRECTORY_LEG_V8.write(len(index), rooms=rooms, offsets=offsets)
 
 
-def bind_directory_changes(read, write, orig, mapping):
-    bound = {**dict(read(orig)), **mapping}
-    data = b''.join(write(bound))
+def update_directory(
+    write: Callable[[Dict[int, Any]], bytes], orig: bytes, bound: Dict[int, Any]
+) -> bytes:
+    data = write(bound)
     return data + orig[len(data) :]
 
 
-def make_index_from_resource(resource, ref, base_fix: int = 0):
+def bind_directory_changes(
+    read: Callable[[bytes], Iterable[Tuple[int, Any]]],
+    write: Callable[[Dict[int, Any]], bytes],
+    orig: bytes,
+    mapping: Mapping[int, Any],
+) -> bytes:
+    return update_directory(write, orig, {**dict(read(orig)), **mapping})
+
+
+def is_updated_room(room: Element, rooms: Optional[Container[str]]) -> bool:
+    """Check if room needs to be re-serialized, given paths of updated rooms.
+
+    All rooms are updated when not given, as are rooms without known path.
+    """
+    path = room.attribs.get('path')
+    return rooms is None or path is None or path in rooms
+
+
+def make_index_from_resource(
+    resource: Iterable[Element],
+    index: GameIndex,
+    ref: Iterable[Element],
+    base_fix: int = 0,
+    rooms: Optional[Container[str]] = None,
+) -> Iterator[bytes]:
     maxs = {}
     diri = {}
     dirr = {}
@@ -97,6 +135,9 @@ def make_index_from_resource(resource, ref, base_fix: int = 0):
         for lflf in sputm.findall('LFLF', t):
             diri[lflf.attribs['gid']] = (lflf.attribs['gid'], 0)
             dlfl[lflf.attribs['gid']] = lflf.attribs['offset'] + 16
+            if not is_updated_room(lflf, rooms):
+                # offsets are relative to room, original entries still apply
+                continue
             for elem in lflf:
                 if elem.tag in resmap and elem.attribs.get('gid'):
                     resmap[elem.tag][elem.attribs['gid']] = (
@@ -104,29 +145,55 @@ def make_index_from_resource(resource, ref, base_fix: int = 0):
                         elem.attribs['offset'] + base_fix,
                     )
 
-    def build_index(root: Iterable[Element]):
+    def build_index(root: Iterable[Element]) -> Iterator[bytes]:
+        writer = write_dir_v8 if base_fix == 8 else write_dir
         for elem in root:
             tag, data = elem.tag, elem.data
 
-            reader, writer = (
-                (read_dir_v8, write_dir_v8) if base_fix == 8 else (read_dir, write_dir)
-            )
-
+            # original entries are taken from index read along with game
             if tag == 'DLFL':
-                data = bind_directory_changes(read_dlfl, write_dlfl, elem.data, dlfl)
+                offsets: Dict[int, int] = {}
+                if index.room_offsets is not None:
+                    offsets = dict(enumerate(index.room_offsets.tolist()))
+                data = update_directory(write_dlfl, data, {**offsets, **dlfl})
             if tag in dirmap:
-                data = bind_directory_changes(reader, writer, elem.data, dirmap[tag])
+                directory = index.directories[tag].to_dict()
+                data = update_directory(writer, data, {**directory, **dirmap[tag]})
 
             yield sputm.mktag(tag, data)
 
     return build_index(ref)
 
 
-def update_element(basedir, elements, files):
+def header_size(cfg: _ChunkSetting) -> int:
+    """Size of chunk headers written with given settings."""
+    if not isinstance(cfg.chunk, StructuredChunk):
+        raise ValueError(f'Chunk headers are not of fixed size: {cfg.chunk}')
+    return cfg.chunk.size
+
+
+def chunk_size(elem: Element) -> int:
+    """Size of element written as chunk, with padding to data alignment."""
+    size: int = elem.attribs['size'] + header_size(sputm)
+    return size + calc_align(size, sputm.align)
+
+
+def update_element(
+    basedir: str,
+    elements: Iterable[Element],
+    files: Container[str],
+    serialize: bool = True,
+) -> Iterator[Element]:
+    """Replace elements with patch files found, updating offsets and sizes.
+
+    serialize: write data of updated containers from their children,
+    otherwise only children are updated, as for disks written chunk by chunk.
+    """
     offset = 0
     for elem in elements:
         elem.attribs['offset'] = offset
-        full_path = os.path.join(basedir, elem.attribs.get('path'))
+        full_path = os.path.join(basedir, elem.attribs['path'])
+        size: Optional[int] = None
         if full_path in files:
             print(elem.attribs.get('path'))
             if os.path.isfile(full_path):
@@ -135,53 +202,118 @@ def update_element(basedir, elements, files):
                 elem.attribs = attribs
             else:
                 elem.children = list(update_element(basedir, elem, files))
-                elem.data = sputm.write_chunks(
-                    sputm.mktag(e.tag, e.data) for e in elem.children
-                )
-        offset += len(elem.data) + 8
-        elem.attribs['size'] = len(elem.data)
+                if serialize:
+                    elem.data = sputm.write_chunks(
+                        sputm.mktag(e.tag, e.data) for e in elem.children
+                    )
+                else:
+                    size = sum(map(chunk_size, elem.children))
+        if size is None:
+            size = len(elem.data)
+        elem.attribs['size'] = size
+        offset += chunk_size(elem)
         yield elem
 
 
-def update_loff(config, disk):
+def update_loff(config: GameResourceConfig, disk: Element) -> None:
     """Update LOFF chunk if exists"""
     loff = sputm.find('LOFF', disk)
     if loff:
         rooms = list(sputm.findall('LFLF', disk))
-        with io.BytesIO() as stream:
-            stream.write(bytes([len(rooms)]))
-            for room in rooms:
-                room_id = room.attribs['gid']
-                room_off = room.attribs['offset'] + 16 - config.base_fix
-                stream.write(room_id.to_bytes(1, byteorder='little', signed=False))
-                stream.write(room_off.to_bytes(4, byteorder='little', signed=False))
-            loff_data = stream.getvalue()
+        entries = [
+            (room.attribs['gid'], room.attribs['offset'] + 16 - config.base_fix)
+            for room in rooms
+        ]
+        loff_data = DIRECTORY_LOFF.write(len(rooms), entries=entries)
         assert len(loff.data) == len(loff_data)
         loff.data = loff_data
 
 
+def read_room_spans(buffer: Union[BufferLike, xor.XorView]) -> List[Tuple[int, int]]:
+    """Offset and size of each room (LFLF) chunk in disk, reading only headers."""
+    _, end = sputm.read_header_at(buffer, 0)
+    offset = header_size(sputm)
+    spans = []
+    while offset < end:
+        tag, size = sputm.read_header_at(buffer, offset)
+        if tag == 'LFLF':
+            spans.append((offset, size))
+        offset += size + calc_align(size, sputm.align)
+    return spans
+
+
+def copied_rooms(
+    disk: Element, path: str, key: int, rooms: Optional[Container[str]]
+) -> Dict[int, Tuple[int, int]]:
+    """Original span of each room to be copied as is, by index in disk children.
+
+    Rooms are matched with original disk in order, nothing is copied
+    if the rooms in disk no longer match the original ones.
+    """
+    resource = map_file(path)
+    buffer: Union[BufferLike, xor.XorView] = resource
+    if key:
+        buffer = xor.XorView(resource, key=key)
+    spans = read_room_spans(buffer)
+    lflfs = [(idx, room) for idx, room in enumerate(disk) if room.tag == 'LFLF']
+    if len(lflfs) != len(spans):
+        return {}
+    copied = {}
+    for (idx, room), (offset, size) in zip(lflfs, spans):
+        if is_updated_room(room, rooms):
+            continue
+        if size != room.attribs['size'] + header_size(sputm):
+            return {}
+        copied[idx] = (offset, size)
+    return copied
+
+
 def rebuild_resources(
-    gameres: GameResource, basename: str, updated_resource: Sequence[Element]
+    gameres: GameResource,
+    basename: str,
+    updated_resource: Sequence[Element],
+    rooms: Optional[Container[str]] = None,
 ) -> None:
-    index_file, *disks = gameres.game.disks
+    """Write game resources from updated disk elements.
+
+    rooms: paths of updated rooms, other rooms are copied as is from
+    original disks, with offsets in index shifted to their new position.
+    All rooms are re-serialized when not given.
+    """
+    game = gameres.game
+    index_file, *disks = game.disks
     for t, disk in zip(updated_resource, disks):
         update_loff(gameres.config, t)
 
         _, ext = os.path.splitext(disk)
-        write_file(
-            f'{basename}{ext}',
-            sputm.mktag(
-                t.tag, sputm.write_chunks(sputm.mktag(e.tag, e.data) for e in t)
-            ),
-            key=gameres.game.chiper_key,
-        )
+        output = f'{basename}{ext}'
+        orig = os.path.join(game.basedir, disk)
+        copied = {}
+        if rooms is not None:
+            copied = copied_rooms(t, orig, game.chiper_key, rooms)
+        # source disk may be the output, it is read until replaced
+        with replace_file(output) as res, open(orig, 'rb') as src:
+            stream = xor.XorWriter(res, key=game.chiper_key)
+            with sputm.write_container(stream, t.tag):
+                for idx, elem in enumerate(t):
+                    if idx in copied:
+                        # encrypted bytes are copied as is, key is the same
+                        offset, size = copied[idx]
+                        copy_range(src, res, offset, size)
+                        stream.write(bytes(calc_align(size, sputm.align)))
+                    else:
+                        sputm.write_chunk(stream, elem.tag, elem.data)
 
     _, ext = os.path.splitext(index_file)
     write_file(
         f'{basename}{ext}',
         sputm.write_chunks(
             make_index_from_resource(
-                updated_resource, gameres.game.index, gameres.config.base_fix
+                updated_resource,
+                gameres.index,
+                gameres.game.index,
+                gameres.config.base_fix,
+                rooms,
             )
         ),
         key=gameres.game.chiper_key,
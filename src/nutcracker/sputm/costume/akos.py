@@ -7,6 +7,7 @@ import numpy as np
 
 from nutcracker.codex import bomp, rle, smap, bpp_cost
 from nutcracker.graphics.image import convert_to_pil_image
+from nutcracker.kernel.verify import policy
 from nutcracker.utils.funcutils import flatten
 
 from nutcracker.sputm.room.pproom import get_rooms, read_room_settings
@@ -54,7 +55,7 @@ def decode1(width, height, pal, data, verify=True):
             size=(width, height)
         )
 
-    if verify:
+    if verify and policy('akos'):
         d_data = bpp_cost.encode1(np.asarray(res), len(pal.data))
         with io.BytesIO(d_data) as stream:
             res2 = convert_to_pil_image(
@@ -3,43 +3,117 @@
 import io
 import operator
 import pprint
+from dataclasses import dataclass, field
 from functools import partial
-from itertools import takewhile
+from itertools import chain, takewhile
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import numpy as np
+import numpy.typing as npt
 
 from nutcracker.chiper import xor
+from nutcracker.kernel.buffer import BufferLike
+from nutcracker.kernel.element import Element
 
 from .preset import sputm
 
 
-def read_directory_leg(data):
-    with io.BytesIO(data) as s:
-        num = int.from_bytes(s.read(2), byteorder='little', signed=False)
-        rnums = [
-            int.from_bytes(s.read(1), byteorder='little', signed=False)
-            for i in range(num)
-        ]
-        offs = [
-            int.from_bytes(s.read(4), byteorder='little', signed=False)
-            for i in range(num)
-        ]
-        return enumerate(zip(rnums, offs))
-
-
-def read_directory_leg_v8(data):
-    with io.BytesIO(data) as s:
-        num = int.from_bytes(s.read(4), byteorder='little', signed=False)
-        rnums = [
-            int.from_bytes(s.read(1), byteorder='little', signed=False)
-            for i in range(num)
-        ]
-        offs = [
-            int.from_bytes(s.read(4), byteorder='little', signed=False)
-            for i in range(num)
-        ]
-        return enumerate(zip(rnums, offs))
-
-
-def read_rnam(data, key=0xFF):
+class DirectoryLayout(NamedTuple):
+    """Entry count followed by column of each field for all entries
+
+    length: dtype of entry count
+
+    columns: name and dtype of each column, dtype may be structured for
+    directories of interleaved entries.
+    """
+
+    length: str
+    columns: Tuple[Tuple[str, Any], ...]
+
+    def dtype(self, num: int) -> 'np.dtype[np.void]':
+        columns = ((name, dtype, (num,)) for name, dtype in self.columns)
+        return np.dtype([('num', self.length), *columns])
+
+    def read(self, data: BufferLike) -> np.void:
+        """Map directory over given bytes without copying."""
+        num = int(np.frombuffer(data, dtype=self.length, count=1)[0])
+        directory: np.void = np.frombuffer(data, dtype=self.dtype(num), count=1)[0]
+        return directory
+
+    def write(self, num: int, **columns: Any) -> bytes:
+        directory = np.zeros((), dtype=self.dtype(num))
+        directory['num'] = num
+        for name, values in columns.items():
+            directory[name] = _check_bounds(values, directory[name].dtype)
+        return directory.tobytes()
+
+
+def _check_bounds(values: Any, dtype: 'np.dtype[Any]') -> Any:
+    # out of range integers should not be wrapped silently
+    if dtype.names:
+        for idx, name in enumerate(dtype.names):
+            _check_bounds([entry[idx] for entry in values], dtype[name])
+        return values
+    if dtype.kind != 'u' or not len(values):
+        return values
+    values = np.asarray(values)
+    if values.min() < 0 or values.max() > np.iinfo(dtype).max:
+        raise OverflowError(f'directory values out of range for {dtype}')
+    return values
+
+
+DIRECTORY_LEG = DirectoryLayout('<u2', (('rooms', 'u1'), ('offsets', '<u4')))
+DIRECTORY_LEG_V8 = DirectoryLayout('<u4', (('rooms', 'u1'), ('offsets', '<u4')))
+DIRECTORY_LOFF = DirectoryLayout(
+    'u1', (('entries', [('room', 'u1'), ('offset', '<u4')]),)
+)
+DIRECTORY_DLFL = DirectoryLayout('<u2', (('offsets', '<u4'),))
+DIRECTORY_ANAM = DirectoryLayout('<u2', (('names', 'S9'),))
+DIRECTORY_DOBJ = DirectoryLayout('<u2', (('values', 'u1'),))
+DIRECTORY_DOBJ_V7 = DirectoryLayout(
+    '<u2', (('states', 'u1'), ('rooms', 'u1'), ('classes', '<u4'))
+)
+DIRECTORY_DOBJ_V8 = DirectoryLayout(
+    '<u4',
+    (
+        (
+            'objects',
+            [('name', 'S40'), ('state', 'u1'), ('room', 'u1'), ('obj_class', '<u4')],
+        ),
+    ),
+)
+DIRECTORY_DOBJ_HE = DirectoryLayout(
+    '<u2',
+    (('states', 'u1'), ('owners', 'u1'), ('rooms', 'u1'), ('classes', '<u4')),
+)
+
+
+def read_directory_leg(data: bytes) -> Iterator[Tuple[int, Tuple[int, int]]]:
+    directory = DIRECTORY_LEG.read(data)
+    return enumerate(zip(directory['rooms'].tolist(), directory['offsets'].tolist()))
+
+
+def read_directory_leg_v8(data: bytes) -> Iterator[Tuple[int, Tuple[int, int]]]:
+    directory = DIRECTORY_LEG_V8.read(data)
+    return enumerate(zip(directory['rooms'].tolist(), directory['offsets'].tolist()))
+
+
+def read_rnam(data: bytes, key: int = 0xFF) -> Iterator[Tuple[int, str]]:
     with io.BytesIO(data) as s:
         while True:
             rnum = int.from_bytes(s.read(1), byteorder='little', signed=False)
@@ -49,13 +123,17 @@ def read_rnam(data, key=0xFF):
             yield rnum, name
 
 
-def readcstr(stream, read_fn):
+def readcstr(
+    stream: IO[bytes], read_fn: Callable[[IO[bytes], int], bytes]
+) -> Optional[str]:
     bound_read = iter(partial(read_fn, stream, 1), b'')
     res = b''.join(takewhile(partial(operator.ne, b'\00'), bound_read))
     return res.decode() if res else None
 
 
-def read_rnam_he(data, key=0xFF):
+def read_rnam_he(
+    data: bytes, key: int = 0xFF
+) -> Iterator[Tuple[int, Optional[str]]]:
     with io.BytesIO(data) as s:
         while True:
             rnum = int.from_bytes(s.read(2), byteorder='little', signed=False)
@@ -65,322 +143,424 @@ def read_rnam_he(data, key=0xFF):
             yield rnum, name
 
 
-def read_anam(data):
-    with io.BytesIO(data) as s:
-        num = int.from_bytes(s.read(2), byteorder='little', signed=False)
-        names = [s.read(9).split(b'\0')[0].decode() for i in range(num)]
-        return enumerate(names)
+def read_anam(data: bytes) -> Iterator[Tuple[int, str]]:
+    names = DIRECTORY_ANAM.read(data)['names'].tolist()
+    return enumerate(name.split(b'\0')[0].decode() for name in names)
 
 
-def read_dobj(data):
-    with io.BytesIO(data) as s:
-        num = int.from_bytes(s.read(2), byteorder='little', signed=False)
-        values = list(s.read(num))
-        # [(state, owner)]
-        return enumerate((val >> 4, val & 0xFF) for val in values)
+def read_dobj(data: bytes) -> Iterator[Tuple[int, Tuple[int, int]]]:
+    values = DIRECTORY_DOBJ.read(data)['values'].tolist()
+    # [(state, owner)]
+    return enumerate((val >> 4, val & 0xFF) for val in values)
 
 
-def read_dobj_v8(data):
-    with io.BytesIO(data) as s:
-        num = int.from_bytes(s.read(4), byteorder='little', signed=False)
-        for i in range(num):
-            name = s.read(40).split(b'\0')[0].decode()
-            obj_id = i
-            state = ord(s.read(1))
-            room = ord(s.read(1))
-            obj_class = int.from_bytes(s.read(4), byteorder='little', signed=False)
-            yield name, (obj_id, state, room, obj_class)
+def read_dobj_v8(data: bytes) -> Iterator[Tuple[str, Tuple[int, int, int, int]]]:
+    objects = DIRECTORY_DOBJ_V8.read(data)['objects'].tolist()
+    for obj_id, (name, state, room, obj_class) in enumerate(objects):
+        yield name.split(b'\0')[0].decode(), (obj_id, state, room, obj_class)
 
 
-def read_dobj_v7(data):
-    with io.BytesIO(data) as s:
-        num = int.from_bytes(s.read(2), byteorder='little', signed=False)
-        states = list(s.read(num))
-        rooms = list(s.read(num))
-        classes = [
-            int.from_bytes(s.read(4), byteorder='little', signed=False)
-            for _ in range(num)
-        ]
-        return enumerate(zip(states, rooms, classes))
+def read_dobj_v7(data: bytes) -> Iterator[Tuple[int, Tuple[int, ...]]]:
+    directory = DIRECTORY_DOBJ_V7.read(data)
+    columns = ('states', 'rooms', 'classes')
+    return enumerate(zip(*(directory[column].tolist() for column in columns)))
 
 
-def read_dobj_he(data):
-    with io.BytesIO(data) as s:
-        num = int.from_bytes(s.read(2), byteorder='little', signed=False)
-        states = list(s.read(num))
-        owners = list(s.read(num))
-        rooms = list(s.read(num))
-        classes = [
-            int.from_bytes(s.read(4), byteorder='little', signed=False)
-            for _ in range(num)
-        ]
-        return enumerate(zip(states, owners, rooms, classes))
-
-
-def read_dlfl(data):
-    with io.BytesIO(data) as s:
-        num = int.from_bytes(s.read(2), byteorder='little', signed=False)
-        offs = [
-            int.from_bytes(s.read(4), byteorder='little', signed=False)
-            for i in range(num)
-        ]
-        return enumerate(offs)
+def read_dobj_he(data: bytes) -> Iterator[Tuple[int, Tuple[int, ...]]]:
+    directory = DIRECTORY_DOBJ_HE.read(data)
+    columns = ('states', 'owners', 'rooms', 'classes')
+    return enumerate(zip(*(directory[column].tolist() for column in columns)))
 
 
-def read_directory(data):
-    with io.BytesIO(data) as s:
-        num = int.from_bytes(s.read(1), byteorder='little', signed=False)
-        merged = [
-            (
-                int.from_bytes(s.read(1), byteorder='little', signed=False),
-                int.from_bytes(s.read(4), byteorder='little', signed=False),
-            )
-            for i in range(num)
-        ]
-        return merged
+def read_dlfl(data: bytes) -> Iterator[Tuple[int, int]]:
+    return enumerate(DIRECTORY_DLFL.read(data)['offsets'].tolist())
+
+
+def read_directory(data: bytes) -> List[Tuple[int, int]]:
+    entries: List[Tuple[int, int]] = DIRECTORY_LOFF.read(data)['entries'].tolist()
+    return entries
 
 
-def read_inner_uint16le_v7(pid, data, off):
+def read_inner_uint16le_v7(pid: int, data: BufferLike, off: int) -> int:
     res = int.from_bytes(data[12:14], byteorder='little', signed=False)
     return res
 
 
-def read_inner_uint16le(pid, data, off):
+def read_inner_uint16le(pid: int, data: BufferLike, off: int) -> int:
     res = int.from_bytes(data[8:10], byteorder='little', signed=False)
     # TODO: fix offset for FT + DIG as in the following commented line
     # res = int.from_bytes(data[12:14], byteorder='little', signed=False)
     return res
 
 
-def read_uint8le(pid, data, off):
+def read_uint8le(pid: int, data: BufferLike, off: int) -> int:
     res = int.from_bytes(data[:1], byteorder='little', signed=False)
     return res
 
 
-def read_uint16le(pid, data, off):
+def read_uint16le(pid: int, data: BufferLike, off: int) -> int:
     res = int.from_bytes(data[:2], byteorder='little', signed=False)
     return res
 
 
-def read_uint32le(pid, data, off):
+def read_uint32le(pid: int, data: BufferLike, off: int) -> int:
     res = int.from_bytes(data[:4], byteorder='little', signed=False)
     return res
 
 
-def compare_pid_off(directory, base: int = 0):
-    def inner(pid, data, off):
-        return next((k for k, v in directory.items() if v == (pid, off + base)), None)
+K = TypeVar('K')
+V = TypeVar('V', bound=Hashable)
+
+# gid of resource chunk by room id (pid), chunk data and offset
+GidReader = Callable[[int, BufferLike, int], Optional[int]]
+
+
+def invert_directory(directory: Mapping[K, V]) -> Dict[V, K]:
+    """Map directory entries back to their keys, first key wins on duplicates."""
+    inverted: Dict[V, K] = {}
+    for key, entry in directory.items():
+        inverted.setdefault(entry, key)
+    return inverted
+
+
+def lookup_directory(directory: Mapping[K, V]) -> Callable[[V], Optional[K]]:
+    # inverted on first lookup, as some directories are missing until needed
+    inverted: Optional[Dict[V, K]] = None
+
+    def lookup(entry: V) -> Optional[K]:
+        nonlocal inverted
+        if inverted is None:
+            inverted = invert_directory(directory)
+        return inverted.get(entry)
+
+    return lookup
+
+
+def compare_pid_off(
+    directory: Mapping[int, Tuple[int, int]], base: int = 0
+) -> GidReader:
+    lookup = lookup_directory(directory)
+
+    def inner(pid: int, data: BufferLike, off: int) -> Optional[int]:
+        return lookup((pid, off + base))
 
     return inner
 
 
-def compare_off_he(directory):
-    def inner(pid, data, off):
-        return next((k for k, v in directory.items() if v == off + 16), None)
+def compare_off_he(directory: Mapping[int, int]) -> GidReader:
+    lookup = lookup_directory(directory)
+
+    def inner(pid: int, data: BufferLike, off: int) -> Optional[int]:
+        return lookup(off + 16)
 
     return inner
 
 
-def read_index_v5tov7(root):
+# resource tag to candidate directories, LucasArts first, then Humongous
+RESOURCE_DIRECTORIES = {
+    'SCRP': ('DSCR', 'DIRS'),
+    'RMSC': ('DRSC', 'DIRR'),
+    'RMDA': ('DIRR',),
+    'SOUN': ('DSOU', 'DIRN'),
+    'DIGI': ('DIRN',),
+    'TALK': ('DIRN',),
+    'COST': ('DCOS', 'DIRC'),
+    'AKOS': ('DCOS', 'DIRC'),
+    'CHAR': ('DCHR', 'DIRF'),
+    'MULT': ('DIRM',),
+    'AWIZ': ('DIRM',),
+    'TLKE': ('DIRT',),
+}
+
+
+@dataclass(eq=False)
+class ResourceDirectory(Mapping[int, Tuple[int, int]]):
+    """Array-backed directory of resource locations by gid
+
+    rooms: room of each resource (or disk of each room, in rooms directory)
+
+    offsets: offset of each resource, relative to its room
+    """
+
+    rooms: npt.NDArray[np.unsignedinteger[Any]]
+    offsets: npt.NDArray[np.unsignedinteger[Any]]
+    _inverted: Optional[Dict[Tuple[int, int], int]] = field(
+        default=None,
+        init=False,
+        repr=False,
+    )
+
+    @classmethod
+    def from_bytes(
+        cls, data: bytes, layout: DirectoryLayout = DIRECTORY_LEG
+    ) -> 'ResourceDirectory':
+        directory = layout.read(data)
+        return cls(directory['rooms'], directory['offsets'])
+
+    def __getitem__(self, gid: int) -> Tuple[int, int]:
+        if not 0 <= gid < len(self.rooms):
+            raise KeyError(gid)
+        return int(self.rooms[gid]), int(self.offsets[gid])
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self.rooms)))
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def to_dict(self) -> Dict[int, Tuple[int, int]]:
+        return dict(enumerate(zip(self.rooms.tolist(), self.offsets.tolist())))
+
+    def find(self, room: int, offset: int) -> Optional[int]:
+        """Gid of resource at given location, first one on duplicate entries."""
+        if self._inverted is None:
+            self._inverted = invert_directory(self.to_dict())
+        return self._inverted.get((room, offset))
+
+    def idgen(self, base: int = 0) -> GidReader:
+        def inner(pid: int, data: BufferLike, off: int) -> Optional[int]:
+            return self.find(pid, off + base)
+
+        return inner
+
+
+# object entries of object directory (DOBJ), by object id or name
+ObjectReader = Callable[[bytes], Iterable[Tuple[Any, Any]]]
+
+# gid resolver by chunk tag, rooms directory stands for LFLF until LOFF is read
+IdGen = Union[GidReader, Dict[int, Tuple[int, int]]]
+
+# index chunk tags of room directories
+ROOM_DIRECTORIES = ('DROO', 'DIRI', 'DISK')
+DIRECTORY_TAGS = frozenset(chain(ROOM_DIRECTORIES, *RESOURCE_DIRECTORIES.values()))
+
+
+@dataclass
+class GameIndex(object):
+    """Content of game index file
+
+    rnam: room names by room
+
+    maxs: raw MAXS data, its format differs between versions
+
+    directories: resource directories by index chunk tag
+
+    room_offsets: offset of each room in its disk (DLFL)
+
+    dobj: raw object directory (DOBJ), see objects
+
+    read_objects: reader of object directory for game version
+
+    anam: actor names by actor
+
+    idgens: gid resolvers by resource tag, for mapping disks
+    """
+
+    rnam: Dict[int, str] = field(default_factory=dict)
+    maxs: Optional[bytes] = None
+    directories: Dict[str, ResourceDirectory] = field(default_factory=dict)
+    room_offsets: Optional[npt.NDArray[np.unsignedinteger[Any]]] = None
+    dobj: Optional[bytes] = field(default=None, repr=False)
+    read_objects: Optional[ObjectReader] = field(default=None, repr=False)
+    anam: Dict[int, str] = field(default_factory=dict, repr=False)
+    idgens: Dict[str, IdGen] = field(default_factory=dict, repr=False)
+    _objects: Optional[Dict[Any, Any]] = field(default=None, init=False, repr=False)
+
+    @property
+    def objects(self) -> Dict[Any, Any]:
+        """Object directory, read on first access, empty if missing or malformed."""
+        if self._objects is None:
+            self._objects = {}
+            if self.dobj is not None and self.read_objects is not None:
+                try:
+                    self._objects = dict(self.read_objects(self.dobj))
+                except ValueError:
+                    pass
+        return self._objects
+
+    def directory(self, *tags: str) -> Optional[ResourceDirectory]:
+        """First directory found of given index chunk tags."""
+        return next(
+            (self.directories[tag] for tag in tags if tag in self.directories),
+            None,
+        )
+
+    def resource_directory(self, tag: str) -> ResourceDirectory:
+        directory = self.directory(*RESOURCE_DIRECTORIES.get(tag, ()))
+        if directory is None:
+            raise KeyError(f'no directory for {tag} resources in index')
+        return directory
+
+    def resource_idgens(
+        self, tags: Iterable[str], base: int = 0
+    ) -> Dict[str, GidReader]:
+        """Gid resolvers of given resource tags, for directories found in index."""
+        directories = {tag: self.directory(*RESOURCE_DIRECTORIES[tag]) for tag in tags}
+        return {
+            tag: directory.idgen(base)
+            for tag, directory in directories.items()
+            if directory is not None
+        }
+
+    @property
+    def rooms(self) -> Optional[ResourceDirectory]:
+        return self.directory('DROO', 'DIRI')
+
+    @property
+    def room_scripts(self) -> Optional[ResourceDirectory]:
+        return self.directory('DRSC', 'DIRR')
+
+    @property
+    def scripts(self) -> Optional[ResourceDirectory]:
+        return self.directory('DSCR', 'DIRS')
+
+    @property
+    def sounds(self) -> Optional[ResourceDirectory]:
+        return self.directory('DSOU', 'DIRN')
+
+    @property
+    def costumes(self) -> Optional[ResourceDirectory]:
+        return self.directory('DCOS', 'DIRC')
+
+    @property
+    def charsets(self) -> Optional[ResourceDirectory]:
+        return self.directory('DCHR', 'DIRF')
+
+    @property
+    def multis(self) -> Optional[ResourceDirectory]:
+        return self.directory('DIRM')
+
+    @property
+    def talkies(self) -> Optional[ResourceDirectory]:
+        return self.directory('DIRT')
+
+
+def read_game_index(
+    root: Iterable[Element],
+    layout: DirectoryLayout = DIRECTORY_LEG,
+    read_names: Callable[[bytes], Iterable[Tuple[int, Any]]] = read_rnam,
+    read_objects: Optional[ObjectReader] = None,
+    verbose: bool = False,
+) -> GameIndex:
+    """Read index chunks of given root, nothing is printed unless verbose."""
+    index = GameIndex(read_objects=read_objects)
     for t in root:
-        sputm.render(t)
+        if verbose:
+            sputm.render(t)
         if t.tag == 'RNAM':
-            rnam = dict(read_rnam(t.data, key=0xFF))
-            pprint.pprint(rnam)
+            index.rnam = dict(read_names(t.data))
+            content: Any = index.rnam
         elif t.tag == 'MAXS':
-            print('MAXS not yet supported')
-        elif t.tag == 'DROO':
-            droo = dict(read_directory_leg(t.data))
-            pprint.pprint(droo)
-        elif t.tag == 'DRSC':
-            drsc = dict(read_directory_leg(t.data))
-            pprint.pprint(drsc)
-        elif t.tag == 'DSCR':
-            dscr = dict(read_directory_leg(t.data))
-            pprint.pprint(dscr)
-        elif t.tag == 'DSOU':
-            dsou = dict(read_directory_leg(t.data))
-            pprint.pprint(dsou)
-        elif t.tag == 'DCOS':
-            dcos = dict(read_directory_leg(t.data))
-            pprint.pprint(dcos)
-        elif t.tag == 'DCHR':
-            dchr = dict(read_directory_leg(t.data))
-            pprint.pprint(dchr)
+            index.maxs = content = bytes(t.data)
+        elif t.tag in DIRECTORY_TAGS:
+            directory = ResourceDirectory.from_bytes(t.data, layout)
+            index.directories[t.tag] = directory
+            content = directory.to_dict()
+        elif t.tag == 'DLFL':
+            index.room_offsets = DIRECTORY_DLFL.read(t.data)['offsets']
+            content = dict(enumerate(index.room_offsets.tolist()))
         elif t.tag == 'DOBJ':
-            print('DOBJ not yet supported')
+            # objects are read only when needed
+            index.dobj = bytes(t.data)
+            content = index.objects if verbose else None
         elif t.tag == 'ANAM':
-            anam = dict(read_anam(t.data))
-            pprint.pprint(anam)
-    return rnam, {
-        'LFLF': droo,
+            index.anam = content = dict(read_anam(t.data))
+        else:
+            continue
+        if verbose:
+            pprint.pprint(content)
+    return index
+
+
+def read_index_v5tov7(root: Iterable[Element], verbose: bool = False) -> GameIndex:
+    index = read_game_index(
+        root,
+        read_objects=read_dobj,
+        verbose=verbose,
+    )
+    index.idgens = {
+        'LFLF': dict(index.rooms or {}),
         'OBIM': read_inner_uint16le,  # check gid for DIG and FT
         'OBCD': read_inner_uint16le,
         'LSCR': read_uint8le,
-        'SCRP': compare_pid_off(dscr),
-        'CHAR': compare_pid_off(dchr),
-        'SOUN': compare_pid_off(dsou),
-        'COST': compare_pid_off(dcos),
-        'AKOS': compare_pid_off(dcos),
+        **index.resource_idgens(('SCRP', 'CHAR', 'SOUN', 'COST', 'AKOS')),
     }
+    return index
 
 
-def read_index_v7(root):
-    for t in root:
-        sputm.render(t)
-        if t.tag == 'RNAM':
-            rnam = dict(read_rnam(t.data, key=0xFF))
-            pprint.pprint(rnam)
-        elif t.tag == 'MAXS':
-            print('MAXS not yet supported')
-        elif t.tag == 'DROO':
-            droo = dict(read_directory_leg(t.data))
-            pprint.pprint(droo)
-        elif t.tag == 'DRSC':
-            drsc = dict(read_directory_leg(t.data))
-            pprint.pprint(drsc)
-        elif t.tag == 'DSCR':
-            dscr = dict(read_directory_leg(t.data))
-            pprint.pprint(dscr)
-        elif t.tag == 'DSOU':
-            dsou = dict(read_directory_leg(t.data))
-            pprint.pprint(dsou)
-        elif t.tag == 'DCOS':
-            dcos = dict(read_directory_leg(t.data))
-            pprint.pprint(dcos)
-        elif t.tag == 'DCHR':
-            dchr = dict(read_directory_leg(t.data))
-            pprint.pprint(dchr)
-        elif t.tag == 'DOBJ':
-            print('DOBJ not yet supported')
-        elif t.tag == 'ANAM':
-            anam = dict(read_anam(t.data))
-            pprint.pprint(anam)
-    return rnam, {
-        'LFLF': droo,
+def read_index_v7(root: Iterable[Element], verbose: bool = False) -> GameIndex:
+    index = read_game_index(
+        root,
+        read_objects=read_dobj_v7,
+        verbose=verbose,
+    )
+    index.idgens = {
+        'LFLF': dict(index.rooms or {}),
         'OBIM': read_inner_uint16le_v7,  # check gid for DIG and FT
         'OBCD': read_inner_uint16le_v7,
         'LSCR': read_uint16le,
-        'SCRP': compare_pid_off(dscr),
-        'CHAR': compare_pid_off(dchr),
-        'SOUN': compare_pid_off(dsou),
-        'COST': compare_pid_off(dcos),
-        'AKOS': compare_pid_off(dcos),
+        **index.resource_idgens(('SCRP', 'CHAR', 'SOUN', 'COST', 'AKOS')),
     }
-
-
-def read_index_v8(root):
-    for t in root:
-        sputm.render(t)
-        if t.tag == 'RNAM':
-            rnam = dict(read_rnam(t.data, key=0xFF))
-            pprint.pprint(rnam)
-        elif t.tag == 'MAXS':
-            print('MAXS not yet supported')
-        elif t.tag == 'DROO':
-            droo = dict(read_directory_leg_v8(t.data))
-            pprint.pprint(droo)
-        elif t.tag == 'DRSC':
-            drsc = dict(read_directory_leg_v8(t.data))
-            pprint.pprint(drsc)
-        elif t.tag == 'DSCR':
-            dscr = dict(read_directory_leg_v8(t.data))
-            pprint.pprint(dscr)
-        elif t.tag == 'DSOU':
-            dsou = dict(read_directory_leg_v8(t.data))
-            pprint.pprint(dsou)
-        elif t.tag == 'DCOS':
-            dcos = dict(read_directory_leg_v8(t.data))
-            pprint.pprint(dcos)
-        elif t.tag == 'DCHR':
-            dchr = dict(read_directory_leg_v8(t.data))
-            pprint.pprint(dchr)
-        elif t.tag == 'DOBJ':
-            dobj = dict(read_dobj_v8(t.data))
-            pprint.pprint(dobj)
-        elif t.tag == 'ANAM':
-            anam = dict(read_anam(t.data))
-            pprint.pprint(anam)
-    return rnam, {
-        'LFLF': droo,
-        'OBIM': get_object_id_from_name_v8(dobj),
+    return index
+
+
+def read_index_v8(root: Iterable[Element], verbose: bool = False) -> GameIndex:
+    index = read_game_index(
+        root,
+        layout=DIRECTORY_LEG_V8,
+        read_objects=read_dobj_v8,
+        verbose=verbose,
+    )
+    index.idgens = {
+        'LFLF': dict(index.rooms or {}),
+        'OBIM': get_object_id_from_name_v8(index),
         'OBCD': read_inner_uint16le_v7,
         'LSCR': read_uint32le,
-        'RMSC': compare_pid_off(drsc, 8),
-        'SCRP': compare_pid_off(dscr, 8),
-        'CHAR': compare_pid_off(dchr, 8),
-        'SOUN': compare_pid_off(dsou, 8),
-        'COST': compare_pid_off(dcos, 8),
-        'AKOS': compare_pid_off(dcos, 8),
+        **index.resource_idgens(
+            ('RMSC', 'SCRP', 'CHAR', 'SOUN', 'COST', 'AKOS'), base=8
+        ),
     }
+    return index
 
 
-def get_object_id_from_name_v8(dobj):
-    def compare_name(pid, data, off):
-        name = data[8:48].split(b'\0')[0].decode()
-        return dobj[name][0]
+def get_object_id_from_name_v8(index: GameIndex) -> GidReader:
+    def compare_name(pid: int, data: BufferLike, off: int) -> Optional[int]:
+        name = bytes(data[8:48]).split(b'\0')[0].decode()
+        obj_id: int = index.objects[name][0]
+        return obj_id
 
     return compare_name
 
 
-def read_index_he(root):
-    dtlk = None  # prevent `referenced before assignment` error
-    dmul = None
-    for t in root:
-        # sputm.render(t)
-        if t.tag == 'RNAM':
-            rnam = dict(read_rnam_he(t.data, key=0x00))
-            # pprint.pprint(rnam)
-        elif t.tag == 'MAXS':
-            pass
-            # print('MAXS not yet supported')
-        elif t.tag == 'DIRI':
-            droo = dict(read_directory_leg(t.data))
-            # pprint.pprint(droo)
-        elif t.tag == 'DIRS':
-            dscr = dict(read_directory_leg(t.data))
-            # pprint.pprint(dscr)
-        elif t.tag == 'DIRC':
-            dcos = dict(read_directory_leg(t.data))
-            # pprint.pprint(dcos)
-        elif t.tag == 'DIRF':
-            dchr = dict(read_directory_leg(t.data))
-            # pprint.pprint(dchr)
-        elif t.tag == 'DIRN':
-            dsou = dict(read_directory_leg(t.data))
-            # pprint.pprint(dsou)
-        elif t.tag == 'DIRT':
-            dtlk = dict(read_directory_leg(t.data))
-            # pprint.pprint(dtlk)
-        elif t.tag == 'DIRM':
-            dmul = dict(read_directory_leg(t.data))
-            # pprint.pprint(dmul)
-        elif t.tag == 'DIRR':
-            drmd = dict(read_directory_leg(t.data))
-            # pprint.pprint(drmd)
-        elif t.tag == 'DISK':
-            # TODO
-            # all values are `idx: (1, 0)`
-            disk = dict(read_directory_leg(t.data))
-            # pprint.pprint(disk)
-        elif t.tag == 'DLFL':
-            dlfl = dict(read_dlfl(t.data))
-            # pprint.pprint(dlfl)
-            pass
-    return rnam, {
-        'LFLF': compare_off_he(dlfl),
+def read_index_he(root: Iterable[Element], verbose: bool = False) -> GameIndex:
+    index = read_game_index(
+        root,
+        read_names=partial(read_rnam_he, key=0x00),
+        read_objects=read_dobj_he,
+        verbose=verbose,
+    )
+    room_offsets: Dict[int, int] = {}
+    if index.room_offsets is not None:
+        room_offsets = dict(enumerate(index.room_offsets.tolist()))
+    index.idgens = {
+        'LFLF': compare_off_he(room_offsets),
         'OBIM': read_inner_uint16le,
         'OBCD': read_inner_uint16le,
         'LSCR': read_uint8le,
         'LSC2': read_uint32le,
-        'SCRP': compare_pid_off(dscr),
-        'CHAR': compare_pid_off(dchr),
-        'DIGI': compare_pid_off(dsou),
-        'SOUN': compare_pid_off(dsou),
-        'AKOS': compare_pid_off(dcos),
-        'MULT': compare_pid_off(dmul),
-        'AWIZ': compare_pid_off(dmul),
-        'RMDA': compare_pid_off(drmd),
-        'TALK': compare_pid_off(dsou),
-        'TLKE': compare_pid_off(dtlk),
+        **index.resource_idgens(
+            (
+                'SCRP',
+                'CHAR',
+                'DIGI',
+                'SOUN',
+                'AKOS',
+                'MULT',
+                'AWIZ',
+                'RMDA',
+                'TALK',
+                'TLKE',
+            )
+        ),
     }
+    return index
@@ -0,0 +1,169 @@
+import mmap
+import os
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from nutcracker.chiper import xor
+from nutcracker.utils.fileio import map_file
+
+from .index import GameIndex
+from .preset import sputm
+from .resource import get_disk
+from .tree import GameResource
+
+# resource directories of game index listed in inventory, by property of index
+INVENTORY_KINDS = (
+    'room_scripts',
+    'scripts',
+    'sounds',
+    'costumes',
+    'charsets',
+    'multis',
+    'talkies',
+)
+
+
+@dataclass
+class ResourceEntry(object):
+    """Resource listed in index directory
+
+    kind: directory listing the resource, as in `INVENTORY_KINDS`
+
+    offset: offset of resource relative to its room
+
+    size: chunk size when exact, otherwise upper bound from offset of
+    next resource listed in same room (None for last one)
+
+    tag: chunk tag, known only when read from disk
+    """
+
+    kind: str
+    gid: int
+    offset: int
+    size: Optional[int] = None
+    exact: bool = False
+    tag: Optional[str] = None
+
+
+@dataclass
+class RoomInventory(object):
+    """Resources listed in index for single room
+
+    disk: disk number containing the room, when given in index
+
+    offset: offset of room in its disk, when given in index (DLFL)
+
+    size: room (LFLF) chunk size, known only when read from disk
+    """
+
+    room: int
+    name: Optional[str] = None
+    disk: Optional[int] = None
+    offset: Optional[int] = None
+    size: Optional[int] = None
+    resources: List[ResourceEntry] = field(default_factory=list)
+
+    @property
+    def resources_size(self) -> int:
+        return sum(res.size or 0 for res in self.resources)
+
+
+@dataclass
+class Inventory(object):
+    """Rooms and resources of game, as listed in index
+
+    counts: number of rooms and of listed resources of each kind
+    """
+
+    rooms: Dict[int, RoomInventory]
+    counts: Dict[str, int]
+
+
+def index_inventory(index: GameIndex) -> Inventory:
+    """Inventory from index alone, sizes are estimated from resource offsets.
+
+    Directory entries of room 0 are unused and skipped.
+    """
+    rooms: Dict[int, RoomInventory] = {}
+
+    def get_room(room: int) -> RoomInventory:
+        if room not in rooms:
+            rooms[room] = RoomInventory(room, name=index.rnam.get(room))
+        return rooms[room]
+
+    disks = index.directory('DROO', 'DISK')
+    if disks is not None:
+        for room, (disk, _) in disks.items():
+            if disk:
+                get_room(room).disk = disk
+    if index.room_offsets is not None:
+        for room, offset in enumerate(index.room_offsets.tolist()):
+            if room in rooms:
+                rooms[room].offset = offset
+
+    counts = {'rooms': len(rooms)}
+    for kind in INVENTORY_KINDS:
+        directory = getattr(index, kind)
+        if directory is None:
+            continue
+        listed = [
+            (gid, room, offset)
+            for gid, (room, offset) in enumerate(
+                zip(directory.rooms.tolist(), directory.offsets.tolist())
+            )
+            if room
+        ]
+        counts[kind] = len(listed)
+        for gid, room, offset in listed:
+            get_room(room).resources.append(ResourceEntry(kind, gid, offset))
+
+    for inv in rooms.values():
+        inv.resources.sort(key=lambda res: (res.offset, res.kind, res.gid))
+        # resources sharing an offset share their estimated size
+        offsets = sorted({res.offset for res in inv.resources})
+        bounds = dict(zip(offsets, offsets[1:]))
+        for res in inv.resources:
+            end = bounds.get(res.offset)
+            res.size = None if end is None else end - res.offset
+
+    return Inventory(dict(sorted(rooms.items())), counts)
+
+
+def read_inventory(gameres: GameResource, exact: bool = False) -> Inventory:
+    """Inventory of game resources, disks are not opened unless exact.
+
+    exact: read chunk headers of rooms and resources from disks for
+    their tags and sizes, room offsets are read from disks when not in index.
+    """
+    inventory = index_inventory(gameres.index)
+    if not exact:
+        return inventory
+
+    game, config = gameres.game, gameres.config
+    with ExitStack() as stack:
+        # mapped disks, sliced through `XorView` when encrypted
+        disk_files: Dict[int, Any] = {}
+        for room, (disk, room_offset) in gameres.directory('LFLF').items():
+            if room not in inventory.rooms:
+                continue
+            if disk not in disk_files:
+                data = map_file(os.path.join(game.basedir, get_disk(game, disk)))
+                if isinstance(data, mmap.mmap):
+                    stack.enter_context(data)
+                if game.chiper_key:
+                    disk_files[disk] = xor.XorView(data, key=game.chiper_key)
+                else:
+                    disk_files[disk] = data
+            resource = disk_files[disk]
+            entry = inventory.rooms[room]
+            entry.disk, entry.offset = disk, room_offset
+            # room offset is of ROOM chunk following LFLF header,
+            # except in v8 where it is of LFLF chunk (base_fix)
+            start = room_offset + config.base_fix - 8
+            _, entry.size = sputm.read_header_at(resource, start)
+            for res in entry.resources:
+                start = room_offset + res.offset
+                res.tag, res.size = sputm.read_header_at(resource, start)
+                res.exact = True
+    return inventory
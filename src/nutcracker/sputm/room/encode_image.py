@@ -10,6 +10,7 @@ from nutcracker.codex.smap import decode_smap, encode_smap, extract_smap_codes,
 from nutcracker.utils.fileio import write_file
 
 from ..preset import sputm
+from .proom import map_image
 
 
 def encode_block_v8(filename, blocktype, version=8, ref=None):
@@ -20,9 +21,7 @@ def encode_block_v8(filename, blocktype, version=8, ref=None):
         ref_data = ref.data if ref else None
         if version == 8 and ref_data:
 
-            chunk = sputm.mktag(blocktype, ref_data)
-            s = sputm.generate_schema(chunk)
-            image = next(sputm(schema=s).map_chunks(chunk))
+            image = map_image(ref.chunk)
 
             bstr = sputm.findpath('BSTR/WRAP', image)
             sputm.render(bstr)
@@ -43,9 +42,7 @@ def encode_block_v8(filename, blocktype, version=8, ref=None):
         )
 
         # verify
-        chunk = sputm.mktag(blocktype, smap_v8)
-        s = sputm.generate_schema(chunk)
-        image = next(sputm(schema=s).map_chunks(chunk))
+        image = map_image(sputm.untag(sputm.mktag(blocktype, smap_v8)))
 
         bstr = sputm.findpath('BSTR/WRAP', image)
         assert np.array_equal(npim, decode_smap(*npim.shape, bstr.data[8:]))
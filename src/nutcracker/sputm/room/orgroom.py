@@ -7,7 +7,7 @@ import os
 from ..preset import sputm
 from .encode_image import encode_block_v8
 from .pproom import get_rooms, read_room_settings
-from .proom import read_imhd, read_imhd_v7, read_imhd_v8
+from .proom import map_image, read_imhd, read_imhd_v7, read_imhd_v8
 
 
 def read_room(header, rmim):
@@ -74,9 +74,7 @@ def encode_images_v8(basedir, imag, obj_name, room_id, rnam):
         im_path = im_path.replace(os.path.sep, '_')
         im_path = os.path.join(basedir, f'{im_path}.png')
 
-        chunk = sputm.mktag(imxx.tag, imxx.data)
-        s = sputm.generate_schema(chunk)
-        image = next(sputm(schema=s).map_chunks(chunk))
+        image = map_image(imxx.chunk)
         print(image)
 
         if os.path.exists(im_path):
@@ -94,9 +92,7 @@ def encode_images_v8(basedir, imag, obj_name, room_id, rnam):
                 print('ORIG')
                 sputm.render(image)
                 print('ENCODED')
-                sputm.render(
-                    next(sputm(schema=s).map_chunks(sputm.mktag('SMAP', encoded)))
-                )
+                sputm.render(map_image(sputm.untag(sputm.mktag('SMAP', encoded))))
             yield imxx, encoded
             print((im_path, imxx))
             # # uncomment for testing image import without changes
@@ -134,9 +130,7 @@ def make_room_images_patch(root, basedir, rnam, version):
                 im_path = im_path.replace(os.path.sep, '_')
                 im_path = os.path.join(basedir, 'backgrounds', f'{im_path}.png')
 
-                chunk = sputm.mktag(imxx.tag, imxx.data)
-                s = sputm.generate_schema(chunk)
-                image = next(sputm(schema=s).map_chunks(chunk))
+                image = map_image(imxx.chunk)
 
                 if os.path.exists(im_path):
                     # res_path = os.path.join(dirname, imxx.attribs['path'])
@@ -195,9 +189,7 @@ def make_room_images_patch(root, basedir, rnam, version):
                     im_path = im_path.replace(os.path.sep, '_')
                     im_path = os.path.join(basedir, 'objects', f'{im_path}.png')
 
-                    chunk = sputm.mktag(imag.tag, imag.data)
-                    s = sputm.generate_schema(chunk)
-                    image = next(sputm(schema=s).map_chunks(chunk))
+                    image = map_image(imag.chunk)
 
                     # print(im_path, imag)
                     if os.path.exists(im_path):
@@ -8,9 +8,11 @@ from PIL import Image
 from nutcracker.graphics import image
 from nutcracker.graphics.image import convert_to_pil_image
 from nutcracker.graphics.frame import resize_pil_image
+from nutcracker.kernel.table import ElementTable
 
 from ..preset import sputm
 from .proom import (
+    map_image,
     read_imhd,
     read_imhd_v7,
     read_imhd_v8,
@@ -22,16 +24,19 @@ from .proom import (
 
 def read_room_settings(lflf):
     room = sputm.find('ROOM', lflf) or sputm.find('RMDA', lflf)
-    header = read_rmhd_structured(sputm.find('RMHD', room).data)
-    trns = sputm.find('TRNS', room)
+    header = read_rmhd_structured(sputm.find('RMHD', room, index=True).data)
+    trns = sputm.find('TRNS', room, index=True)
     if trns:
         assert header.transparency is None
         header.transparency = sputm.find(
-            'TRNS', room
+            'TRNS', room, index=True
         ).data
-    palette = (sputm.find('CLUT', room) or sputm.findpath('PALS/WRAP/APAL', room)).data
+    palette = (
+        sputm.find('CLUT', room, index=True)
+        or sputm.findpath('PALS/WRAP/APAL', room)
+    ).data
 
-    rmim = sputm.find('RMIM', room) or sputm.find('RMIM', lflf)
+    rmim = sputm.find('RMIM', room, index=True) or sputm.find('RMIM', lflf)
     rmih = sputm.find('RMIH', rmim)
     if rmih:
         # 'Game Version < 7'
@@ -42,7 +47,7 @@ def read_room_settings(lflf):
         )
         assert 1 <= header.zbuffers <= 8
 
-    return header, palette, room, rmim or sputm.find('IMAG', room)
+    return header, palette, room, rmim or sputm.find('IMAG', room, index=True)
 
 
 def read_room(header, rmim):
@@ -70,9 +75,7 @@ def read_room(header, rmim):
         for imxx in wrap.children[1:]:
             assert imxx.attribs['gid'] == 1, imxx.attribs['gid']
 
-            chunk = sputm.mktag(imxx.tag, imxx.data)
-            s = sputm.generate_schema(chunk)
-            image = next(sputm(schema=s).map_chunks(chunk))
+            image = map_image(imxx.chunk)
 
             bgim = read_room_background_v8(
                 image, header.width, header.height, header.zbuffers
@@ -91,7 +94,7 @@ def read_room(header, rmim):
 
 
 def read_objects(header, room, version):
-    for obim in sputm.findall('OBIM', room):
+    for obim in sputm.findall('OBIM', room, index=True):
         imhd = sputm.find('IMHD', obim).data
         if version < 8:
             print('IMHD', len(imhd), imhd)
@@ -122,9 +125,7 @@ def read_objects(header, room, version):
                 wrap = sputm.find('WRAP', imag)
                 for iidx, bomp in enumerate(wrap.children[1:]):
 
-                    chunk = sputm.mktag(bomp.tag, bomp.data)
-                    s = sputm.generate_schema(chunk)
-                    image = next(sputm(schema=s).map_chunks(chunk))
+                    image = map_image(bomp.chunk)
 
                     bgim = read_room_background_v8(image, obj_width, obj_height, 0, transparency=header.transparency)
                     im = convert_to_pil_image(bgim)
@@ -136,6 +137,9 @@ def read_objects(header, room, version):
 
 
 def get_rooms(root):
+    if isinstance(root, ElementTable):
+        yield from root.elements(root.descend({'LFLF'}, {'LECF', 'LFLF'}))
+        return
     for elem in root:
         if elem.tag in {'LECF', 'LFLF'}:
             if elem.tag in {'LFLF'}:
@@ -2,7 +2,7 @@
 
 import io
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional, Set
 
 import numpy as np
 
@@ -10,6 +10,15 @@ from nutcracker.codex.codex import decode1
 from nutcracker.codex.smap import decode_he, decode_smap, read_uint16le, read_uint32le
 
 from ..preset import sputm
+from ..types import Chunk, Element
+
+# schemas of v8 image chunks by tag, shared by room decode and encode
+IMAGE_SCHEMAS: Dict[str, Dict[str, Set[str]]] = {}
+
+
+def map_image(chunk: Chunk) -> Element:
+    image: Element = sputm.map_nested(chunk, IMAGE_SCHEMAS)
+    return image
 
 
 def read_room_background_v8(image, width, height, zbuffers, transparency=None):
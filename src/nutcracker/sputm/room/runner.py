@@ -1,11 +1,13 @@
 import os
 from pathlib import Path
+from typing import Optional
 
 import typer
 
 from nutcracker.sputm.room.orgroom import make_room_images_patch
 from nutcracker.sputm.room.pproom import extract_room_images
 from nutcracker.utils.fileio import write_file
+from nutcracker.utils.meminfo import report_peak_memory
 
 from ..tree import open_game_resource, narrow_schema
 from ..schema import SCHEMA
@@ -17,11 +19,21 @@ app = typer.Typer()
 def decode(
     filename: Path = typer.Argument(..., help='Game resource index file'),
     ega_mode: bool = typer.Option(False, '--ega', help='Simulate EGA images decoding'),
+    index_cache: bool = typer.Option(
+        False, '--index-cache', help='Reuse element tree cached next to game resources'
+    ),
+    max_memory: Optional[int] = typer.Option(
+        None,
+        '--max-memory',
+        help='Read disks larger than given size in MB one room at a time',
+    ),
 ) -> None:
     gameres = open_game_resource(filename)
     basename = gameres.basename
 
     root = gameres.read_resources(
+        index_cache=index_cache,
+        max_memory=max_memory and max_memory << 20,
         # schema=narrow_schema(
         #     SCHEMA, {'LECF', 'LFLF', 'RMDA', 'ROOM', 'PALS'}
         # )
@@ -39,6 +51,9 @@ def decode(
 
     extract_room_images(root, basedir, rnam, version, ega_mode=ega_mode)
 
+    if max_memory is not None:
+        report_peak_memory()
+
 
 @app.command('encode')
 def encode(
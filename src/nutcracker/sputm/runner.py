@@ -1,12 +1,24 @@
 import glob
 import os
+from collections import Counter
 from pathlib import Path
+from typing import List, Optional, Set
 
 import typer
 
+from nutcracker.kernel.cache import dump_jsonl
+from nutcracker.kernel.merkle import (
+    HashNode,
+    diff_trees,
+    dump_hashes,
+    hash_tree,
+    load_hashes,
+)
+from nutcracker.kernel.stats import ParseStats
 from nutcracker.sputm.build import rebuild_resources, update_element
 from nutcracker.sputm.char.decode import decode_all_fonts, get_chars
 from nutcracker.sputm.char.encode import encode_char
+from nutcracker.sputm.inventory import read_inventory
 from nutcracker.sputm.schema import SCHEMA
 from nutcracker.sputm.strings import (
     RAW_ENCODING,
@@ -19,6 +31,7 @@ from nutcracker.sputm.strings import (
 )
 from nutcracker.sputm.tree import dump_resources, narrow_schema, open_game_resource
 from nutcracker.utils.fileio import write_file
+from nutcracker.utils.meminfo import report_peak_memory
 from .preset import sputm
 from .room import runner as room_image
 from .windex import runner as script_windex
@@ -33,17 +46,145 @@ app.add_typer(script_windex.app, name='script')
 @app.command()
 def extract(
     filename: Path = typer.Argument(..., help='Game resource index file'),
+    index_cache: bool = typer.Option(
+        False, '--index-cache', help='Reuse element tree cached next to game resources'
+    ),
+    workers: Optional[int] = typer.Option(
+        None, '--workers', help='Map rooms in parallel using given number of processes'
+    ),
+    max_memory: Optional[int] = typer.Option(
+        None,
+        '--max-memory',
+        help='Read disks larger than given size in MB one room at a time',
+    ),
 ) -> None:
     gameres = open_game_resource(filename)
     basename = gameres.basename
     print(f'Extracting game resources: {basename}')
-    dump_resources(gameres, basename)
+    dump_resources(
+        gameres,
+        basename,
+        index_cache=index_cache,
+        workers=workers,
+        max_memory=max_memory and max_memory << 20,
+    )
+    if max_memory is not None:
+        report_peak_memory()
+
+
+@app.command('map')
+def map_elements(
+    filename: Path = typer.Argument(..., help='Game resource index file'),
+    stats: Optional[Path] = typer.Option(
+        None, '--stats', help='Write per-tag parse statistics to given JSON file'
+    ),
+    max_depth: Optional[int] = typer.Option(
+        None, '--max-depth', help='Limit levels of elements to render'
+    ),
+    jsonl: Optional[Path] = typer.Option(
+        None, '--jsonl', help='Write elements as JSON lines records to given file'
+    ),
+) -> None:
+    gameres = open_game_resource(str(filename))
+    print(f'Mapping game resources: {gameres.basename}')
+    parse_stats = ParseStats() if stats else None
+    disks = gameres.read_resources(zero_copy=True, stats=parse_stats)
+    if jsonl:
+        # single dump, row indices of parents are unique across disks
+        with open(jsonl, 'w') as stream:
+            dump_jsonl(disks, stream)
+    else:
+        for disk in disks:
+            sputm.render(disk, max_depth=max_depth)
+    if parse_stats:
+        parse_stats.dump(str(stats))
+
+
+def read_hashes(filename: Path) -> List[HashNode]:
+    if filename.suffix == '.json':
+        with open(filename, 'r') as stream:
+            return load_hashes(stream)
+    gameres = open_game_resource(str(filename))
+    return hash_tree(gameres.read_resources(zero_copy=True))
+
+
+@app.command('hash')
+def hash_elements(
+    filename: Path = typer.Argument(..., help='Game resource index file'),
+    output: Path = typer.Option(
+        ..., '--output', '-o', help='Write content hashes to given JSON file'
+    ),
+) -> None:
+    hashes = read_hashes(filename)
+    with open(output, 'w') as stream:
+        dump_hashes(hashes, stream)
+
+
+@app.command()
+def diff(
+    old: Path = typer.Argument(
+        ..., help='Game resource index file, or content hashes JSON file'
+    ),
+    new: Path = typer.Argument(
+        ..., help='Game resource index file, or content hashes JSON file'
+    ),
+) -> None:
+    marks = {'added': '+', 'removed': '-', 'changed': '~'}
+    counts: Counter[str] = Counter()
+    for kind, onode, nnode in diff_trees(read_hashes(old), read_hashes(new)):
+        node = nnode or onode
+        assert node
+        counts[kind] += 1
+        path = node.attribs.get('path', node.tag)
+        line = f'{marks[kind]} {path}'
+        gid = node.attribs.get('gid')
+        if gid is not None:
+            line += f' (gid {gid})'
+        if onode and nnode:
+            osize, nsize = onode.attribs.get('size'), nnode.attribs.get('size')
+            if osize != nsize:
+                line += f' size {osize} -> {nsize}'
+        print(line)
+    print(', '.join(f'{counts[kind]} {kind}' for kind in marks))
+
+
+@app.command()
+def inventory(
+    filename: Path = typer.Argument(..., help='Game resource index file'),
+    exact: bool = typer.Option(
+        False, '--exact', help='Read chunk headers from disks for exact tags and sizes'
+    ),
+) -> None:
+    inv = read_inventory(open_game_resource(str(filename)), exact=exact)
+    # estimated sizes are upper bounds, from offset of next resource in room
+    mark = '' if exact else '<='
+    print(', '.join(f'{count} {kind}' for kind, count in inv.counts.items()))
+    for room in inv.rooms.values():
+        line = f'room {room.room:04d}'
+        if room.name:
+            line += f' {room.name}'
+        if room.disk is not None:
+            line += f' disk {room.disk}'
+        if room.offset is not None:
+            line += f' offset 0x{room.offset:08X}'
+        if room.size is not None:
+            line += f' size {room.size}'
+        total = f'{mark}{room.resources_size} bytes'
+        print(f'{line}: {len(room.resources)} resources, {total}')
+        for res in room.resources:
+            size = '?' if res.size is None else f'{mark}{res.size}'
+            tag = f' {res.tag}' if res.tag else ''
+            offset = f'0x{res.offset:08X}'
+            print(f'  {res.kind} {res.gid:04d}{tag} offset {offset} size {size}')
 
 
 @app.command()
 def build(
     dirname: Path = typer.Argument(..., help='Patch directory'),
     ref: Path = typer.Option(..., '--ref', help='Reference resource index'),
+    incremental: bool = typer.Option(
+        False, '--incremental', help='Copy rooms without patch files as is from ref'
+    ),
 ) -> None:
     gameres = open_game_resource(ref)
     basename = os.path.basename(os.path.normpath(dirname))
@@ -56,10 +197,15 @@ def build(
         # schema=narrow_schema(
         #     SCHEMA, {'LECF', 'LFLF', 'ROOM', 'RMIM'}
         # )
+        zero_copy=True,
     )
 
-    updated_resource = list(update_element(dirname, root, files))
-    rebuild_resources(gameres, basename, updated_resource)
+    updated_resource = list(update_element(str(dirname), root, files, serialize=False))
+    # rooms are updated where patch files are found
+    rooms = None
+    if incremental:
+        rooms = {os.path.relpath(path, dirname) for path in files}
+    rebuild_resources(gameres, basename, updated_resource, rooms)
 
 
 # ## STRINGS
@@ -82,7 +228,8 @@ def extract_strings(
     root = gameres.read_resources(
         schema=narrow_schema(
             SCHEMA, {'LECF', 'LFLF', 'RMDA', 'ROOM', 'OBCD', 'TLKE', *script_map}
-        )
+        ),
+        zero_copy=True,
     )
 
     var_size = 4 if gameres.game.version >= 8 else 2
@@ -98,6 +245,9 @@ def inject_strings(
     textfile: Path = typer.Option(
         'strings.txt', "--textfile", "-t", help='save strings to file'
     ),
+    incremental: bool = typer.Option(
+        False, '--incremental', help='Copy rooms without changed strings as is'
+    ),
 ) -> None:
     gameres = open_game_resource(filename)
     basename = gameres.basename
@@ -109,16 +259,21 @@ def inject_strings(
     root = gameres.read_resources(
         schema=narrow_schema(
             SCHEMA, {'LECF', 'LFLF', 'RMDA', 'ROOM', 'OBCD', 'TLKE', *script_map}
-        )
+        ),
+        zero_copy=True,
     )
 
+    changed: Set[str] = set()
     with open(textfile, 'r', **RAW_ENCODING) as f:
         fixed_lines = (print_to_msg(line) for line in f)
         updated_resource = list(
-            update_element_strings(root, fixed_lines, script_ops, script_map)
+            update_element_strings(
+                root, fixed_lines, script_ops, script_map, changed=changed
+            )
         )
 
-    rebuild_resources(gameres, basename, updated_resource)
+    rooms = changed if incremental else None
+    rebuild_resources(gameres, basename, updated_resource, rooms)
 
 
 # ## FONTS
@@ -1,6 +1,8 @@
 import io
-from typing import Iterable, Iterator, Mapping, Tuple, Type, TypeVar
+from typing import Iterable, Iterator, Mapping, Tuple, Type, TypeVar, Union
 
+from nutcracker.kernel.table import ElementTable
+from nutcracker.kernel.verify import policy
 from nutcracker.sputm.script.opcodes import OpTable
 from nutcracker.sputm.script.opcodes_v5 import SomeOp
 from nutcracker.sputm.types import Element
@@ -66,11 +68,12 @@ def descumm_iter(data: bytes, opcodes: OpTable, base_offset: int = 0) -> Iterabl
             for arg in get_argtype(stat.args, RefOffset):
                 assert arg.abs in bytecode, hex(arg.abs)
 
-        assert to_bytes(bytecode) == data
-        assert to_bytes(refresh_offsets(bytecode)) == data, (
-            to_bytes(refresh_offsets(bytecode)),
-            data,
-        )
+        if policy('descumm'):
+            assert to_bytes(bytecode) == data
+            assert to_bytes(refresh_offsets(bytecode)) == data, (
+                to_bytes(refresh_offsets(bytecode)),
+                data,
+            )
 
 
 def descumm(data: bytes, opcodes: OpTable) -> ByteCode:
@@ -156,7 +159,11 @@ script_map = {
 }
 
 
-def get_scripts(root: Iterable[Element]) -> Iterator[Element]:
+def get_scripts(root: Union[Iterable[Element], ElementTable]) -> Iterator[Element]:
+    if isinstance(root, ElementTable):
+        trail = {'LECF', 'LFLF', 'RMDA', 'ROOM', 'OBCD', *script_map}
+        yield from root.elements(root.descend({*script_map, 'OBCD'}, trail))
+        return
     for elem in root:
         if elem.tag in {'LECF', 'LFLF', 'RMDA', 'ROOM', 'OBCD', *script_map}:
             if elem.tag in {*script_map, 'OBCD'}:
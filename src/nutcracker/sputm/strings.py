@@ -2,7 +2,16 @@
 
 import io
 from string import printable
-from typing import Callable, Iterable, Iterator, Mapping, Optional, Tuple, TypedDict
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    TypedDict,
+)
 
 from nutcracker.sputm.script.bytecode import (
     descumm,
@@ -31,6 +40,7 @@ from nutcracker.sputm.script.opcodes import (
 )
 from nutcracker.sputm.script.opcodes_v5 import OPCODES_v5
 
+from .build import chunk_size
 from .preset import sputm
 from .resource import Game
 from .types import Element
@@ -51,7 +61,7 @@ def get_all_scripts(
 ) -> Iterator[bytes]:
     for elem in root:
         if elem.tag in {'OBNA', 'TEXT'}:
-            msg, rest = elem.data.split(b'\x00', maxsplit=1)
+            msg, rest = bytes(elem.data).split(b'\x00', maxsplit=1)
             assert rest == b''
             if msg != b'':
                 yield msg
@@ -93,37 +103,57 @@ def update_element_strings(
     strings: Iterator[bytes],
     opcodes: OpTable,
     script_map: Mapping[str, Callable[[bytes], Tuple[bytes, bytes]]],
+    changed: Optional[Set[str]] = None,
 ) -> Iterator[Element]:
-    offset = 0
+    """Replace strings in given disks, in order of appearance.
+
+    Only containers with changed children are serialized again, disks are
+    not, as they are written chunk by chunk.
+    changed: paths of rooms (LFLF) with changed strings are added to it.
+    """
     strings = iter(strings)
-    for elem in root:
-        elem.attribs['offset'] = offset
-        if elem.tag in {'OBNA', 'TEXT'} and elem.data != b'\x00':
-            elem.data = next(strings) + b'\x00'
-        elif elem.tag in {'LECF', 'LFLF', 'RMDA', 'ROOM', 'OBCD', 'TLKE', *script_map}:
-            if elem.tag in script_map:
-                serial, script_data = script_map[elem.tag](elem.data)
+    # elements with changed data
+    updated: Set[int] = set()
+
+    def update(root: Iterable[Element], level: int) -> Iterator[Element]:
+        offset = 0
+        for elem in root:
+            elem.attribs['offset'] = offset
+            data = elem.data
+            if elem.tag in {'OBNA', 'TEXT'} and data != b'\x00':
+                data = next(strings) + b'\x00'
+            elif elem.tag in script_map:
+                serial, script_data = script_map[elem.tag](data)
                 bc = descumm(script_data, opcodes)
-                updated = update_strings(bc, strings)
+                strs = update_strings(bc, strings)
                 if elem.tag == 'VERB':
                     pref = list(parse_verb_meta(serial))
                     comp = compose_verb_meta(pref)
                     assert comp == serial, (comp, serial, pref)
                     entries = [(idx, bc[off - 8].offset + 8) for idx, off in pref]
                     serial = compose_verb_meta(entries)
-                attribs = elem.attribs
-                elem.data = serial + to_bytes(updated)
-                elem.attribs = attribs
+                data = bytes(serial) + to_bytes(strs)
+            elif elem.tag in {'LECF', 'LFLF', 'RMDA', 'ROOM', 'OBCD', 'TLKE'}:
+                elem.children = list(update(elem, level + 1))
+                if any(id(child) in updated for child in elem.children):
+                    updated.add(id(elem))
+                    if level > 0:
+                        data = sputm.write_chunks(
+                            sputm.mktag(e.tag, e.data) for e in elem.children
+                        )
+            if data is not elem.data and data != elem.data:
+                updated.add(id(elem))
+                elem.data = data
+            if id(elem) in updated and elem.tag == 'LFLF' and changed is not None:
+                changed.add(elem.attribs['path'])
+            if level > 0:
+                elem.attribs['size'] = len(elem.data)
             else:
-                elem.children = list(
-                    update_element_strings(elem, strings, opcodes, script_map)
-                )
-                elem.data = sputm.write_chunks(
-                    sputm.mktag(e.tag, e.data) for e in elem.children
-                )
-        offset += len(elem.data) + 8
-        elem.attribs['size'] = len(elem.data)
-        yield elem
+                elem.attribs['size'] = sum(map(chunk_size, elem.children))
+            offset += chunk_size(elem)
+            yield elem
+
+    return update(root, 0)
 
 
 def escape_message(
@@ -1,14 +1,43 @@
 #!/usr/bin/env python3
 
+import hashlib
 import io
+import itertools
+import json
+import multiprocessing
 import os
 import struct
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, Mapping, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
-from nutcracker.utils.fileio import read_file
+from nutcracker.chiper import xor
+from nutcracker.kernel import cache
+from nutcracker.kernel.buffer import BufferLike
+from nutcracker.kernel.cache import ElementRecord
+from nutcracker.kernel.chunk import Chunk
+from nutcracker.kernel.element import TransientElement
+from nutcracker.kernel.index import create_element, map_records
+from nutcracker.kernel.stats import ParseStats
+from nutcracker.kernel.table import ElementTable
+from nutcracker.utils.fileio import map_file
 
 from .index import (
+    GameIndex,
+    GidReader,
+    IdGen,
     compare_pid_off,
     read_directory,
     read_index_he,
@@ -18,15 +47,15 @@ from .index import (
 )
 from .schema import SCHEMA
 from .preset import sputm
-from .resource import Game, load_resource
-from .types import Chunk
+from .resource import Game, get_disk, load_resource
+from .types import Element
 
 UINT32LE = struct.Struct('<I')
 
 
 @dataclass(frozen=True)
 class GameResourceConfig:
-    read_index: Callable
+    read_index: Callable[..., GameIndex]
     max_depth: int
     base_fix: int = 0
 
@@ -35,103 +64,470 @@ class GameResourceConfig:
 class GameResource:
     game: Game
     config: GameResourceConfig
-    rooms: Mapping[int, str]
-    idgens: Any
+    index: GameIndex
+    _directories: Dict[str, Mapping[int, Tuple[int, int]]] = field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+        compare=False,
+    )
 
     @property
-    def basename(self):
+    def basename(self) -> str:
         return self.game.basename
 
     @property
-    def root(self):
-        return read_game_resources(self.game, self.config, self.idgens)
+    def rooms(self) -> Mapping[int, str]:
+        return self.index.rnam
+
+    @property
+    def idgens(self) -> Dict[str, IdGen]:
+        return self.index.idgens
+
+    @property
+    def root(self) -> Iterator[Element]:
+        return read_game_resources(self.game, self.config, self.index)
 
-    def read_resources(self, **kwargs):
-        return read_game_resources(self.game, self.config, self.idgens, **kwargs)
+    def read_resources(self, **kwargs: Any) -> Iterator[Element]:
+        """See `read_game_resources`, disk files must not be written while used."""
+        return read_game_resources(self.game, self.config, self.index, **kwargs)
 
+    def read_tables(self, **kwargs: Any) -> Iterator[ElementTable]:
+        return read_game_tables(self.game, self.config, self.index, **kwargs)
 
-def save_tree(cfg, element, basedir='.'):
+    def directory(self, tag: str) -> Mapping[int, Tuple[int, int]]:
+        """Index directory for given resource tag, kept for later lookups."""
+        if tag not in self._directories:
+            self._directories[tag] = read_index_directory(self.game, self.index, tag)
+        return self._directories[tag]
+
+    def get(self, tag: str, gid: int, **kwargs: Any) -> Element:
+        """Read single resource (or room, as LFLF) using index directories.
+
+        Only the resource chunk is read from its disk, without mapping the disk.
+        """
+        return read_game_resource(self, tag, gid, **kwargs)
+
+
+def save_tree(cfg: Any, element: Optional[Element], basedir: str = '.') -> None:
     if not element:
         return
     path = os.path.join(basedir, element.attribs['path'])
-    if element.children:
+    children = iter(element)
+    first = next(children, None)
+    if first is not None:
         os.makedirs(path, exist_ok=True)
-        for c in element.children:
+        for c in itertools.chain([first], children):
             save_tree(cfg, c, basedir=basedir)
     else:
         with open(path, 'wb') as f:
             f.write(cfg.mktag(element.tag, element.data))
 
 
-def read_game_resources(game: Game, config: GameResourceConfig, idgens, **kwargs):
-    _, *disks = game.disks
+def save_children(
+    cfg: Any, element: Element, basedir: str = '.'
+) -> Iterator[Element]:
+    """Save each child of given element, yielding it once saved."""
+    os.makedirs(os.path.join(basedir, element.attribs['path']), exist_ok=True)
+    for child in element:
+        save_tree(cfg, child, basedir=basedir)
+        yield child
+
+
+def update_element_path_factory(
+    didx: int, config: GameResourceConfig, idgens: Mapping[str, IdGen]
+) -> Callable[[Optional[Element], Chunk, int], Dict[str, Any]]:
+    # per disk state, bound here since children are parsed lazily,
+    # possibly after the next disk has already started,
+    # rooms directory (LFLF) is replaced once LOFF is read
+    readers: Dict[str, GidReader] = {
+        tag: idgen for tag, idgen in idgens.items() if callable(idgen)
+    }
+    paths: Set[str] = set()
+    wraps: Dict[str, Dict[int, int]] = {}
+
+    def update_element_path(
+        parent: Optional[Element], chunk: Chunk, offset: int
+    ) -> Dict[str, Any]:
+
+        if chunk.tag == 'LOFF':
+            # should not happen in HE games
+
+            offs = dict(read_directory(chunk.data))
+
+            # # to ignore cloned rooms
+            # droo = idgens['LFLF']
+            # droo = {k: v for k, v  in droo.items() if v == (didx + 1, 0)}
+            # droo = {k: (disk, offs[k]) for k, (disk, _)  in droo.items()}
+
+            droo = {k: (didx + 1, v) for k, v in offs.items()}
+            readers['LFLF'] = compare_pid_off(droo, 16 - config.base_fix)
+
+        get_gid = readers.get(chunk.tag)
+        gid: Optional[int]
+        if not parent:
+            gid = didx + 1
+        elif parent.attribs['path'] in wraps:
+            gid = wraps[parent.attribs['path']].get(offset)
+        else:
+            # pass a view to avoid copying (and paging in) the whole chunk
+            gid = get_gid and get_gid(
+                parent.attribs['gid'], chunk.slice(chunk.buffer), offset
+            )
 
-    for didx, disk in enumerate(disks):
+        base = chunk.tag + (
+            f'_{gid:04d}'
+            if gid is not None
+            else ''
+            if not get_gid
+            else f'_o_{offset:04X}'
+        )
+
+        dirname = parent.attribs['path'] if parent else ''
+        path = os.path.join(dirname, base)
+
+        if path in paths:
+            path += 'd'
+        # assert path not in paths, path
+        paths.add(path)
+
+        if chunk.tag == 'WRAP':
+            wrap = sputm.untag(chunk.data)
+            size = len(wrap.data) // 4
+            wraps[path] = dict(
+                zip(struct.unpack(f'<{size}I', wrap.data), range(1, size + 1))
+            )
 
-        resource = read_file(os.path.join(game.basedir, disk), key=game.chiper_key)
+        res = {'path': path, 'gid': gid}
+        return res
+
+    return update_element_path
+
+
+def cache_params(game: Game, config: GameResourceConfig, **kwargs: Any) -> str:
+    """Fingerprint of everything besides disk content affecting the tree."""
+    kwargs.pop('zero_copy', None)
+    kwargs.pop('stats', None)
+    schema = kwargs.pop('schema', SCHEMA)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(
+        json.dumps(
+            {
+                'schema': {tag: sorted(tags) for tag, tags in schema.items()},
+                'chiper_key': game.chiper_key,
+                'base_fix': config.base_fix,
+                **kwargs,
+            },
+            sort_keys=True,
+            default=repr,
+        ).encode()
+    )
+    for elem in game.index:
+        digest.update(elem.chunk.buffer)
+    return digest.hexdigest()
 
-        # # commented out, use pre-calculated index instead,
-        # # as calculating is time-consuming
-        # s = sputm.generate_schema(resource)
-        # pprint.pprint(s)
-        # root = sputm.map_chunks(resource, idgen=idgens, schema=s)
 
-        paths: Dict[str, Chunk] = {}
-        wraps: Dict[str, Dict[int, int]] = {}
+def cache_path(path: str, params: str) -> str:
+    """Index cache file of given disk, one per fingerprint of parameters."""
+    return f'{path}.{params[:16]}.idx.json'
 
-        def update_element_path(parent, chunk, offset):
 
-            if chunk.tag == 'LOFF':
-                # should not happen in HE games
+_room_worker_state: Tuple[Any, ...] = ()
 
-                offs = dict(read_directory(chunk.data))
 
-                # # to ignore cloned rooms
-                # droo = idgens['LFLF']
-                # droo = {k: v for k, v  in droo.items() if v == (didx + 1, 0)}
-                # droo = {k: (disk, offs[k]) for k, (disk, _)  in droo.items()}
+def _init_room_worker(*state: Any) -> None:
+    global _room_worker_state
+    _room_worker_state = state
 
-                droo = {k: (didx + 1, v) for k, v in offs.items()}
-                idgens['LFLF'] = compare_pid_off(droo, 16 - config.base_fix)
 
-            get_gid = idgens.get(chunk.tag)
-            if not parent:
-                gid = didx + 1
-            elif parent.attribs['path'] in wraps:
-                gid = wraps[parent.attribs['path']].get(offset)
-            else:
-                gid = get_gid and get_gid(
-                    parent and parent.attribs['gid'], chunk.data, offset
-                )
+def _map_room(
+    didx: int, start: int, path: str, gid: Optional[int]
+) -> Tuple[List[ElementRecord], Optional[ParseStats]]:
+    cfg, resources, config, idgens = _room_worker_state
+    if cfg.stats:
+        # collected per room, to be merged in parent process
+        cfg = cfg(stats=ParseStats())
+    chunk = cfg.untag(resources[didx], start)
+    lflf = create_element(0, chunk, path=path, gid=gid)
+    update_element_path = update_element_path_factory(didx, config, idgens)
+    children = cfg.map_chunks(
+        chunk.slice(chunk.buffer), parent=lflf, level=2, extra=update_element_path
+    )
+    return list(cache.dump_records(children)), cfg.stats
+
+
+def map_rooms_parallel(
+    cfg: Any,
+    config: GameResourceConfig,
+    idgens: Mapping[str, IdGen],
+    resources: Mapping[int, BufferLike],
+    workers: int,
+) -> Dict[int, List[Element]]:
+    """Map given disks, with each room (LFLF) subtree mapped in a process pool.
+
+    Disk and room headers are mapped here, in order, to resolve room offsets,
+    paths and gids. Workers are forked and share the mapped disks,
+    parse statistics collected by workers are merged into `cfg.stats`.
+    Where processes cannot be forked, rooms are mapped lazily as usual.
+    """
+    roots: Dict[int, List[Element]] = {}
+    rooms: List[Element] = []
+    jobs: List[Tuple[int, int, str, Optional[int]]] = []
+    for didx, resource in resources.items():
+        update_element_path = update_element_path_factory(didx, config, idgens)
+        roots[didx] = list(cfg.map_chunks(resource, extra=update_element_path))
+        for disk in roots[didx]:
+            base = disk.attribs['offset'] + disk.chunk.slice.offset
+            for elem in disk:
+                if elem.tag == 'LFLF':
+                    rooms.append(elem)
+                    jobs.append(
+                        (
+                            didx,
+                            base + elem.attribs['offset'],
+                            elem.attribs['path'],
+                            elem.attribs['gid'],
+                        )
+                    )
+
+    if not jobs:
+        return roots
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        # rooms are left to be mapped lazily in this process
+        sputm.logger.warning(
+            'cannot fork processes on this platform, rooms are mapped serially'
+        )
+        return roots
+
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context('fork'),
+        initializer=_init_room_worker,
+        initargs=(cfg, resources, config, idgens),
+    ) as pool:
+        chunksize = max(1, len(jobs) // (4 * workers))
+        results = pool.map(_map_room, *zip(*jobs), chunksize=chunksize)
+        for room, (records, stats) in zip(rooms, results):
+            if stats:
+                cfg.stats.merge(stats)
+            room.children = cache.load_records(
+                cfg, room.chunk.slice(room.chunk.buffer), records
+            )
+    return roots
+
+
+def stream_disk(
+    cfg: Any, path: str, key: int, extra: Callable[..., Dict[str, Any]]
+) -> Iterator[Element]:
+    with open(path, 'rb') as res:
+        yield from cfg.stream_elements(
+            xor.XorReader(res, key=key), streamed={'LECF'}, extra=extra
+        )
+
+
+def read_disk_rooms(
+    cfg: Any, path: str, key: int, extra: Callable[..., Dict[str, Any]]
+) -> Element:
+    """Read disk from file, one room (LFLF) at a time.
+
+    Rooms are read and decrypted as the disk is iterated, and released
+    after use unless kept by caller. Disk can be iterated only once.
+    """
+    elements = stream_disk(cfg, path, key, extra)
+    disk = next(elements)
+    return TransientElement(disk.chunk, disk.attribs, [], _pending=elements)
+
+
+def read_game_resources(
+    game: Game,
+    config: GameResourceConfig,
+    index: GameIndex,
+    index_cache: bool = False,
+    workers: Optional[int] = None,
+    max_memory: Optional[int] = None,
+    **kwargs: Any,
+) -> Iterator[Element]:
+    """Map disks of game, in order, with rooms mapped lazily on access.
+
+    Unencrypted disks are memory-mapped and read as the tree is accessed,
+    disk files must not be written over while the tree is in use
+    (see `map_chunks`); write to new files and replace them when done.
+    """
+    _, *disks = game.disks
+    idgens = index.idgens
+
+    cfg = sputm(**kwargs)
+    params = cache_params(game, config, **kwargs) if index_cache else ''
+
+    def fits(disk: str) -> bool:
+        size = os.path.getsize(os.path.join(game.basedir, disk))
+        return max_memory is None or size <= max_memory
+
+    if not all(map(fits, disks)):
+        # memory budget mode, disks are read one room at a time
+        for didx, disk in enumerate(disks):
+            update_element_path = update_element_path_factory(didx, config, idgens)
+            path = os.path.join(game.basedir, disk)
+            yield read_disk_rooms(cfg, path, game.chiper_key, update_element_path)
+        return
+
+    def open_disk(disk: str) -> Tuple[str, BufferLike, Optional[List[Any]]]:
+        path = os.path.join(game.basedir, disk)
+        resource = map_file(path, key=game.chiper_key)
+        if not index_cache:
+            return path, resource, None
+        cached = cache.read_cache(cache_path(path, params), path, params)
+        return path, resource, cached or None
+
+    opened: Iterable[Tuple[str, BufferLike, Optional[List[Any]]]]
+    opened = map(open_disk, disks)
+    if workers:
+        opened = list(opened)
+        mapped = map_rooms_parallel(
+            cfg,
+            config,
+            idgens,
+            {
+                didx: resource
+                for didx, (_, resource, records) in enumerate(opened)
+                if records is None
+            },
+            workers,
+        )
+
+    for didx, (path, resource, records) in enumerate(opened):
+
+        if records is not None:
+            yield from cache.load_records(cfg, resource, records)
+            continue
+
+        # # commented out, use pre-calculated index instead,
+        # # as calculating is time-consuming
+        # s = sputm.generate_schema(resource)
+        # pprint.pprint(s)
+        # root = sputm.map_chunks(resource, idgen=idgens, schema=s)
 
-            base = chunk.tag + (
-                f'_{gid:04d}'
-                if gid is not None
-                else ''
-                if not get_gid
-                else f'_o_{offset:04X}'
+        update_element_path = update_element_path_factory(didx, config, idgens)
+        if index_cache:
+            # records are written as mapped, without creating elements first
+            records = list(
+                cache.dump_records(mapped[didx])
+                if workers
+                else map_records(cfg, resource, extra=update_element_path)
             )
+            path_cache = cache_path(path, params)
+            try:
+                cache.write_cache(path_cache, path, params, records)
+            except OSError:
+                sputm.logger.warning('could not write index cache %s', path_cache)
+            yield from cache.load_records(cfg, resource, records)
+            continue
 
-            dirname = parent.attribs['path'] if parent else ''
-            path = os.path.join(dirname, base)
+        if workers:
+            root = mapped[didx]
+        else:
+            root = cfg.map_chunks(resource, extra=update_element_path)
 
-            if path in paths:
-                path += 'd'
-            # assert path not in paths, path
-            paths[path] = chunk
+        yield from root
 
-            if chunk.tag == 'WRAP':
-                offs = sputm.untag(chunk.data)
-                size = len(offs.data) // 4
-                offs = dict(
-                    zip(struct.unpack(f'<{size}I', offs.data), range(1, size + 1))
-                )
-                wraps[path] = offs
 
-            res = {'path': path, 'gid': gid}
-            return res
+def read_game_tables(
+    game: Game, config: GameResourceConfig, index: GameIndex, **kwargs: Any
+) -> Iterator[ElementTable]:
+    """Read game resources as array-backed element tables, one per disk.
+
+    Tables are filled straight from chunk headers, without mapping elements.
+    """
+    _, *disks = game.disks
+    idgens = index.idgens
 
-        yield from sputm(**kwargs).map_chunks(resource, extra=update_element_path)
+    for didx, disk in enumerate(disks):
+        resource = map_file(os.path.join(game.basedir, disk), key=game.chiper_key)
+        update_element_path = update_element_path_factory(didx, config, idgens)
+        yield ElementTable.from_buffer(
+            sputm(**kwargs), resource, extra=update_element_path
+        )
+
+
+def read_index_directory(
+    game: Game, index: GameIndex, tag: str
+) -> Mapping[int, Tuple[int, int]]:
+    """Directory of given resource tag from game index.
+
+    LFLF: (disk, offset) by room, where offset is from room data
+    (room chunk in v8), read from LOFF in each disk unless given in DLFL.
+
+    other resources: (room, offset) by gid, offset as above.
+    """
+    if tag != 'LFLF':
+        return index.resource_directory(tag)
+    droo = index.directory('DROO', 'DISK')
+    disks = {room: disk for room, (disk, _) in droo.items()} if droo else {}
+    if index.room_offsets is not None:
+        offsets = enumerate(index.room_offsets.tolist())
+        return {room: (disks.get(room, 1), off) for room, off in offsets}
+    rooms: Dict[int, Tuple[int, int]] = {}
+    for disk in sorted(set(disks.values()) - {0}):
+        resource = map_file(os.path.join(game.basedir, get_disk(game, disk)))
+        buffer: Union[BufferLike, xor.XorView] = resource
+        if game.chiper_key:
+            buffer = xor.XorView(resource, key=game.chiper_key)
+        # LOFF is first chunk in LECF
+        loff = sputm.read_chunk_at(buffer, 8)
+        if loff.tag == 'LOFF':
+            rooms.update({room: (disk, off) for room, off in read_directory(loff.data)})
+    return rooms
+
+
+def read_game_resource(
+    gameres: GameResource,
+    tag: str,
+    gid: int,
+    **kwargs: Any,
+) -> Element:
+    game, config = gameres.game, gameres.config
+    room, offset = gid, 0
+    if tag != 'LFLF':
+        room, offset = gameres.directory(tag)[gid]
+    disk, room_offset = gameres.directory('LFLF')[room]
+
+    disk_name = get_disk(game, disk)
+    resource = map_file(os.path.join(game.basedir, disk_name))
+    buffer: Union[BufferLike, xor.XorView] = resource
+    if game.chiper_key:
+        buffer = xor.XorView(resource, key=game.chiper_key)
+
+    cfg = sputm(**kwargs)
+    if tag == 'LFLF':
+        # room offset is of room data, except in v8
+        start = room_offset + config.base_fix - 8
+    else:
+        start = room_offset + offset
+    chunk = cfg.read_chunk_at(buffer, start)
+    if chunk.tag != tag:
+        raise ValueError(
+            f'expected {tag} at offset {start} of {disk_name} but found {chunk.tag}'
+        )
+
+    # same path, gid and offset as when mapped from disk
+    didx = game.disks.index(disk_name) - 1
+    path = os.path.join(f'LECF_{didx + 1:04d}', f'LFLF_{room:04d}')
+    if tag == 'LFLF':
+        elem = create_element(start - 8, chunk, path=path, gid=gid)
+        level = 2
+    else:
+        path = os.path.join(path, f'{tag}_{gid:04d}')
+        elem = create_element(offset - config.base_fix, chunk, path=path, gid=gid)
+        level = 3
+    update_element_path = update_element_path_factory(didx, config, gameres.idgens)
+    return elem.content(
+        cfg.map_chunks(
+            chunk.slice(chunk.buffer),
+            parent=elem,
+            level=level,
+            extra=update_element_path,
+        )
+    )
 
 
 def create_config(game: Game) -> GameResourceConfig:
@@ -167,6 +563,7 @@ def open_game_resource(
     filename: str,
     version: Optional[Tuple[int, int]] = None,
     chiper_key: Optional[int] = None,
+    verbose: bool = False,
 ) -> GameResource:
     game = load_resource(filename, chiper_key=chiper_key)
 
@@ -174,27 +571,40 @@ def open_game_resource(
         game.version, game.he_version = version
     config = create_config(game)
 
-    rooms, idgens = config.read_index(game.index)
+    index = config.read_index(game.index, verbose=verbose)
 
-    return GameResource(game, config, rooms, idgens)
+    return GameResource(game, config, index)
 
 
 def dump_resources(
-    gameres: GameResource, basename: str, schema: Optional[Mapping[str, Set]] = None
-):
+    gameres: GameResource,
+    basename: str,
+    schema: Optional[Mapping[str, Set[str]]] = None,
+    index_cache: bool = False,
+    workers: Optional[int] = None,
+    max_memory: Optional[int] = None,
+) -> None:
     schema = schema or narrow_schema(
         SCHEMA,
         {'LECF', 'LFLF', 'RMDA', 'ROOM'},
     )
     os.makedirs(basename, exist_ok=True)
-    root = gameres.read_resources(schema=schema)
+    root = gameres.read_resources(
+        schema=schema,
+        zero_copy=True,
+        index_cache=index_cache,
+        workers=workers,
+        max_memory=max_memory,
+    )
     with open(os.path.join(basename, 'rpdump.xml'), 'w') as f:
         for disk in root:
-            sputm.render(disk, stream=f)
-            save_tree(sputm, disk, basedir=basename)
+            # save each room as it is rendered, in a single pass over disk
+            sputm.render(disk.content(save_children(sputm, disk, basename)), stream=f)
 
 
-def narrow_schema(schema, trail):
+def narrow_schema(
+    schema: Mapping[str, Set[str]], trail: Set[str]
+) -> Dict[str, Set[str]]:
     new_schema = dict(schema)
     for container in schema:
         if container not in trail:
@@ -6,6 +6,8 @@ from typing import Optional
 
 import typer
 
+from nutcracker.utils.meminfo import report_peak_memory
+
 from ..preset import sputm
 from ..tree import open_game_resource, narrow_schema
 from ..schema import SCHEMA
@@ -44,6 +46,17 @@ def decompile(
     verbose: bool = typer.Option(False, '--verbose', help='Dump each opcode for debug'),
     chiper_key: Optional[str] = typer.Option(None, '--chiper-key', help='XOR key for decrypting game resources'),
     skip_transform: bool = typer.Option(False, '--skip-transform', help='Disable structure simplification'),
+    index_cache: bool = typer.Option(
+        False, '--index-cache', help='Reuse element tree cached next to game resources'
+    ),
+    workers: Optional[int] = typer.Option(
+        None, '--workers', help='Map rooms in parallel using given number of processes'
+    ),
+    max_memory: Optional[int] = typer.Option(
+        None,
+        '--max-memory',
+        help='Read disks larger than given size in MB one room at a time',
+    ),
 ) -> None:
     gameres = open_game_resource(
         filename,
@@ -57,6 +70,10 @@ def decompile(
         schema=narrow_schema(
             SCHEMA, {'LECF', 'LFLF', 'RMDA', 'ROOM', 'OBCD', *script_map}
         ),
+        zero_copy=True,
+        index_cache=index_cache,
+        workers=workers,
+        max_memory=max_memory and max_memory << 20,
     )
 
     rnam = gameres.rooms
@@ -92,6 +109,9 @@ def decompile(
             with open(fname, 'w', **RAW_ENCODING) as script_file:
                 dump_script_file(room_no, room, decompile, script_file)
 
+    if max_memory is not None:
+        report_peak_memory()
+
 
 if __name__ == '__main__':
     app()
@@ -1362,7 +1362,8 @@ def get_elem_info(elem):
     pref, script_data = script_map[elem.tag](elem.data)
     entries = {}
     if elem.tag == 'VERB':
-        obj_names[gid] = msg_to_print(sputm.find('OBNA', obcd).data.split(b'\0')[0])
+        obna = bytes(sputm.find('OBNA', obcd).data)
+        obj_names[gid] = msg_to_print(obna.split(b'\0')[0])
         pref = list(parse_verb_meta(pref))
         entries = {off: idx[0] for idx, off in pref}
     else:
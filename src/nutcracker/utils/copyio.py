@@ -1,9 +1,46 @@
 import functools
 import io
-from typing import Callable, Iterator, Optional
+import os
+from typing import IO, Callable, Iterator, Optional
 
 
 def buffered(
     source: Callable[[Optional[int]], bytes], buffer_size: int = io.DEFAULT_BUFFER_SIZE
 ) -> Iterator[bytes]:
     return iter(functools.partial(source, buffer_size), b'')
+
+
+def copy_range(
+    src: IO[bytes],
+    dst: IO[bytes],
+    offset: int,
+    size: int,
+    buffer_size: int = 1 << 20,
+) -> int:
+    """Copy given range of source file to current position of destination file.
+
+    Data is copied in kernel with `os.sendfile` where supported.
+    Destination is written at position of its file descriptor,
+    buffered streams should be flushed first.
+    """
+    copied = 0
+    if hasattr(os, 'sendfile'):
+        try:
+            while copied < size:
+                sent = os.sendfile(
+                    dst.fileno(), src.fileno(), offset + copied, size - copied
+                )
+                if not sent:
+                    return copied
+                copied += sent
+            return copied
+        except OSError:
+            # e.g. file to file copy is not supported
+            pass
+    src.seek(offset + copied)
+    while copied < size:
+        data = src.read(min(buffer_size, size - copied))
+        if not data:
+            break
+        copied += dst.write(data)
+    return copied
@@ -1,4 +1,11 @@
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator
+
 from nutcracker.chiper import xor
+from nutcracker.kernel.buffer import BufferLike
 
 
 def read_file(path: str, key: int = 0x00) -> bytes:
@@ -6,6 +13,46 @@ def read_file(path: str, key: int = 0x00) -> bytes:
         return xor.read(res, key=key)
 
 
+def map_file(path: str, key: int = 0x00) -> BufferLike:
+    """Map file to memory for lazy, read-only access.
+
+    Only the pages actually sliced by the caller are read from disk.
+    Encrypted files cannot be mapped as is, these are read and decrypted in full.
+    """
+    if key != 0x00:
+        return read_file(path, key=key)
+    with open(path, 'rb') as res:
+        try:
+            return mmap.mmap(res.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # cannot map empty file
+            return b''
+
+
 def write_file(path: str, data: bytes, key: int = 0x00) -> int:
     with open(path, 'wb') as res:
         return xor.write(res, data, key=key)
+
+
+@contextmanager
+def replace_file(path: str) -> Iterator[IO[bytes]]:
+    """Write file out of place, replacing given path once written in full.
+
+    Given path may still be read while writing, e.g. when mapped to memory
+    as source of the written data. Stream is unbuffered, writes may be
+    partial (see `write_chunk`), and file is removed on error.
+    """
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)),
+        prefix=f'.{os.path.basename(path)}.',
+    )
+    try:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp, 0o666 & ~umask)
+        with open(fd, 'wb', buffering=0) as stream:
+            yield stream
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
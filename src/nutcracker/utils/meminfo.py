@@ -0,0 +1,20 @@
+import sys
+from typing import Optional
+
+
+def peak_memory() -> Optional[int]:
+    """Peak resident set size of current process in bytes, None if unknown."""
+    try:
+        import resource
+    except ImportError:
+        # not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # reported in bytes on macOS, kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def report_peak_memory() -> None:
+    peak = peak_memory()
+    if peak is not None:
+        print(f'Peak memory usage: {peak / (1 << 20):.1f}MB')
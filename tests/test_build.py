@@ -0,0 +1,243 @@
+import glob
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import pytest
+from typer.testing import CliRunner
+
+from nutcracker.chiper import xor
+from nutcracker.sputm import build
+from nutcracker.sputm.build import (
+    rebuild_resources,
+    update_element,
+    write_dir,
+    write_dir_v8,
+    write_dlfl,
+)
+from nutcracker.sputm.index import DIRECTORY_LOFF
+from nutcracker.sputm.preset import sputm
+from nutcracker.sputm.runner import app
+from nutcracker.sputm.schema import SCHEMA
+from nutcracker.sputm.strings import (
+    get_optable,
+    get_script_map,
+    update_element_strings,
+)
+from nutcracker.sputm.tree import narrow_schema, open_game_resource
+
+KEY = 0x69
+NUM_ROOMS = 3
+
+
+def make_script(num: int) -> bytes:
+    # print message and stop
+    return b'\xba' + f'script {num}'.encode() + b'\x00\x66'
+
+
+# index extension, MAXS size and directory tags by game version
+INDEX_LAYOUTS = {
+    6: ('.000', 30, ('DROO', 'DSCR', 'DSOU', 'DCOS', 'DCHR')),
+    8: ('.LA0', 168, ('DROO', 'DRSC', 'DSCR', 'DSOU', 'DCOS', 'DCHR')),
+    # Humongous, v6.90
+    90: (
+        '.HE0',
+        38,
+        ('DIRI', 'DIRR', 'DIRS', 'DIRN', 'DIRC', 'DIRF', 'DIRM', 'DIRT', 'DISK'),
+    ),
+}
+
+
+def make_index(
+    version: int,
+    rooms: Dict[int, Tuple[int, int]],
+    scripts: Dict[int, Tuple[int, int]],
+    sounds: Dict[int, Tuple[int, int]],
+) -> bytes:
+    """Index chunks for given directories, other directories are empty."""
+    _, maxs, tags = INDEX_LAYOUTS[version]
+    write = write_dir_v8 if version == 8 else write_dir
+    directories = {'DROO': rooms, 'DISK': rooms, 'DSCR': scripts, 'DIRS': scripts}
+    directories.update({'DSOU': sounds, 'DIRN': sounds})
+    chunks = [sputm.mktag('MAXS', bytes(maxs))]
+    chunks += [
+        sputm.mktag(tag, write(directories.get(tag, {0: (0, 0)}))) for tag in tags
+    ]
+    if version == 6:
+        names = {room: f'room{room}'.encode().ljust(9, b'\0') for room in rooms}
+        rnam = b''.join(
+            bytes([room]) + bytes(c ^ 0xFF for c in name)
+            for room, name in names.items()
+            if room
+        )
+        chunks.insert(0, sputm.mktag('RNAM', rnam + b'\0'))
+        chunks.append(sputm.mktag('DOBJ', b'\0\0'))
+    if version == 90:
+        offsets = dict.fromkeys(rooms, 0)
+        chunks.append(sputm.mktag('DLFL', write_dlfl(offsets)))
+    return b''.join(chunks)
+
+
+def make_game(
+    gamedir: Path, key: int = KEY, aliases: Optional[Dict[int, int]] = None
+) -> Path:
+    """Minimal v6 game with single disk.
+
+    aliases: extra script gids, listed in index at location of another gid
+    """
+    rooms = range(1, NUM_ROOMS + 1)
+    lflfs: List[bytes] = []
+    scripts = {0: (0, 0)}
+    sounds = {0: (0, 0)}
+    for room in rooms:
+        chunks = [sputm.mktag('ROOM', sputm.mktag('RMHD', bytes(6)))]
+        for gid in (2 * room - 1, 2 * room):
+            offset = sum(len(chunk) for chunk in chunks)
+            scripts[gid] = (room, offset)
+            chunks.append(sputm.mktag('SCRP', make_script(gid)))
+            sounds[gid] = (room, offset + len(chunks[-1]))
+            # first room is odd sized
+            chunks.append(sputm.mktag('SOUN', bytes([gid]) * (100 + (gid == 1))))
+        lflfs.append(sputm.mktag('LFLF', b''.join(chunks)))
+
+    loff_size = 8 + 1 + 5 * NUM_ROOMS
+    offsets, pos = [], loff_size
+    for room, lflf in enumerate(lflfs, 1):
+        offsets.append((room, 8 + pos + 8))
+        pos += len(lflf)
+    loff = sputm.mktag('LOFF', DIRECTORY_LOFF.write(NUM_ROOMS, entries=offsets))
+    disk = sputm.mktag('LECF', loff + b''.join(lflfs))
+
+    for gid, other in (aliases or {}).items():
+        scripts[gid] = scripts[other]
+    droo = {0: (0, 0), **dict.fromkeys(rooms, (1, 0))}
+    index = make_index(6, droo, scripts, sounds)
+
+    gamedir.mkdir()
+    (gamedir / 'GAME.000').write_bytes(xor.decrypt(index, key=key))
+    (gamedir / 'GAME.001').write_bytes(xor.decrypt(disk, key=key))
+    return gamedir / 'GAME.000'
+
+
+@pytest.fixture
+def game(tmp_path: Path) -> Path:
+    return make_game(tmp_path / 'game')
+
+
+def make_patch(patch: Path, path: str, data: bytes) -> Path:
+    patch_file = patch / path
+    patch_file.parent.mkdir(parents=True)
+    patch_file.write_bytes(data)
+    return patch
+
+
+def run(*args: str) -> None:
+    result = CliRunner().invoke(app, list(args), catch_exceptions=False)
+    assert result.exit_code == 0, result.output
+
+
+def build_game(
+    game: Path,
+    outdir: Path,
+    patch: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    *options: str,
+) -> List[bytes]:
+    outdir.mkdir(exist_ok=True)
+    with monkeypatch.context() as ctx:
+        ctx.chdir(outdir)
+        run('build', str(patch), '--ref', str(game), *options)
+    return [(outdir / f'{patch.name}{ext}').read_bytes() for ext in ('.000', '.001')]
+
+
+def test_incremental_build_matches_full(
+    game: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    script = sputm.mktag('SCRP', make_script(3) + bytes(37))
+    patch = make_patch(tmp_path / 'GAME', 'LECF_0001/LFLF_0002/SCRP_0003', script)
+
+    full = build_game(game, tmp_path / 'full', patch, monkeypatch)
+    incremental = build_game(
+        game, tmp_path / 'incremental', patch, monkeypatch, '--incremental'
+    )
+    assert incremental == full
+
+    original = [game.read_bytes(), game.with_suffix('.001').read_bytes()]
+    assert len(full[1]) == len(original[1]) + 37
+    # offsets of rooms and sounds after patched script are shifted
+    assert full[0] != original[0]
+
+
+@pytest.mark.parametrize('rooms', [None, {'LECF_0001/LFLF_0001'}])
+def test_rebuild_in_place(tmp_path: Path, rooms) -> None:
+    script = sputm.mktag('SCRP', make_script(1) + bytes(5))
+    patch = make_patch(tmp_path / 'GAME', 'LECF_0001/LFLF_0001/SCRP_0001', script)
+    files = set(glob.iglob(f'{patch}/**/*', recursive=True))
+
+    def rebuild(game: Path, basename: Path) -> List[bytes]:
+        # unencrypted disks are mapped to memory and read while writing
+        gameres = open_game_resource(str(game), chiper_key=0)
+        root = gameres.read_resources(zero_copy=True)
+        updated = list(update_element(str(patch), root, files, serialize=False))
+        rebuild_resources(gameres, str(basename), updated, rooms)
+        return [basename.with_suffix(ext).read_bytes() for ext in ('.000', '.001')]
+
+    expected = rebuild(make_game(tmp_path / 'ref', key=0), tmp_path / 'OUT')
+    game = make_game(tmp_path / 'game', key=0)
+    assert rebuild(game, game.with_suffix('')) == expected
+
+
+def test_strings_inject_incremental(
+    game: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    textfile = tmp_path / 'strings.txt'
+    monkeypatch.chdir(tmp_path)
+    run('strings_extract', str(game), '--textfile', str(textfile))
+    lines = textfile.read_text().splitlines(keepends=True)
+    assert len(lines) == 2 * NUM_ROOMS
+    lines[2] = 'changed script 3\n'
+    textfile.write_text(''.join(lines))
+
+    outputs = []
+    for options in [(), ('--incremental',)]:
+        outdir = tmp_path / f'out{len(options)}'
+        outdir.mkdir()
+        monkeypatch.chdir(outdir)
+        run('strings_inject', str(game), '--textfile', str(textfile), *options)
+        outputs.append([(outdir / f'GAME.00{idx}').read_bytes() for idx in (0, 1)])
+    assert outputs[0] == outputs[1]
+    assert len(outputs[0][1]) == len(game.with_suffix('.001').read_bytes()) + 8
+
+
+def test_update_element_strings_changed_rooms(game: Path) -> None:
+    gameres = open_game_resource(str(game))
+    script_map = get_script_map(gameres.game)
+    root = gameres.read_resources(
+        schema=narrow_schema(SCHEMA, {'LECF', 'LFLF', *script_map})
+    )
+    strings = [f'script {gid}'.encode() for gid in range(1, 2 * NUM_ROOMS + 1)]
+    strings[3] = b'changed'
+    changed: Set[str] = set()
+    disks = list(
+        update_element_strings(
+            root, iter(strings), get_optable(gameres.game), script_map, changed
+        )
+    )
+    assert changed == {'LECF_0001/LFLF_0002'}
+    # disks and unchanged rooms are not serialized again
+    disk = disks[0]
+    assert disk.data is disk.chunk.data
+    assert all(
+        room.data is room.chunk.data
+        for room in disk.children
+        if room.attribs.get('path') != 'LECF_0001/LFLF_0002'
+    )
+    assert disk.attribs['size'] == len(disk.chunk.data) + len(b'changed') - 8
+
+
+def test_chunk_size_padded(monkeypatch: pytest.MonkeyPatch) -> None:
+    aligned = sputm(align=2)
+    monkeypatch.setattr(build, 'sputm', aligned)
+    chunks = [aligned.mktag('SCRP', bytes(size)) for size in (3, 4, 5)]
+    children = list(aligned.map_chunks(aligned.write_chunks(chunks)))
+    assert [build.chunk_size(elem) for elem in children] == [12, 12, 14]
+    assert sum(map(build.chunk_size, children)) == len(aligned.write_chunks(chunks))
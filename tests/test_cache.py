@@ -0,0 +1,173 @@
+import json
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from nutcracker.kernel.cache import (
+    dump_records,
+    load_jsonl,
+    load_records,
+    read_cache,
+    write_cache,
+)
+from nutcracker.kernel.element import Element
+from nutcracker.kernel.index import expand
+from nutcracker.kernel.stats import ParseStats
+from nutcracker.kernel.tree import renders
+from nutcracker.sputm.preset import sputm
+from nutcracker.sputm.tree import open_game_resource
+from nutcracker.utils.fileio import read_file
+
+from .test_build import KEY, make_game, run
+
+SCHEMA = {
+    'LECF': {'LFLF'},
+    'LFLF': {'ROOM', 'SCRP'},
+    'ROOM': {'RMHD'},
+    'RMHD': set(),
+    'SCRP': set(),
+}
+
+
+def make_disk() -> bytes:
+    mk = sputm.mktag
+    lflfs = [
+        mk('LFLF', mk('ROOM', mk('RMHD', bytes([idx]))) + mk('SCRP', b'\1' * idx))
+        for idx in range(3)
+    ]
+    return mk('LECF', b''.join(lflfs))
+
+
+def map_disk(data: bytes) -> List[Element]:
+    root = list(sputm(schema=SCHEMA).map_chunks(data))
+    expand(root)
+    return root
+
+
+def test_records_round_trip() -> None:
+    data = make_disk()
+    root = map_disk(data)
+    records = list(dump_records(root))
+    assert len(records) == 1 + 3 * 4
+    # records survive JSON, as written to cache files
+    loaded = load_records(sputm, data, json.loads(json.dumps(records)))
+    assert [renders(elem) for elem in loaded] == [renders(elem) for elem in root]
+    assert [bytes(elem.data) for elem in loaded] == [bytes(elem.data) for elem in root]
+    assert list(dump_records(loaded)) == records
+
+
+@pytest.fixture
+def cached_disk(tmp_path: Path) -> Path:
+    disk = tmp_path / 'GAME.001'
+    disk.write_bytes(make_disk())
+    records = dump_records(map_disk(disk.read_bytes()))
+    write_cache(f'{disk}.idx.json', str(disk), 'params', records)
+    return disk
+
+
+def test_read_cache(cached_disk: Path) -> None:
+    cache_path, path = f'{cached_disk}.idx.json', str(cached_disk)
+    records = read_cache(cache_path, path, 'params')
+    assert records == json.loads(json.dumps(list(dump_records(map_disk(make_disk())))))
+    assert read_cache(cache_path, path, 'other') is None
+    assert read_cache(f'{cache_path}.missing', path, 'params') is None
+
+    with open(cache_path, 'a') as stream:
+        stream.write('garbage')
+    assert read_cache(cache_path, path, 'params') is None
+
+
+def test_read_cache_stale(cached_disk: Path) -> None:
+    cache_path, path = f'{cached_disk}.idx.json', str(cached_disk)
+    stat = os.stat(path)
+    data = bytearray(cached_disk.read_bytes())
+
+    # same size and modification time, content differs
+    data[-1] ^= 0xFF
+    cached_disk.write_bytes(data)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert read_cache(cache_path, path, 'params') is None
+
+    # content restored, modification time differs
+    data[-1] ^= 0xFF
+    cached_disk.write_bytes(data)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert read_cache(cache_path, path, 'params') is None
+
+    # modification time restored, size differs
+    cached_disk.write_bytes(data + b'\0')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert read_cache(cache_path, path, 'params') is None
+
+    cached_disk.write_bytes(data)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert read_cache(cache_path, path, 'params') is not None
+
+
+@pytest.mark.skipif(
+    'fork' not in multiprocessing.get_all_start_methods(),
+    reason='rooms are mapped in parallel only with fork',
+)
+def test_parallel_stats_merged(tmp_path: Path) -> None:
+    game = make_game(tmp_path / 'game')
+
+    def collect(workers: int) -> ParseStats:
+        stats = ParseStats()
+        gameres = open_game_resource(str(game))
+        expand(gameres.read_resources(stats=stats, workers=workers))
+        return stats
+
+    serial, parallel = collect(0), collect(2)
+    counts = {key: (entry.count, entry.bytes) for key, entry in serial.tags.items()}
+    assert counts == {
+        key: (entry.count, entry.bytes) for key, entry in parallel.tags.items()
+    }
+    assert ('SCRP', 2) in counts
+
+
+def test_map_jsonl_output(tmp_path: Path) -> None:
+    game = make_game(tmp_path / 'game')
+    output = tmp_path / 'elements.jsonl'
+    run('map', str(game), '--jsonl', str(output))
+
+    disk = read_file(str(game.with_suffix('.001')), key=KEY)
+    with open(output, 'r') as stream:
+        loaded = load_jsonl(sputm, disk, stream)
+    expected = open_game_resource(str(game)).read_resources()
+    assert [renders(elem) for elem in loaded] == [renders(elem) for elem in expected]
+
+
+def test_index_cache_per_params(tmp_path: Path) -> None:
+    game = make_game(tmp_path / 'game')
+    expected = list(open_game_resource(str(game)).read_resources())
+    expand(expected)
+
+    gameres = open_game_resource(str(game))
+    for _ in range(2):
+        # written on first read, loaded on second
+        root = list(gameres.read_resources(index_cache=True))
+        assert [renders(elem) for elem in root] == [renders(elem) for elem in expected]
+    (cache_path,) = game.parent.glob('GAME.001.*.idx.json')
+    with open(cache_path, 'r') as stream:
+        elements = json.load(stream)['elements']
+    assert elements == json.loads(json.dumps(list(dump_records(expected))))
+
+    list(gameres.read_resources(index_cache=True, max_depth=2))
+    assert len(list(game.parent.glob('GAME.001.*.idx.json'))) == 2
+
+
+def test_parallel_without_fork(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    game = make_game(tmp_path / 'game')
+    gameres = open_game_resource(str(game))
+    expected = [renders(elem) for elem in gameres.read_resources()]
+    monkeypatch.setattr(multiprocessing, 'get_all_start_methods', lambda: ['spawn'])
+    with caplog.at_level(logging.WARNING):
+        root = list(gameres.read_resources(workers=2))
+    assert 'rooms are mapped serially' in caplog.text
+    assert [renders(elem) for elem in root] == expected
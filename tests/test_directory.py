@@ -0,0 +1,154 @@
+import glob
+import os
+from pathlib import Path
+from typing import Set, Union
+
+import pytest
+
+from nutcracker.chiper import xor
+from nutcracker.sputm.build import (
+    bind_directory_changes,
+    write_dir,
+    write_dir_v8,
+    write_dlfl,
+)
+from nutcracker.sputm.index import (
+    DIRECTORY_DOBJ_V8,
+    DIRECTORY_LOFF,
+    DIRECTORY_TAGS,
+    GameIndex,
+    ResourceDirectory,
+    read_directory,
+    read_directory_leg,
+    read_directory_leg_v8,
+    read_dlfl,
+    read_dobj_v8,
+    read_game_index,
+)
+from nutcracker.sputm.inventory import index_inventory, read_inventory
+from nutcracker.sputm.preset import sputm
+from nutcracker.sputm.resource import chiper_keys, load_resource
+from nutcracker.sputm.tree import open_game_resource
+
+from .test_build import INDEX_LAYOUTS, make_game, make_index
+
+# index files to check, e.g. NUTCRACKER_INDEX_FILES='/path/to/games/*/*.LA0'
+INDEX_FILES = sorted(glob.glob(os.environ.get('NUTCRACKER_INDEX_FILES', '')))
+
+
+def test_directory_round_trip() -> None:
+    index = {0: (0, 0), 1: (1, 0x1234), 2: (255, 0xFFFFFFFF), 3: (1, 0x1234)}
+    assert dict(read_directory_leg(write_dir(index))) == index
+    assert dict(read_directory_leg_v8(write_dir_v8(index))) == index
+    assert write_dir(index)[:2] == b'\x04\x00'
+    assert write_dir_v8(index)[:4] == b'\x04\x00\x00\x00'
+
+
+def test_dlfl_round_trip() -> None:
+    index = {0: 0, 1: 16, 2: 0xFFFFFFFF}
+    data = write_dlfl(index)
+    assert data == b'\x03\x00' + b'\x00' * 4 + b'\x10' + b'\x00' * 3 + b'\xff' * 4
+    assert dict(read_dlfl(data)) == index
+
+
+def test_loff_round_trip() -> None:
+    entries = [(1, 16), (7, 0x10000)]
+    data = DIRECTORY_LOFF.write(len(entries), entries=entries)
+    assert data == b'\x02\x01\x10\x00\x00\x00\x07\x00\x00\x01\x00'
+    assert read_directory(data) == entries
+
+
+def test_directory_out_of_range() -> None:
+    with pytest.raises(OverflowError):
+        write_dir({0: (256, 0)})
+
+
+def test_index_inventory() -> None:
+    index = GameIndex(
+        rnam={1: 'room1'},
+        directories={
+            'DROO': ResourceDirectory.from_bytes(write_dir({0: (0, 0), 1: (1, 0)})),
+            'DSCR': ResourceDirectory.from_bytes(
+                write_dir({0: (0, 0), 1: (1, 40), 2: (1, 10), 3: (1, 40)})
+            ),
+        },
+    )
+    inventory = index_inventory(index)
+    assert inventory.counts == {'rooms': 1, 'scripts': 3}
+    room = inventory.rooms[1]
+    assert (room.name, room.disk) == ('room1', 1)
+    assert [(res.gid, res.size) for res in room.resources] == [
+        (2, 30),
+        (1, None),
+        (3, None),
+    ]
+
+
+def test_read_inventory_exact(tmp_path: Path) -> None:
+    gameres = open_game_resource(str(make_game(tmp_path / 'game')))
+    inventory = read_inventory(gameres, exact=True)
+    assert (inventory.counts['scripts'], inventory.counts['sounds']) == (6, 6)
+    (disk,) = gameres.read_resources()
+    rooms = [elem for elem in disk if elem.tag == 'LFLF']
+    assert len(rooms) == len(inventory.rooms)
+    for lflf in rooms:
+        room = inventory.rooms[lflf.attribs['gid']]
+        # offset of ROOM chunk, past disk and room headers
+        assert room.offset == lflf.attribs['offset'] + 16
+        assert (room.disk, room.size) == (1, lflf.attribs['size'] + 8)
+        listed = {(res.tag, res.gid): (res.size, res.exact) for res in room.resources}
+        assert listed == {
+            (elem.tag, elem.attribs['gid']): (elem.attribs['size'] + 8, True)
+            for elem in lflf
+            if elem.tag != 'ROOM'
+        }
+
+
+def make_index_file(gamedir: Path, version: int) -> str:
+    ext, _, _ = INDEX_LAYOUTS[version]
+    rooms = {0: (0, 0), 1: (1, 0), 2: (1, 0)}
+    scripts = {0: (0, 0), 1: (1, 0x12), 2: (2, 0x34), 3: (1, 0x12)}
+    index = make_index(version, rooms, scripts, {0: (0, 0), 1: (2, 0x56)})
+    index_file = gamedir / f'GAME{ext}'
+    index_file.write_bytes(xor.decrypt(index, key=chiper_keys[ext]))
+    return str(index_file)
+
+
+@pytest.mark.parametrize('index_file', [*INDEX_LAYOUTS, *INDEX_FILES])
+def test_index_file_round_trip(index_file: Union[int, str], tmp_path: Path) -> None:
+    layout: Set[str] = set()
+    if isinstance(index_file, int):
+        layout = set(INDEX_LAYOUTS[index_file][2])
+        index_file = make_index_file(tmp_path, index_file)
+    game = load_resource(index_file)
+    read_dir, write = (
+        (read_directory_leg_v8, write_dir_v8)
+        if game.version >= 8
+        else (read_directory_leg, write_dir)
+    )
+    tags = set()
+    for elem in game.index:
+        if elem.tag in DIRECTORY_TAGS:
+            data = bytes(elem.data)
+            assert bind_directory_changes(read_dir, write, data, {}) == data
+        elif elem.tag == 'DLFL':
+            data = bytes(elem.data)
+            assert bind_directory_changes(read_dlfl, write_dlfl, data, {}) == data
+        tags.add(elem.tag)
+    assert tags & (DIRECTORY_TAGS | {'DLFL'})
+    # every directory of synthetic layout was checked
+    assert layout <= tags
+
+
+def test_objects_read_lazily() -> None:
+    entries = [(b'door', 1, 2, 3), (b'key', 0, 1, 0)]
+    objects = DIRECTORY_DOBJ_V8.write(len(entries), objects=entries)
+    for dobj, expected in [
+        (objects, {'door': (0, 1, 2, 3), 'key': (1, 0, 1, 0)}),
+        # truncated directory does not fail reading index
+        (objects[:-1], {}),
+    ]:
+        root = sputm.map_chunks(sputm.mktag('DOBJ', dobj))
+        index = read_game_index(root, read_objects=read_dobj_v8)
+        assert index.dobj == dobj
+        assert index.objects == expected
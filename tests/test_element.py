@@ -0,0 +1,81 @@
+from itertools import islice
+from typing import Iterator, List
+
+from nutcracker.kernel.element import Element, TransientElement
+from nutcracker.kernel.index import create_element
+from nutcracker.sputm.preset import sputm
+
+TAGS = ['RMHD', 'OBIM', 'OBCD', 'OBIM']
+
+
+def make_children(parsed: List[str]) -> Iterator[Element]:
+    # children are parsed as consumed, parsed tags are recorded
+    for idx, tag in enumerate(TAGS):
+        parsed.append(tag)
+        (_, chunk), *_ = sputm.read_chunks(sputm.mktag(tag, bytes([idx])))
+        yield create_element(8 * idx, chunk)
+
+
+def make_element(parsed: List[str], cls: type = Element) -> Element:
+    (_, chunk), *_ = sputm.read_chunks(sputm.mktag('ROOM', b''))
+    return cls(chunk, {}, [], _pending=make_children(parsed))
+
+
+def test_partial_iteration_then_children() -> None:
+    parsed: List[str] = []
+    elem = make_element(parsed)
+    assert not parsed
+    assert [child.tag for child in islice(elem, 2)] == TAGS[:2]
+    assert parsed == TAGS[:2]
+
+    # remaining children are parsed once, after those already iterated
+    assert len(elem.children) == len(TAGS)
+    assert elem.children[2].data == b'\2'
+    assert parsed == TAGS
+    assert [child.tag for child in elem] == TAGS
+
+
+def test_interleaved_iterations() -> None:
+    parsed: List[str] = []
+    elem = make_element(parsed)
+    first, second = iter(elem), iter(elem)
+    assert next(first).tag == next(second).tag == 'RMHD'
+    assert next(first).tag == 'OBIM'
+    assert [child.tag for child in second] == TAGS[1:]
+    assert [child.tag for child in first] == TAGS[2:]
+    assert parsed == TAGS
+
+
+def test_lookup_after_partial_iteration() -> None:
+    elem = make_element([])
+    assert next(iter(elem)).tag == 'RMHD'
+    assert [child.data for child in sputm.findall('OBIM', elem)] == [b'\1', b'\3']
+
+
+def test_mutation_after_partial_iteration() -> None:
+    parsed: List[str] = []
+    elem = make_element(parsed)
+    assert next(iter(elem)).tag == 'RMHD'
+    extra = next(make_children([]))
+    # pending children are parsed before appending
+    elem.children.append(extra)
+    assert [child.tag for child in elem] == [*TAGS, 'RMHD']
+    assert parsed == TAGS
+
+    elem = make_element(parsed)
+    assert next(iter(elem)).tag == 'RMHD'
+    elem.children = [extra]
+    assert [child.tag for child in elem] == ['RMHD']
+    assert sputm.find('OBIM', elem) is None
+
+
+def test_transient_element() -> None:
+    parsed: List[str] = []
+    elem = make_element(parsed, cls=TransientElement)
+    children = iter(elem)
+    assert next(children).tag == 'RMHD'
+    assert parsed == TAGS[:1]
+    assert [child.tag for child in children] == TAGS[1:]
+    # children are not kept, second iteration finds none
+    assert elem.children == []
+    assert list(elem) == []
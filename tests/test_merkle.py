@@ -0,0 +1,68 @@
+import io
+from typing import List
+
+from nutcracker.kernel.merkle import (
+    HashNode,
+    diff_trees,
+    dump_hashes,
+    hash_tree,
+    load_hashes,
+)
+from nutcracker.sputm.preset import sputm
+
+SCHEMA = {
+    'LECF': {'LFLF'},
+    'LFLF': {'ROOM', 'SCRP'},
+    'ROOM': {'RMHD', 'OBIM'},
+    'OBIM': {'IMHD'},
+    'RMHD': set(),
+    'IMHD': set(),
+    'SCRP': set(),
+}
+
+
+def make_disk(script: bytes, extra: bytes = b'') -> bytes:
+    mk = sputm.mktag
+    room = mk('ROOM', mk('RMHD', b'\1\2') + mk('OBIM', mk('IMHD', b'\3')))
+    lflf = mk('LFLF', room + mk('SCRP', b'\4\5') + mk('SCRP', script) + extra)
+    return mk('LECF', lflf + mk('LFLF', room))
+
+
+def hashes(data: bytes, **kwargs: bool) -> List[HashNode]:
+    return hash_tree(sputm(schema=SCHEMA, **kwargs).map_chunks(data))
+
+
+def test_hashes_are_stable() -> None:
+    data = make_disk(b'\6\7')
+    nodes = hashes(data)
+    assert nodes == hashes(data) == hashes(bytearray(data), zero_copy=True)
+    # identical rooms in different positions have the same digest
+    room, other = nodes[0].children
+    assert room.children[0].digest == other.children[0].digest
+    assert room.digest != other.digest
+
+    with io.StringIO() as stream:
+        dump_hashes(nodes, stream)
+        stream.seek(0)
+        assert load_hashes(stream) == nodes
+
+
+def test_diff_reports_changed_leaf() -> None:
+    old, new = hashes(make_disk(b'\6\7')), hashes(make_disk(b'\6\0'))
+    assert old[0].digest != new[0].digest
+    assert list(diff_trees(old, old)) == []
+
+    # only the leaf is reported, not the containers holding it
+    onode, nnode = old[0].children[0].children[2], new[0].children[0].children[2]
+    assert onode.tag == 'SCRP'
+    assert list(diff_trees(old, new)) == [('changed', onode, nnode)]
+
+
+def test_diff_reports_added_chunk() -> None:
+    old = hashes(make_disk(b'\6\7'))
+    new = hashes(make_disk(b'\6\7', extra=sputm.mktag('SCRP', b'\10')))
+    diffs = list(diff_trees(old, new))
+    assert diffs == [('added', None, new[0].children[0].children[3])]
+    assert [(kind, nnode) for kind, _, nnode in diff_trees(new, old)] == [
+        ('removed', None)
+    ]
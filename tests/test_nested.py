@@ -0,0 +1,77 @@
+from typing import Dict, Set
+
+import pytest
+
+from nutcracker.kernel import index
+from nutcracker.kernel.chunk import Chunk
+from nutcracker.kernel.tree import renders
+from nutcracker.sputm.preset import sputm
+
+mk = sputm.mktag
+# leaf content cannot be parsed as chunks
+LEAF = b'\1\2\3'
+
+
+def untag(data: bytes) -> Chunk:
+    ((_, chunk),) = sputm.read_chunks(data)
+    return chunk
+
+
+def inferred(data: bytes) -> str:
+    schema = sputm.generate_schema(data)
+    return renders(next(sputm(schema=schema).map_chunks(data)))
+
+
+def test_map_nested_cache_hit(monkeypatch: pytest.MonkeyPatch) -> None:
+    schemas: Dict[str, Dict[str, Set[str]]] = {}
+    first = mk('IMAG', mk('HEAD', LEAF) + mk('BODY', mk('WRAP', LEAF)))
+    assert renders(sputm.map_nested(untag(first), schemas)) == inferred(first)
+    assert schemas['IMAG'] == {
+        'IMAG': {'HEAD', 'BODY'},
+        'HEAD': set(),
+        'BODY': {'WRAP'},
+        'WRAP': set(),
+    }
+
+    def generate_schema(*args: object) -> None:
+        raise AssertionError('schema inferred on cache hit')
+
+    monkeypatch.setattr(index, 'generate_schema', generate_schema)
+    # content covered by cached schema
+    second = mk('IMAG', mk('HEAD', b'\4' * 5) + mk('BODY', mk('WRAP', LEAF) * 3))
+    assert renders(sputm.map_nested(untag(second), schemas)) == inferred(second)
+
+
+def test_map_nested_miss_merges() -> None:
+    schemas: Dict[str, Dict[str, Set[str]]] = {}
+    first = mk('IMAG', mk('HEAD', LEAF) + mk('BODY', mk('WRAP', LEAF)))
+    sputm.map_nested(untag(first), schemas)
+
+    # tags missing from cached schema
+    second = mk('IMAG', mk('HEAD', LEAF) + mk('TAIL', mk('OFFS', LEAF)))
+    root = sputm.map_nested(untag(second), schemas)
+    assert renders(root) == inferred(second)
+    assert schemas['IMAG'] == {
+        'IMAG': {'HEAD', 'BODY', 'TAIL'},
+        'HEAD': set(),
+        'BODY': {'WRAP'},
+        'WRAP': set(),
+        'TAIL': {'OFFS'},
+        'OFFS': set(),
+    }
+    # both contents are covered by merged schema
+    assert renders(sputm.map_nested(untag(first), schemas)) == inferred(first)
+
+
+def test_map_nested_leaf_becomes_container() -> None:
+    schemas: Dict[str, Dict[str, Set[str]]] = {}
+    first = mk('IMAG', mk('HEAD', LEAF) + mk('WRAP', LEAF) * 2)
+    sputm.map_nested(untag(first), schemas)
+    assert schemas['IMAG']['WRAP'] == set()
+
+    # strict mapping with cached schema would keep WRAP as leaf
+    second = mk('IMAG', mk('HEAD', LEAF) + mk('WRAP', mk('OFFS', LEAF)))
+    root = sputm.map_nested(untag(second), schemas)
+    assert renders(root) == inferred(second)
+    assert [child.tag for child in sputm.find('WRAP', root)] == ['OFFS']
+    assert schemas['IMAG']['WRAP'] == {'OFFS'}
@@ -0,0 +1,53 @@
+from pathlib import Path
+from typing import Any, List, Tuple
+
+from nutcracker.kernel.element import Element
+from nutcracker.sputm.build import write_dir
+from nutcracker.sputm.index import (
+    ResourceDirectory,
+    invert_directory,
+    lookup_directory,
+)
+from nutcracker.sputm.preset import sputm
+from nutcracker.sputm.tree import open_game_resource
+
+from .test_build import make_game
+
+
+def flatten(elem: Element) -> List[Tuple[Any, ...]]:
+    return [
+        (elem.tag, dict(elem.attribs), bytes(elem.data)),
+        *(item for child in elem.children for item in flatten(child)),
+    ]
+
+
+def test_invert_directory_first_wins() -> None:
+    directory = {0: (0, 0), 1: (1, 10), 2: (2, 10), 3: (1, 10)}
+    assert invert_directory(directory) == {(0, 0): 0, (1, 10): 1, (2, 10): 2}
+    lookup = lookup_directory(directory)
+    assert (lookup((1, 10)), lookup((2, 10)), lookup((1, 11))) == (1, 2, None)
+    resources = ResourceDirectory.from_bytes(write_dir(directory))
+    assert [resources.find(*entry) for entry in directory.values()] == [0, 1, 2, 1]
+    assert resources.find(1, 11) is None
+
+
+def test_get_matches_mapped(tmp_path: Path) -> None:
+    # script 7 is listed at location of script 3
+    gameres = open_game_resource(str(make_game(tmp_path / 'game', aliases={7: 3})))
+    (disk,) = gameres.read_resources()
+    mapped = {}
+    for lflf in sputm.findall('LFLF', disk):
+        mapped[('LFLF', lflf.attribs['gid'])] = lflf
+        for elem in lflf:
+            if elem.attribs['gid'] is not None:
+                mapped[(elem.tag, elem.attribs['gid'])] = elem
+    assert len(mapped) == 3 + 6 + 6
+    for (tag, gid), elem in mapped.items():
+        assert flatten(gameres.get(tag, gid)) == flatten(elem)
+
+    # first gid listed at a location is given when mapped
+    assert ('SCRP', 7) not in mapped
+    alias, script = gameres.get('SCRP', 7), mapped[('SCRP', 3)]
+    assert alias.attribs['gid'] == 7
+    assert alias.attribs['offset'] == script.attribs['offset']
+    assert bytes(alias.data) == bytes(script.data)
@@ -0,0 +1,101 @@
+import io
+from typing import Any, List, Tuple, Union
+
+import pytest
+
+from nutcracker.earwax.preset import earwax
+from nutcracker.kernel.resource import iter_chunks, read_chunks, scan_chunks
+from nutcracker.smush.preset import smush
+from nutcracker.sputm.preset import sputm
+
+AAAA = sputm.mktag('AAAA', b'abc')
+BBBB = sputm.mktag('BBBB', b'')
+# chunk sizes exclude the header, data is aligned to even offsets
+ODD = smush.mktag('AAAA', b'abc')
+EVEN = smush.mktag('BBBB', b'de')
+
+CASES = [
+    # (name, preset, buffer, offset, scanned)
+    ('plain', sputm, AAAA + BBBB, 0, True),
+    ('empty', sputm, b'', 0, True),
+    ('offset', sputm, AAAA + BBBB, len(AAAA), True),
+    ('padding', smush, ODD + b'\0' + EVEN, 0, True),
+    ('last padding', smush, EVEN + ODD + b'\0', 0, True),
+    ('bad padding', smush, ODD + b'\1' + EVEN, 0, False),
+    ('null tag', sputm, b'\0' * 4 + AAAA[4:] + BBBB, 0, False),
+    ('non-ascii tag', sputm, b'\xffBAD' + AAAA[4:], 0, False),
+    ('skip byte', sputm, AAAA + b'\x80' + BBBB, 0, False),
+    ('truncated', sputm, AAAA[:-1], 0, False),
+    ('undersized', sputm, b'AAAA\0\0\0\4abcd', 0, False),
+    ('scumm', earwax, earwax.mktag('AA', b'abc') + earwax.mktag('BB', b''), 0, True),
+]
+
+Outcome = Union[List[Tuple[int, str, int, int, bytes]], type]
+
+
+def outcome(chunks: Any) -> Outcome:
+    try:
+        return [
+            (offset, chunk.tag, chunk.slice.offset, chunk.slice.size, bytes(chunk))
+            for offset, chunk in chunks
+        ]
+    except Exception as exc:
+        return type(exc)
+
+
+@pytest.mark.parametrize(
+    'cfg, buffer, offset, scanned',
+    [case[1:] for case in CASES],
+    ids=[case[0] for case in CASES],
+)
+def test_iter_chunks_matches_read_chunks(
+    cfg: Any, buffer: bytes, offset: int, scanned: bool
+) -> None:
+    assert (scan_chunks(cfg, memoryview(buffer), offset=offset) is not None) == scanned
+    expected = outcome(read_chunks(cfg, buffer, offset=offset))
+    assert outcome(iter_chunks(cfg, buffer, offset=offset)) == expected
+
+
+@pytest.mark.parametrize(
+    'cfg, tag',
+    [(sputm, 'AAAA'), (smush, 'AAAA'), (earwax, 'AA')],
+    ids=['sputm', 'smush', 'earwax'],
+)
+def test_scan_chunks_headers(cfg: Any, tag: str) -> None:
+    buffer = cfg.write_chunks(cfg.mktag(tag, bytes(size)) for size in (3, 0, 5))
+    headers = scan_chunks(cfg, buffer)
+    assert headers is not None
+    chunks = list(read_chunks(cfg, buffer))
+    assert headers.offsets.tolist() == [offset for offset, _ in chunks]
+    assert headers.tags == [chunk.tag for _, chunk in chunks]
+    assert headers.sizes.tolist() == [len(chunk) for _, chunk in chunks]
+    assert headers.hsize == chunks[0][1].slice.offset
+
+
+def test_zero_copy_data() -> None:
+    buffer = bytearray(AAAA + BBBB)
+    ((_, chunk), _) = read_chunks(sputm(zero_copy=True), buffer)
+    data = chunk.data
+    assert isinstance(data, memoryview) and data.readonly
+    assert data == b'abc' and bytes(data[1:]) == b'bc'
+    # view follows parent buffer, copy does not
+    copied = bytes(data)
+    buffer[8] = ord('x')
+    assert (data, copied) == (b'xbc', b'abc')
+
+
+class ShortWriteIO(io.BytesIO):
+    """Stream writing few bytes per call, as unbuffered files may do."""
+
+    def write(self, data: Any) -> int:
+        return super().write(memoryview(data)[:3])
+
+
+def test_write_chunks_short_writes() -> None:
+    stream = ShortWriteIO()
+    with smush.write_container(stream, 'ANIM'):
+        for chunk in (ODD, EVEN):
+            _, (tag, data) = next(read_chunks(smush, chunk))
+            assert smush.write_chunk(stream, tag, data) == len(chunk) + len(chunk) % 2
+    expected = smush.mktag('ANIM', smush.write_chunks([ODD, EVEN]))
+    assert stream.getvalue() == smush.write_chunks([expected])
@@ -0,0 +1,77 @@
+import io
+from typing import Any, List, Tuple
+
+import pytest
+
+from nutcracker.smush import ahdr, anim
+from nutcracker.smush.preset import smush
+from nutcracker.smush.types import Element
+
+HEADER = ahdr.AnimationHeader(
+    version=2,
+    nframes=3,
+    dummy=0,
+    palette=bytes(range(256)) * 3,
+    v2=ahdr.AnimationHeaderV2(
+        framerate=12, maxframe=100, samplerate=22050, dummy2=0, dummy3=0
+    ),
+)
+
+
+class TrickleIO(io.BytesIO):
+    """Stream returning few bytes per sized read, as pipes may do."""
+
+    def read(self, size: Any = -1) -> bytes:
+        if size is None or size < 0:
+            return super().read()
+        return super().read(min(size, 3))
+
+
+def make_anim() -> bytes:
+    # odd sized chunks are padded to even offsets
+    frames = [
+        smush.mktag(
+            'FRME',
+            smush.write_chunks(
+                [smush.mktag('NPAL', bytes([idx]) * 6), smush.mktag('FOBJ', b'x' * idx)]
+            ),
+        )
+        for idx in range(3)
+    ]
+    return anim.compose(HEADER, iter(frames))
+
+
+def flatten(elem: Element) -> List[Tuple[Any, ...]]:
+    return [
+        (elem.tag, dict(elem.attribs), bytes(elem.data)),
+        *(item for child in elem.children for item in flatten(child)),
+    ]
+
+
+@pytest.mark.parametrize('stream_type', [io.BytesIO, TrickleIO])
+def test_stream_elements_matches_map_chunks(stream_type: Any) -> None:
+    data = make_anim()
+    root = next(smush.map_chunks(data))
+    elements = smush.stream_elements(stream_type(data), streamed={'ANIM'})
+    head = next(elements)
+    # streamed container holds only its header, children follow it
+    assert (head.tag, head.attribs, bytes(head.data)) == ('ANIM', root.attribs, b'')
+    assert [item for elem in elements for item in flatten(elem)] == [
+        item for elem in root.children for item in flatten(elem)
+    ]
+
+
+@pytest.mark.parametrize('stream_type', [io.BytesIO, TrickleIO])
+def test_from_stream_matches_mapped(stream_type: Any) -> None:
+    data = make_anim()
+    mapped = anim.parse(anim.from_bytes(data))
+    streamed = anim.from_stream(stream_type(data))
+    assert streamed.header == mapped.header == HEADER
+    assert [flatten(frame) for frame in streamed.frames] == [
+        flatten(frame) for frame in mapped.frames
+    ]
+
+
+def test_from_stream_empty() -> None:
+    with pytest.raises(ValueError):
+        anim.from_stream(io.BytesIO(b''))
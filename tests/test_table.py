@@ -0,0 +1,58 @@
+from pathlib import Path
+from typing import Any, Iterator, List, Tuple
+
+import numpy as np
+import pytest
+
+from nutcracker.kernel.cache import dump_records
+from nutcracker.kernel.element import Element
+from nutcracker.kernel.table import ElementTable
+from nutcracker.sputm.preset import sputm
+from nutcracker.sputm.script.bytecode import get_scripts
+from nutcracker.sputm.tree import GameResource, open_game_resource
+
+from .test_build import make_game
+
+
+@pytest.fixture
+def gameres(tmp_path: Path) -> GameResource:
+    return open_game_resource(str(make_game(tmp_path / 'game')))
+
+
+def walk(root: List[Element]) -> Iterator[Element]:
+    for elem in root:
+        yield elem
+        yield from walk(elem.children)
+
+
+def describe(elem: Element) -> Tuple[Any, ...]:
+    return elem.tag, dict(elem.attribs), bytes(elem.data)
+
+
+def test_table_matches_tree(gameres: GameResource) -> None:
+    (disk,) = gameres.read_resources()
+    (table,) = gameres.read_tables()
+    elements = list(walk([disk]))
+    assert len(table) == len(elements)
+
+    # same table whether scanned or built from mapped elements
+    records = ElementTable.from_records(table.buffer, dump_records([disk]))
+    for column in ('tag', 'parent', 'depth', 'offset', 'start', 'end', 'gid'):
+        assert np.array_equal(getattr(table, column), getattr(records, column))
+
+    for row, elem in enumerate(elements):
+        assert describe(table.element(row)) == describe(elem)
+        assert table.path(row) == elem.attribs['path']
+        children = [elements.index(child) for child in elem.children]
+        assert table.children(row).tolist() == children
+        for tag in {child.tag for child in elem.children}:
+            rows = table.findall(tag, row).tolist()
+            assert rows == [elements.index(child) for child in sputm.findall(tag, elem)]
+    assert table.children().tolist() == [0]
+
+
+def test_table_descend_matches_walk(gameres: GameResource) -> None:
+    (table,) = gameres.read_tables()
+    scripts = [describe(elem) for elem in get_scripts(gameres.read_resources())]
+    assert [describe(elem) for elem in get_scripts(table)] == scripts
+    assert {tag for tag, *_ in scripts} == {'SCRP'}
@@ -0,0 +1,116 @@
+import os
+from collections import Counter
+from typing import Optional
+
+import pytest
+
+from nutcracker.kernel.element import Element
+from nutcracker.kernel.index import expand
+from nutcracker.kernel.tree import compile_path, find, findpath, iterfind
+from nutcracker.sputm.preset import sputm
+
+SCHEMA = {
+    'LECF': {'LOFF', 'LFLF'},
+    'LOFF': set(),
+    'LFLF': {'ROOM', 'SCRP'},
+    'ROOM': {'RMHD', 'OBIM'},
+    'RMHD': set(),
+    'OBIM': {'IMHD', 'IM01'},
+    'IMHD': set(),
+    'IM01': {'SMAP'},
+    'SMAP': set(),
+    'SCRP': set(),
+}
+
+GID_TAGS = {'LFLF', 'OBIM', 'SCRP'}
+
+
+def old_findpath(path: str, root: Optional[Element]) -> Optional[Element]:
+    # lookup of first match at each step, before path queries
+    path = os.path.normpath(path)
+    if not path or path == '.':
+        return root
+    dirname, basename = os.path.split(path)
+    return find(basename, old_findpath(dirname, root))
+
+
+@pytest.fixture
+def root() -> Element:
+    mk = sputm.mktag
+    obims = mk('OBIM', mk('IMHD', b'\1') + mk('IM01', mk('SMAP', b'\2'))) + mk(
+        'OBIM', mk('IMHD', b'\3')
+    )
+    data = mk(
+        'LECF',
+        mk('LOFF', b'\0')
+        + mk('LFLF', mk('ROOM', mk('RMHD', b'\0') + obims) + mk('SCRP', b'\1'))
+        + mk(
+            'LFLF',
+            mk('ROOM', mk('RMHD', b'\0')) + mk('SCRP', b'\2') + mk('SCRP', b'\3'),
+        ),
+    )
+    # gids are given in tree order, per tag
+    counts: Counter = Counter()
+
+    def extra(parent, chunk, offset):
+        if chunk.tag not in GID_TAGS:
+            return {}
+        counts[chunk.tag] += 1
+        return {'gid': counts[chunk.tag]}
+
+    elem = next(sputm(schema=SCHEMA).map_chunks(data, extra=extra))
+    expand([elem])
+    return elem
+
+
+def test_compile_path() -> None:
+    steps = compile_path('//OBIM[gid=0x2]/IMHD')
+    assert [(step.descendant, step.gid) for step in steps] == [(True, 2), (False, None)]
+    assert len(compile_path('LFLF/./ROOM/../SCRP')) == 2
+    assert compile_path('') == compile_path('.') == ()
+    with pytest.raises(ValueError):
+        compile_path('OBIM[size=1]')
+
+
+def test_iterfind_descendants(root: Element) -> None:
+    assert [elem.data for elem in iterfind('//IMHD', root)] == [b'\1', b'\3']
+    assert [elem.attribs['gid'] for elem in iterfind('//SCRP', root)] == [1, 2, 3]
+    assert [elem.data for elem in iterfind('LFLF//IM{:02x}/SMAP', root)] == [b'\2']
+    # elements reached by more than one route are found once
+    assert len(list(iterfind('//LFLF//SMAP', root))) == 1
+    assert not list(iterfind('//LOFF/RMHD', root))
+
+
+def test_iterfind_predicates(root: Element) -> None:
+    obim = findpath('LFLF/ROOM/OBIM[gid=2]', root)
+    assert obim and sputm.find('IMHD', obim).data == b'\3'
+    scripts = list(iterfind('LFLF[gid=2]/SCRP[gid=3]', root))
+    assert [elem.data for elem in scripts] == [b'\3']
+    assert findpath('LFLF[gid=1]/SCRP[gid=3]', root) is None
+
+
+def test_iterfind_any_tag(root: Element) -> None:
+    tags = [elem.tag for elem in iterfind('LFLF/*', root)]
+    assert tags == ['ROOM', 'SCRP', 'ROOM', 'SCRP', 'SCRP']
+    assert [elem.tag for elem in iterfind('*/ROOM/*/IMHD', root)] == ['IMHD'] * 2
+
+
+@pytest.mark.parametrize(
+    'path',
+    [
+        '',
+        '.',
+        'LOFF',
+        'LFLF',
+        'LFLF/SCRP',
+        'LFLF/ROOM/RMHD',
+        'LFLF/ROOM/OBIM/IMHD',
+        'LFLF/ROOM/OBIM/IM01/SMAP',
+        'lflf/room/obim',
+        'LFLF/./ROOM/../SCRP',
+        'MISSING',
+        'LFLF/MISSING',
+    ],
+)
+def test_findpath_matches_first_match_lookup(root: Element, path: str) -> None:
+    assert findpath(path, root) is old_findpath(path, root)